@@ -0,0 +1 @@
+"""ベンチマークスクリプト群（`python -m benchmarks.<name>` で実行）."""
@@ -0,0 +1,131 @@
+"""共有クライアント（接続プール）と呼び出し毎クライアント生成のレイテンシ比較.
+
+ローカルのHTTPスタンドインサーバーに対してMessages APIを叩き、
+旧実装（毎回 Anthropic(...) を生成）と get_client() の共有クライアントを比較する.
+接続確立コストは --handshake-ms で接続ごとの遅延として模擬する.
+
+    python -m benchmarks.bench_client_pool --requests 200 --handshake-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_FAKE_MESSAGE = {
+    "id": "msg_local",
+    "type": "message",
+    "role": "assistant",
+    "model": "stand-in",
+    "content": [{"type": "text", "text": "{}"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 1, "output_tokens": 1},
+}
+
+
+def _make_handler(handshake_ms: float) -> type[BaseHTTPRequestHandler]:
+    body = json.dumps(_FAKE_MESSAGE).encode()
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            # 新規接続ごとに1回だけ呼ばれる → TLSハンドシェイク相当の遅延
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return _Handler
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _run(label: str, call, requests: int, concurrency: int) -> None:
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def _one(_: int) -> None:
+        start = time.perf_counter()
+        call()
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    print(
+        f"{label:<12} p50={statistics.median(latencies):7.2f}ms "
+        f"p95={_percentile(latencies, 0.95):7.2f}ms "
+        f"throughput={requests / wall:7.1f} req/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(args.handshake_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["ANTHROPIC_API_KEY"] = "sk-ant-local-stand-in"
+    os.environ["ANTHROPIC_BASE_URL"] = base_url
+
+    from anthropic import Anthropic
+
+    from src.llm.client import CLAUDE_MODEL, get_client, warm_up_client
+
+    request = {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 16,
+        "messages": [{"role": "user", "content": "ping"}],
+    }
+
+    def per_call_client() -> None:
+        with Anthropic(api_key="sk-ant-local-stand-in", base_url=base_url) as client:
+            client.messages.create(**request)
+
+    def shared_client() -> None:
+        get_client().messages.create(**request)
+
+    warm_up_client(background=False)
+
+    _run("per-call", per_call_client, args.requests, args.concurrency)
+    _run("shared", shared_client, args.requests, args.concurrency)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
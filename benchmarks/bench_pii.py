@@ -0,0 +1,146 @@
+"""PIIマスクのファズテストと、敵対的入力に対するベンチマーク.
+
+    python -m benchmarks.bench_pii               # ベンチマーク（10KB〜1MB）
+    python -m benchmarks.bench_pii --fuzz 500    # ファズテスト
+
+ベンチマークは入力ごとに1KBあたりの処理時間を出し、入力長を増やしても
+ほぼ一定（線形時間）であることを確認する. 比較用に旧実装（2回のre.sub）も測る.
+ファズテストは次を確認する:
+- mask_pii_stream の出力を連結すると、どの分割でも mask_pii と一致する
+- ランダムな文脈に埋め込んだPIIが必ずマスクされる
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections.abc import Callable
+
+from src.utils.pii import DEFAULT_STREAM_OVERLAP, PiiScanner
+
+# 旧実装（比較用）
+_LEGACY_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_LEGACY_PHONE = re.compile(r"(?:\+81[-\s]?)?0[0-9]{1,4}[-\s_]?[0-9]{1,4}[-\s_]?[0-9]{3,4}")
+
+
+def legacy_mask(text: str) -> str:
+    return _LEGACY_PHONE.sub("[PHONE]", _LEGACY_EMAIL.sub("[EMAIL]", text))
+
+
+# 敵対的な入力（バックトラックを誘発しやすい繰り返し）
+ADVERSARIAL: dict[str, Callable[[int], str]] = {
+    "digits": lambda n: "0" * n,
+    "digit_hyphen": lambda n: ("0-" * n)[:n],
+    "digit_space": lambda n: ("01 " * n)[:n],
+    "email_local": lambda n: "a" * n,
+    "email_no_tld": lambda n: ("a" * 60 + "@" + "b." * 200) * (n // 461 + 1),
+    "at_signs": lambda n: ("a@" * n)[:n],
+    "url_run": lambda n: "https://" + "a" * n,
+    "postal_like": lambda n: ("123-4567 " * n)[:n],
+    "japanese": lambda n: ("案件票の本文です。稼働140-180h/月、" * n)[:n],
+}
+
+_PLANTED = [
+    "taro.yamada@example.co.jp",
+    "a.b-c+d@sub.example.com",
+    "090-1234-5678",
+    "03-1234-5678",
+    "090-12345678",
+    "03-12345678",
+    "0901234-5678",
+    "+81-90-1234-5678",
+    "09012345678",
+    "03(1234)5678",
+    "https://example.com/path?q=1",
+    "〒150-0002",
+    "山田太郎",
+]
+_NOISE = ["あ", "、", "。", " ", "\n", "案件", "単価", "（", "）", ":", "／"]
+_TRICKY = list("0123456789-+@.()_ 〒ahtps:/w") + ["東京都", "+81", "https://", "www.", "山田"]
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+    return "".join(rng.choice(_TRICKY + _NOISE) for _ in range(size))
+
+
+def fuzz(iterations: int, seed: int = 0) -> int:
+    """ファズテストを実行し、失敗件数を返す."""
+    rng = random.Random(seed)
+    scanner = PiiScanner(["山田太郎", "佐藤花子"])
+    failures = 0
+
+    for i in range(iterations):
+        # 1. ストリーミングと一括処理の一致（重なり幅を超える長さで境界を跨がせる）
+        text = _random_text(rng, rng.randint(0, 4 * DEFAULT_STREAM_OVERLAP))
+        expected = scanner.mask(text)
+        chunks, pos = [], 0
+        while pos < len(text):
+            step = rng.randint(1, 1500)
+            chunks.append(text[pos:pos + step])
+            pos += step
+        streamed = "".join(scanner.mask_stream(chunks))
+        if streamed != expected:
+            failures += 1
+            print(f"[stream mismatch] iteration={i} len={len(text)}", file=sys.stderr)
+
+        # 2. 埋め込んだPIIが残らない
+        pii = rng.choice(_PLANTED)
+        planted = rng.choice(_NOISE) + pii + rng.choice(_NOISE)
+        masked = scanner.mask(rng.choice(_NOISE) * rng.randint(0, 3) + planted)
+        if pii in masked:
+            failures += 1
+            print(f"[not masked] {planted!r} -> {masked!r}", file=sys.stderr)
+
+    return failures
+
+
+def _per_kb(func: Callable[[str], str], text: str) -> float:
+    """1KBあたりの処理時間（マイクロ秒）."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(text.encode("utf-8")) / 1024) * 1e6
+
+
+def bench(sizes: list[int], legacy: bool) -> None:
+    """敵対的入力ごとに、入力長を変えて1KBあたりの処理時間を表示する."""
+    scanner = PiiScanner(["山田太郎", "佐藤花子"])
+    header = " ".join(f"{size // 1024:>8}KB" for size in sizes)
+    print(f"{'input':<16}{'impl':<8}{header}   (µs/KB)")
+    for name, make in ADVERSARIAL.items():
+        texts = [make(size) for size in sizes]
+        impls = [("scanner", scanner.mask)] + ([("legacy", legacy_mask)] if legacy else [])
+        for label, func in impls:
+            row = " ".join(f"{_per_kb(func, text):10.1f}" for text in texts)
+            print(f"{name:<16}{label:<8}{row}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PIIマスクのファズテスト・ベンチマーク")
+    parser.add_argument("--fuzz", type=int, default=0, help="ファズテストの反復回数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sizes",
+        default="10240,102400,1048576",
+        help="ベンチマークの入力長（文字数、カンマ区切り）",
+    )
+    parser.add_argument(
+        "--legacy", action="store_true", help="旧実装も測る（大きな入力では非常に遅い場合あり）"
+    )
+    args = parser.parse_args()
+
+    if args.fuzz:
+        failures = fuzz(args.fuzz, args.seed)
+        print(f"fuzz: {args.fuzz}件中 {failures}件失敗")
+        sys.exit(1 if failures else 0)
+
+    bench([int(size) for size in args.sizes.split(",")], args.legacy)
+
+
+if __name__ == "__main__":
+    main()
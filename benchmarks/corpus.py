@@ -0,0 +1,105 @@
+"""ベンチマーク用の合成データ（日本語の案件票・JobSpec・履歴）."""
+
+from __future__ import annotations
+
+import random
+
+from src.schema import JobSpec, Rate
+
+_COMPANIES = ["株式会社テックイノベーション", "株式会社サンプルテック", "合同会社データワークス", "株式会社クラウドリンク"]
+_ROLES = ["バックエンドエンジニア", "データエンジニア", "SRE", "フロントエンドエンジニア", "PM"]
+_STACK = [
+    "Python", "Go", "TypeScript", "React", "AWS", "GCP", "Terraform", "Kubernetes",
+    "PostgreSQL", "MySQL", "Airflow", "Spark", "Django", "FastAPI", "Docker", "BigQuery",
+]
+_LOCATIONS = ["東京都渋谷区", "東京都港区", "大阪府大阪市", "福岡県福岡市", "フルリモート"]
+_TASKS = [
+    "データパイプラインの設計・実装",
+    "既存バッチのリファクタリング",
+    "APIの設計・開発",
+    "インフラのコード化",
+    "監視・アラート設計",
+    "コードレビュー",
+]
+_NOTES = [
+    "服装自由、フレックス制度あり。",
+    "担当者連絡先: taro.yamada@example.co.jp / 090-1234-5678",
+    "稼働は週5日、140-180h/月を想定。",
+    "面談は1回、オンラインで実施予定。",
+    "〒150-0002 東京都渋谷区渋谷2-21-1 にて入館手続きが必要です。",
+]
+
+
+def make_ticket(rng: random.Random, target_bytes: int = 1024) -> str:
+    """【見出し】形式の案件票を、UTF-8でおよそtarget_bytesになるまで生成する."""
+    stack = rng.sample(_STACK, 4)
+    low = rng.randrange(50, 90, 5)
+    lines = [
+        f"【案件名】{stack[0]}{rng.choice(_ROLES)}（{rng.choice(_TASKS)[:6]}）",
+        f"【企業】{rng.choice(_COMPANIES)}",
+        f"【単価】{low}〜{low + rng.randrange(10, 30, 5)}万円/月",
+        f"【勤務地】{rng.choice(_LOCATIONS)}（週{rng.randint(1, 3)}出社）",
+        "【開始】2024年2月〜",
+        "【期間】長期（6ヶ月以上想定）",
+        f"【面談】{rng.randint(1, 3)}回",
+        "【稼働】週5日、140-180h/月",
+        "【契約】業務委託",
+        "",
+        "【必須スキル】",
+        *(f"・{kw} 3年以上" for kw in stack[:2]),
+        "",
+        "【歓迎スキル】",
+        *(f"・{kw}の実務経験" for kw in stack[2:]),
+        "",
+        "【業務内容】",
+    ]
+    text = "\n".join(lines)
+    size = len(text.encode("utf-8"))
+    extra: list[str] = []
+    while size < target_bytes:
+        line = f"・{rng.choice(_TASKS)}（{rng.choice(_STACK)}）\n{rng.choice(_NOTES)}"
+        extra.append(line)
+        size += len(line.encode("utf-8")) + 1
+    return text + "\n" + "\n".join(extra)
+
+
+def make_corpus(count: int, target_bytes: int = 1024, seed: int = 0) -> list[str]:
+    """案件票をcount件生成する（seedが同じなら同じ内容）."""
+    rng = random.Random(seed)
+    return [make_ticket(rng, target_bytes) for _ in range(count)]
+
+
+def make_jobspec(rng: random.Random) -> JobSpec:
+    """すべての主要フィールドが埋まったJobSpecを生成する."""
+    stack = rng.sample(_STACK, rng.randint(3, 8))
+    low = rng.randrange(500_000, 900_000, 50_000)
+    return JobSpec(
+        title=f"{stack[0]}{rng.choice(_ROLES)}",
+        company=rng.choice(_COMPANIES),
+        role=rng.choice(_ROLES),
+        summary="自社SaaSプロダクトのデータ基盤刷新プロジェクト。",
+        must_requirements=[f"{kw} 3年以上" for kw in stack[:2]],
+        nice_to_have=[f"{kw}の実務経験" for kw in stack[2:4]],
+        tasks=rng.sample(_TASKS, 3),
+        stack_keywords=stack,
+        location=rng.choice(_LOCATIONS),
+        remote_type=rng.choice(["full_remote", "hybrid", "on_site"]),
+        rate=Rate(min=low, max=low + 200_000, unit="monthly"),
+        start_date="2024年2月〜",
+        duration="長期",
+        interview_count=rng.randint(1, 3),
+        working_hours="週5日、140-180h/月",
+        contract_type="業務委託",
+        notes=rng.choice(_NOTES),
+        risks_or_unknowns=["チーム構成が不明"],
+    )
+
+
+def make_history(count: int, seed: int = 0) -> list[dict]:
+    """サイドバーの履歴と同じ形のエントリをcount件生成する."""
+    rng = random.Random(seed)
+    history = []
+    for i in range(count):
+        job = make_jobspec(rng)
+        history.append({"id": i, "title": job.title, "timestamp": "00:00", "job": job})
+    return history
@@ -0,0 +1,211 @@
+"""LLMを使わない決定的な処理のマイクロベンチマーク.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.2
+
+--baseline を指定すると中央値を比較し、閾値を超えて遅くなったものがあれば
+終了コード1で終わる（デプロイ前チェック用）.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from benchmarks.corpus import make_corpus, make_history, make_jobspec
+from src.llm.prompts import STRUCTURE_USER_TEMPLATE
+from src.pipeline.generate import (
+    generate_export_markdown,
+    generate_internal_summary,
+    generate_questions,
+    generate_sales_email,
+    render_many,
+)
+from src.pipeline.semantic import SemanticIndex
+from src.pipeline.similarity import SimilarityIndex, find_similar_jobs
+from src.schema import JobSpec
+from src.storage.history import HistoryStore
+from src.utils.pii import mask_pii
+
+# 1回の計測あたりの目安時間（秒）
+_TARGET_SECONDS = 0.05
+
+_TICKET_SIZES = {"1KB": 1024, "10KB": 10 * 1024, "100KB": 100 * 1024, "1MB": 1024 * 1024}
+_TICKET_COUNTS = [1, 100, 10_000]
+_HISTORY_SIZES = [10, 100, 1_000, 10_000]
+_INDEX_SIZES = [1_000, 10_000, 100_000]
+
+
+def _measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    """1回あたりの所要時間（ミリ秒）の中央値・最小値を測る."""
+    func()  # ウォームアップ
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= _TARGET_SECONDS or number >= 1_000_000:
+            break
+        number *= 10
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def _cases(quick: bool) -> dict[str, Callable[[], object]]:
+    """ベンチマーク名 → 計測対象の関数."""
+    sizes = {k: v for k, v in _TICKET_SIZES.items() if not (quick and v > 100 * 1024)}
+    counts = [n for n in _TICKET_COUNTS if not (quick and n > 100)]
+    history_sizes = [n for n in _HISTORY_SIZES if not (quick and n > 1_000)]
+    index_sizes = [n for n in _INDEX_SIZES if not (quick and n > 10_000)]
+
+    cases: dict[str, Callable[[], object]] = {}
+
+    for label, size in sizes.items():
+        ticket = make_corpus(1, size)[0]
+        masked = mask_pii(ticket)
+        cases[f"mask_pii[{label}]"] = lambda t=ticket: mask_pii(t)
+        cases[f"prompt_format[{label}]"] = lambda t=masked: STRUCTURE_USER_TEMPLATE.format(job_text=t)
+
+    for count in counts:
+        corpus = make_corpus(count, 1024)
+        cases[f"mask_pii_corpus[{count}]"] = lambda c=corpus: [mask_pii(t) for t in c]
+
+    rng = random.Random(0)
+    job = make_jobspec(rng)
+    job_data = job.model_dump()
+    summary = generate_internal_summary(job)
+    email = generate_sales_email(job, tone="丁寧", angle="技術成長")
+    questions = generate_questions(job)
+
+    cases["jobspec_validate"] = lambda: JobSpec.model_validate(job_data)
+    cases["generate_internal_summary"] = lambda: generate_internal_summary(job)
+    cases["generate_sales_email"] = lambda: generate_sales_email(job, tone="丁寧", angle="報酬")
+    cases["generate_questions"] = lambda: generate_questions(JobSpec())
+    cases["generate_export_markdown"] = lambda: generate_export_markdown(
+        job, summary, email, questions
+    )
+
+    # 夜間バッチと同じく、要約・メール（定型文込み）・質問をまとめて生成する
+    for count in counts:
+        jobs = [entry["job"] for entry in make_history(count)]
+        cases[f"render_many[{count}]"] = lambda j=jobs: list(
+            render_many(j, tone="丁寧", angle="報酬", email_template="初回提案")
+        )
+
+    for size in history_sizes:
+        history = make_history(size)
+        cases[f"find_similar_jobs[{size}]"] = lambda h=history: find_similar_jobs(job, h)
+
+        # サイドバー表示（最新20件の一覧と、1件開いたときの読み込み）
+        store = HistoryStore(None)
+        ids = store.add_many(
+            (entry["title"], entry["job"], summary, email, questions) for entry in history
+        )
+        cases[f"history_recent[{size}]"] = lambda s=store: s.recent(limit=20)
+        cases[f"history_open[{size}]"] = lambda s=store, i=ids[0]: s.load_artifacts(i)
+
+    for size in index_sizes:
+        index = SimilarityIndex()
+        for entry in make_history(size):
+            index.add_job(entry["id"], entry["job"])
+        cases[f"similarity_index_exact[{size}]"] = lambda i=index: i.query_job(job, approximate=False)
+        cases[f"similarity_index_lsh[{size}]"] = lambda i=index: i.query_job(job, approximate=True)
+
+        semantic = SemanticIndex()
+        for entry in make_history(size):
+            semantic.add_job(entry["id"], entry["job"])
+        cases[f"semantic_index[{size}]"] = lambda i=semantic: i.query_job(job)
+
+    return cases
+
+
+def run(quick: bool = False, only: str | None = None, repeat: int = 5) -> dict:
+    """全ベンチマークを実行し、結果をdictで返す."""
+    results: dict[str, dict[str, float]] = {}
+    for name, func in _cases(quick).items():
+        if only and only not in name:
+            continue
+        results[name] = _measure(func, repeat)
+        print(f"{name:<36} {results[name]['median_ms']:12.4f} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """ベースラインより threshold 以上遅くなったベンチマークを列挙する."""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or base["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(
+            f"{name:<36} {base['median_ms']:10.4f} → {result['median_ms']:10.4f} ms "
+            f"(x{ratio:.2f}) {status}",
+            file=sys.stderr,
+        )
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="決定的処理のマイクロベンチマーク")
+    parser.add_argument("--quick", action="store_true", help="大きな入力（1MB・1万件）を省く")
+    parser.add_argument("--only", help="名前にこの文字列を含むベンチマークだけ実行")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    parser.add_argument("--output", help="結果JSONの保存先（省略時は標準出力）")
+    parser.add_argument("--baseline", help="比較するベースラインJSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="回帰とみなす悪化率")
+    args = parser.parse_args()
+
+    current = run(quick=args.quick, only=args.only, repeat=args.repeat)
+
+    payload = json.dumps(current, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)}件の性能劣化: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
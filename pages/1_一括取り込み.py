@@ -0,0 +1,185 @@
+"""案件票の一括取り込みページ."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from dotenv import load_dotenv
+load_dotenv()  # .envファイルを読み込み
+
+import streamlit as st
+
+from src.pipeline.intake import (
+    UPLOAD_SUFFIXES,
+    iter_csv,
+    iter_jsonl,
+    read_tickets,
+    record_row,
+    structure_tickets_task,
+)
+from src.ui.cache import job_executor, warm_up
+from src.ui.common import lazy_download_button, session_id
+
+# 実行中に進捗を取りに行く間隔（秒）
+JOB_POLL_INTERVAL = 1.0
+
+REMOTE_LABELS = {"full_remote": "フルリモート", "hybrid": "一部リモート", "on_site": "オンサイト"}
+
+st.set_page_config(
+    page_title="一括取り込み | JobSpec Studio",
+    page_icon="◆",
+    layout="wide",
+)
+
+# Anthropicクライアントの事前接続（プロセス内で初回のみ）
+warm_up()
+
+
+def bulk_owner() -> str:
+    """一括取り込みジョブの持ち主（メインページのジョブ一覧には出さない）."""
+    return f"bulk:{session_id()}"
+
+
+def filter_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """企業・リモート・技術キーワード・単価で絞り込む."""
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 1])
+    with col1:
+        companies = st.multiselect(
+            "企業", sorted({row["company"] for row in rows if row["company"]}), key="bulk_company"
+        )
+    with col2:
+        remote = st.multiselect(
+            "リモート", list(REMOTE_LABELS), format_func=REMOTE_LABELS.get, key="bulk_remote"
+        )
+    with col3:
+        keywords = st.multiselect(
+            "技術キーワード（すべて含む）",
+            sorted({kw for row in rows for kw in row["stack_keywords"]}),
+            key="bulk_keywords",
+        )
+    with col4:
+        min_rate = st.number_input(
+            "単価（円）以上", min_value=0, step=50_000, value=0, key="bulk_min_rate"
+        )
+
+    def keep(row: dict[str, Any]) -> bool:
+        if companies and row["company"] not in companies:
+            return False
+        if remote and row["remote_type"] not in remote:
+            return False
+        if keywords and not set(keywords) <= set(row["stack_keywords"]):
+            return False
+        if min_rate and (row["rate_max"] or row["rate_min"] or 0) < min_rate:
+            return False
+        return True
+
+    return [row for row in rows if keep(row)]
+
+
+def render_bulk_job(polling: bool) -> None:
+    """一括取り込みの進捗と結果の表（実行中は一定間隔で再実行する）."""
+    executor = job_executor()
+    jobs = executor.jobs(owner=bulk_owner())
+    if not jobs:
+        return
+    job = jobs[-1]
+    if polling and job.finished:
+        # 完了したら一定間隔の再実行を止める
+        st.rerun()
+
+    if job.status == "queued":
+        st.caption(f"⏳ {job.label} — 待ち {executor.queue_position(job.id) or '-'} 番目")
+        return
+    if job.status == "failed":
+        st.error(f"{job.label}: エラーが発生しました: {job.error}")
+        return
+    if job.status == "cancelled":
+        return
+
+    # 実行中の partial はジョブが追記し続けるリストなので、この時点までの分を複製して使う
+    records = job.result if job.status == "done" else list(job.partial or [])
+    if job.status == "running":
+        st.progress(job.progress, text=f"{job.label} — {job.message}")
+
+    rows = [record_row(record) for record in records]
+    failed = sum(1 for record in records if not record["ok"])
+    st.markdown(f"**{len(records)}件**（失敗 {failed}件）")
+
+    shown = filter_rows(rows)
+    st.dataframe(
+        shown,
+        column_config={
+            "rate_min": st.column_config.NumberColumn("rate_min", format="%d"),
+            "rate_max": st.column_config.NumberColumn("rate_max", format="%d"),
+            "stack_keywords": st.column_config.ListColumn("stack_keywords"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    if job.status == "done":
+        stamp = datetime.now().strftime("%Y%m%d_%H%M")
+        dl_col1, dl_col2, _ = st.columns([1, 1, 2])
+        with dl_col1:
+            lazy_download_button(
+                "📥 JSONL（全件）",
+                lambda: "".join(iter_jsonl(records)),
+                f"jobspec_bulk_{stamp}.jsonl",
+                "application/jsonl",
+            )
+        with dl_col2:
+            lazy_download_button(
+                "📥 CSV（表示中）",
+                lambda: "".join(iter_csv(shown)),
+                f"jobspec_bulk_{stamp}.csv",
+                "text/csv",
+            )
+
+
+st.markdown("# ◆ 一括取り込み")
+st.markdown(
+    '<p style="color: #64748b; margin-top: -1rem; margin-bottom: 2rem; font-size: 0.9rem;">'
+    "CSV / XLSX / ZIP の案件票をまとめて構造化します"
+    "</p>",
+    unsafe_allow_html=True,
+)
+
+uploaded = st.file_uploader(
+    "案件票ファイル",
+    type=[suffix.lstrip(".") for suffix in UPLOAD_SUFFIXES],
+    help="CSV/XLSXは `text`（または `本文`）列を1行1件、ZIPは中の .txt / .md を1ファイル1件として読みます",
+)
+
+col1, col2, col3 = st.columns([1, 1, 1])
+with col1:
+    angle = st.selectbox("提案角度", options=["採用穴埋め", "短期伴走", "まずは要件整理"], index=0)
+with col2:
+    tone = st.selectbox("トーン", options=["丁寧", "端的"], index=0)
+with col3:
+    st.markdown('<div style="height: 1.75rem"></div>', unsafe_allow_html=True)
+    start = st.button(
+        "一括構造化 →", type="primary", use_container_width=True, disabled=uploaded is None
+    )
+
+if start and uploaded is not None:
+    try:
+        tickets = read_tickets(uploaded.name, uploaded.getvalue())
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        if tickets:
+            # 前回の結果は新しい取り込みで置き換える
+            for old in job_executor().jobs(owner=bulk_owner()):
+                job_executor().discard(old.id)
+            job_executor().submit(
+                structure_tickets_task(tickets, tone=tone, angle=angle),
+                owner=bulk_owner(),
+                label=f"{uploaded.name}（{len(tickets)}件）",
+            )
+            st.rerun()
+        else:
+            st.warning("案件票が見つかりませんでした")
+
+pending = any(not job.finished for job in job_executor().jobs(owner=bulk_owner())[-1:])
+st.fragment(render_bulk_job, run_every=JOB_POLL_INTERVAL if pending else None)(pending)
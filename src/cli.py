@@ -0,0 +1,254 @@
+"""案件票を一括で構造化するコマンドラインツール.
+
+    # ディレクトリ内の .txt / .md を処理
+    python -m src.cli tickets/ --output results.jsonl --checkpoint results.ckpt
+
+    # グロブ指定
+    python -m src.cli "dumps/2024-*/*.txt" -o results.jsonl
+
+    # 標準入力のJSONL（1行1件: {"id": ..., "text": ...}）
+    cat tickets.jsonl | python -m src.cli - -o results.jsonl
+
+結果は完了した順にJSONLで書き出す. --checkpoint を指定すると完了済みのIDを記録し、
+中断後に同じコマンドを再実行すると完了済みの案件はLLMを呼ばずに読み飛ばす.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from src.pipeline.records import TICKET_SUFFIXES, build_record
+from src.pipeline.similarity import SimilarityIndex
+from src.pipeline.structure import DEFAULT_MAX_WORKERS, iter_structure_jobs
+from src.schema import JobSpec
+
+
+def iter_tickets(sources: list[str], stdin: IO[str] | None = None) -> Iterator[tuple[str, str]]:
+    """入力元から (ID, 本文) を順に読み出す.
+
+    Args:
+        sources: ディレクトリ・ファイル・グロブのいずれか。"-" は標準入力のJSONL
+        stdin: "-" のときに読むストリーム（省略時は sys.stdin）
+
+    Yields:
+        (ID, 本文)。ファイルはパス、JSONLは "id"（なければ行番号）をIDとする
+
+    Raises:
+        ValueError: JSONLの行が不正な場合
+    """
+    for source in sources:
+        if source == "-":
+            yield from _iter_jsonl(stdin or sys.stdin)
+            continue
+
+        path = Path(source)
+        if path.is_dir():
+            paths: Iterable[Path] = sorted(
+                p for p in path.rglob("*") if p.is_file() and p.suffix in TICKET_SUFFIXES
+            )
+        elif path.is_file():
+            paths = [path]
+        else:
+            paths = sorted(Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file())
+
+        for p in paths:
+            yield str(p), p.read_text(encoding="utf-8")
+
+
+def _iter_jsonl(stream: IO[str]) -> Iterator[tuple[str, str]]:
+    """JSONL（1行1件）から (ID, 本文) を読み出す."""
+    for lineno, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            text = record["text"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"標準入力の{lineno}行目が不正です: {e}") from e
+        yield str(record.get("id", lineno)), text
+
+
+def load_checkpoint(path: str | None) -> set[str]:
+    """チェックポイントファイルから完了済みのIDを読み込む."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def load_archive(index: SimilarityIndex, path: str) -> int:
+    """過去の出力JSONLを類似案件検索のインデックスに読み込む.
+
+    Returns:
+        読み込んだ件数
+    """
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("ok") and record.get("job"):
+                index.add_job(record["id"], JobSpec.model_validate(record["job"]))
+                count += 1
+    return count
+
+
+def _similar(
+    index: SimilarityIndex, ticket_id: str, job: JobSpec, top_k: int
+) -> list[dict[str, Any]]:
+    """インデックス済みの案件から類似案件を探し、この案件もインデックスに加える."""
+    similar = [
+        {"id": job_id, "score": round(score, 4), "common_keywords": common}
+        for job_id, score, common in index.query_job(job, top_k=top_k, exclude=[ticket_id])
+    ]
+    index.add_job(ticket_id, job)
+    return similar
+
+
+def run(
+    tickets: Iterable[tuple[str, str]],
+    output: IO[str],
+    checkpoint: str | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    use_cache: bool = True,
+    tone: str = "丁寧",
+    angle: str = "採用穴埋め",
+    similar_top: int = 0,
+    index: SimilarityIndex | None = None,
+) -> tuple[int, int, int]:
+    """案件票を並列に構造化し、完了した順にJSONLへ書き出す.
+
+    失敗した案件はチェックポイントに記録しないため、再実行時にもう一度処理される.
+
+    Args:
+        tickets: (ID, 本文) のイテレータ（遅延的に読み出す）
+        output: 結果を書き出すストリーム
+        checkpoint: 完了済みIDを記録するファイル（Noneなら記録しない）
+        max_workers: 並列実行するスレッド数
+        use_cache: Falseなら構造化キャッシュを使わない
+        tone: 提案メールのトーン
+        angle: 提案メールの提案角度
+        similar_top: 0より大きければ、各結果にそれまでに処理した案件からの類似案件を付ける
+        index: 類似案件検索に使うインデックス（省略時は空から始める）
+
+    Returns:
+        (成功件数, 失敗件数, 読み飛ばした件数)
+    """
+    done = load_checkpoint(checkpoint)
+    # 処理中の案件だけ index → ID を保持する
+    in_flight: dict[int, str] = {}
+    skipped = 0
+
+    def texts() -> Iterator[str]:
+        nonlocal skipped
+        position = 0
+        for ticket_id, text in tickets:
+            if ticket_id in done:
+                skipped += 1
+                continue
+            in_flight[position] = ticket_id
+            position += 1
+            yield text
+
+    if similar_top > 0 and index is None:
+        index = SimilarityIndex()
+
+    succeeded = failed = 0
+    ckpt = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    try:
+        for result in iter_structure_jobs(texts(), max_workers=max_workers, use_cache=use_cache):
+            ticket_id = in_flight.pop(result.index)
+            record = build_record(ticket_id, result, tone=tone, angle=angle)
+            if similar_top > 0 and result.ok:
+                record["similar"] = _similar(index, ticket_id, result.job, similar_top)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+            if result.ok:
+                succeeded += 1
+                # 結果を書き出してから完了を記録する（中断時は重複はあっても欠落はしない）
+                if ckpt is not None:
+                    ckpt.write(ticket_id + "\n")
+                    ckpt.flush()
+            else:
+                failed += 1
+                print(f"[error] {ticket_id}: {result.error}", file=sys.stderr)
+    finally:
+        if ckpt is not None:
+            ckpt.close()
+
+    return succeeded, failed, skipped
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="案件票を一括で構造化し、結果をJSONLで出力する",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        default=["-"],
+        help="ディレクトリ・ファイル・グロブ。\"-\" または省略で標準入力のJSONL",
+    )
+    parser.add_argument("-o", "--output", help="出力先JSONL（省略時は標準出力）")
+    parser.add_argument("--checkpoint", help="完了済みIDの記録先（再実行時に読み飛ばす）")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=DEFAULT_MAX_WORKERS, help="並列数"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="構造化キャッシュを使わない")
+    parser.add_argument("--tone", default="丁寧", help="提案メールのトーン")
+    parser.add_argument("--angle", default="採用穴埋め", help="提案メールの提案角度")
+    parser.add_argument(
+        "--similar-top", type=int, default=0, help="各結果に付ける類似案件の件数（0で無効）"
+    )
+    parser.add_argument(
+        "--archive",
+        action="append",
+        default=[],
+        help="類似案件の検索対象に加える過去の出力JSONL（複数指定可）",
+    )
+    args = parser.parse_args(argv)
+
+    index = None
+    if args.similar_top > 0:
+        index = SimilarityIndex()
+        # 再開時は既存の出力も検索対象にする
+        archives = [*args.archive]
+        if args.output and os.path.exists(args.output):
+            archives.append(args.output)
+        for path in archives:
+            load_archive(index, path)
+
+    # 再開時に既存の結果を消さないよう追記で開く
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        succeeded, failed, skipped = run(
+            iter_tickets(args.sources),
+            output,
+            checkpoint=args.checkpoint,
+            max_workers=args.workers,
+            use_cache=not args.no_cache,
+            tone=args.tone,
+            angle=args.angle,
+            similar_top=args.similar_top,
+            index=index,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"完了: 成功 {succeeded} 件 / 失敗 {failed} 件 / スキップ {skipped} 件", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
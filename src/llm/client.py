@@ -1,9 +1,88 @@
-"""LLMクライアント（本番/モック切替対応）."""
+"""LLMクライアント（本番/モック切替対応）.
+
+モードは環境変数 JOBSPEC_LLM_MODE で指定する（"live" | "mock" | "auto"）.
+auto（既定）はAPIキーがあれば本番、なければモック.
+本番モードでのAPIエラーはモックに切り替えず、リトライ後にLLMErrorを送出する.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import sys
+import threading
+import time
+import weakref
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+from src.llm.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Counters,
+    LLMError,
+    TokenBucket,
+    backoff_delay,
+)
+from src.utils.instrumentation import annotate
+
+# 使用モデル
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+
+# クライアント設定（環境変数で上書き可能）
+_CLIENT_DEFAULTS = {
+    "max_connections": ("ANTHROPIC_MAX_CONNECTIONS", 20),
+    "max_keepalive_connections": ("ANTHROPIC_MAX_KEEPALIVE", 20),
+    "keepalive_expiry": ("ANTHROPIC_KEEPALIVE_EXPIRY", 30.0),
+    "timeout": ("ANTHROPIC_TIMEOUT", 60.0),
+    "connect_timeout": ("ANTHROPIC_CONNECT_TIMEOUT", 5.0),
+    "max_concurrency": ("ANTHROPIC_MAX_CONCURRENCY", 16),
+    "requests_per_minute": ("ANTHROPIC_RPM", 0.0),
+    "tokens_per_minute": ("ANTHROPIC_TPM", 0.0),
+    "max_retries": ("ANTHROPIC_MAX_RETRIES", 4),
+    "backoff_base": ("ANTHROPIC_BACKOFF_BASE", 1.0),
+    "backoff_cap": ("ANTHROPIC_BACKOFF_CAP", 30.0),
+    "breaker_threshold": ("ANTHROPIC_BREAKER_THRESHOLD", 5),
+    "breaker_reset": ("ANTHROPIC_BREAKER_RESET", 30.0),
+}
+
+# リトライ対象のHTTPステータス（5xxは別途すべて対象）
+_RETRYABLE_STATUS = {408, 409, 429}
+
+_client_lock = threading.Lock()
+_client: Any = None
+_http_client: Any = None
+_client_key: str | None = None
+_client_options: dict[str, Any] = {}
+_warmed_up = False
+
+# 非同期クライアント・同時実行セマフォはイベントループごとに保持する
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[str, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+# レート制御・ブレーカー（configure_clientで作り直す）
+_request_bucket: TokenBucket | None = None
+_token_bucket: TokenBucket | None = None
+_breaker: CircuitBreaker | None = None
+
+_stats = Counters(
+    "requests",
+    "retries",
+    "throttled",
+    "rate_limited",
+    "failures",
+    "breaker_trips",
+    "breaker_rejections",
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
 
 
 def _get_api_key() -> str | None:
@@ -73,65 +152,654 @@ _MOCK_RESPONSE = {
 }
 
 
+def get_llm_mode() -> str:
+    """現在のLLMモードを返す（"live" | "mock"）."""
+    mode = os.environ.get("JOBSPEC_LLM_MODE", "auto").lower()
+    if mode in ("live", "mock"):
+        return mode
+    return "live" if _get_api_key() else "mock"
+
+
 def is_api_available() -> bool:
     """Claude APIが利用可能かチェック."""
-    return bool(_get_api_key())
+    return get_llm_mode() == "live"
+
 
+def get_llm_stats() -> dict[str, int]:
+    """リクエスト・リトライ・スロットル・ブレーカー作動の累計回数と、
+    トークン使用量（プロンプトキャッシュの読み書きを含む）を返す."""
+    return _stats.snapshot()
 
-def call_claude(prompt: str, max_tokens: int = 4096) -> str:
-    """Claude APIを呼び出す（本番/モック自動切替）.
+
+def _setting(name: str) -> Any:
+    """クライアント設定値を取得（configure_client > 環境変数 > 既定値）."""
+    if name in _client_options:
+        return _client_options[name]
+    env_name, default = _CLIENT_DEFAULTS[name]
+    raw = os.environ.get(env_name)
+    if raw is None:
+        return default
+    return type(default)(raw)
+
+
+def configure_client(**options: Any) -> None:
+    """共有クライアントの設定を変更する.
+
+    次回の get_client() / get_async_client() 呼び出しで新しい設定のクライアントが作られる.
 
     Args:
-        prompt: プロンプト文字列
-        max_tokens: 最大トークン数
+        **options: max_connections, max_keepalive_connections,
+            keepalive_expiry, timeout, connect_timeout, max_concurrency,
+            requests_per_minute, tokens_per_minute, max_retries, backoff_base,
+            backoff_cap, breaker_threshold, breaker_reset のいずれか
+    """
+    unknown = set(options) - set(_CLIENT_DEFAULTS)
+    if unknown:
+        raise ValueError(f"不明な設定です: {', '.join(sorted(unknown))}")
+
+    global _client, _client_key, _warmed_up, _request_bucket, _token_bucket, _breaker
+    with _client_lock:
+        _client_options.update(options)
+        old_client = _client
+        _client = None
+        _client_key = None
+        _warmed_up = False
+        _async_clients.clear()
+        _semaphores.clear()
+        _request_bucket = None
+        _token_bucket = None
+        _breaker = None
+
+    if old_client is not None:
+        old_client.close()
+
+
+def _http_options() -> dict[str, Any]:
+    """HTTPクライアントに渡す接続プール・タイムアウト設定.
+
+    トランスポート（httpx系）はanthropicのバージョンで入れ替わるため直接importせず,
+    SDKが公開する既定のLimits・Timeoutの型から組み立てる.
+    """
+    from anthropic import DEFAULT_CONNECTION_LIMITS, Timeout
+
+    limits_type = type(DEFAULT_CONNECTION_LIMITS)
+    return {
+        "limits": limits_type(
+            max_connections=_setting("max_connections"),
+            max_keepalive_connections=_setting("max_keepalive_connections"),
+            keepalive_expiry=_setting("keepalive_expiry"),
+        ),
+        "timeout": Timeout(
+            _setting("timeout"),
+            connect=_setting("connect_timeout"),
+        ),
+    }
+
+
+def get_client() -> Any:
+    """プロセス共通のAnthropicクライアントを取得する.
+
+    接続プールとkeep-aliveを持つhttpxクライアントを1つだけ生成し,
+    Streamlitの各セッション・ワーカースレッドから共有する.
 
     Returns:
-        レスポンス文字列
+        Anthropicクライアント（APIキー未設定時はNone）
     """
+    global _client, _http_client, _client_key
+
     api_key = _get_api_key()
+    if not api_key:
+        return None
 
-    if api_key:
-        # 本番モード
-        try:
-            from anthropic import Anthropic
+    client = _client
+    if client is not None and _client_key == api_key:
+        return client
+
+    with _client_lock:
+        if _client is not None and _client_key == api_key:
+            return _client
+
+        from anthropic import Anthropic, DefaultHttpxClient
+
+        http_options = _http_options()
+        http_client = DefaultHttpxClient(**http_options)
+        old_client = _client
+        # リトライは_call_with_retriesで行うため、SDK側のリトライは無効にする
+        _client = Anthropic(api_key=api_key, http_client=http_client, max_retries=0)
+        _http_client = http_client
+        _client_key = api_key
+
+    if old_client is not None:
+        old_client.close()
+    return _client
+
+
+def get_async_client() -> Any:
+    """実行中のイベントループ用の共有AsyncAnthropicクライアントを取得する.
+
+    httpxの非同期接続はループに紐づくため、ループごとに1つ生成して再利用する.
+    イベントループ内から呼ぶこと.
+
+    Returns:
+        AsyncAnthropicクライアント（APIキー未設定時はNone）
+    """
+    api_key = _get_api_key()
+    if not api_key:
+        return None
+
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        entry = _async_clients.get(loop)
+        if entry is not None and entry[0] == api_key:
+            return entry[1]
+
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+        http_options = _http_options()
+        client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(**http_options),
+            max_retries=0,
+        )
+        _async_clients[loop] = (api_key, client)
+    return client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """実行中のイベントループ用の同時実行数セマフォを取得する."""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(_setting("max_concurrency"))
+            _semaphores[loop] = semaphore
+    return semaphore
+
+
+def _get_limits() -> tuple[TokenBucket, TokenBucket, CircuitBreaker]:
+    """レート制御用のバケットとブレーカーを取得する."""
+    global _request_bucket, _token_bucket, _breaker
 
-            client = Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": prompt}],
+    with _client_lock:
+        if _request_bucket is None or _token_bucket is None or _breaker is None:
+            _request_bucket = TokenBucket(_setting("requests_per_minute"))
+            _token_bucket = TokenBucket(_setting("tokens_per_minute"))
+            _breaker = CircuitBreaker(
+                failure_threshold=_setting("breaker_threshold"),
+                reset_timeout=_setting("breaker_reset"),
             )
-            return response.content[0].text
-        except ImportError:
-            # anthropicライブラリがない場合はモックにフォールバック
-            pass
+        return _request_bucket, _token_bucket, _breaker
+
+
+def warm_up_client(background: bool = True) -> None:
+    """共有クライアントを生成し、APIホストへの接続を事前に張っておく.
+
+    起動時に1度だけ呼べばよい（2回目以降は何もしない）.
+    接続に失敗しても例外は送出しない.
+
+    Args:
+        background: Trueなら別スレッドで接続を張り、呼び出し元をブロックしない
+    """
+    global _warmed_up
+
+    with _client_lock:
+        if _warmed_up:
+            return
+        _warmed_up = True
+
+    def _warm() -> None:
+        client = get_client()
+        if client is None:
+            return
+        try:
+            # 認証不要のHEADでTLSハンドシェイクだけ済ませ、プールに接続を残す
+            _http_client.head(str(client.base_url))
         except Exception:
-            # API エラー時もモックにフォールバック
             pass
 
-    # モックモード
+    if background:
+        threading.Thread(target=_warm, name="anthropic-warmup", daemon=True).start()
+    else:
+        _warm()
+
+
+# モックのストリーミングで1回に返す文字数
+_MOCK_STREAM_CHUNK = 16
+
+
+def _message_request(
+    prompt: str,
+    max_tokens: int,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+    tool: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Messages APIへのリクエストパラメータを組み立てる.
+
+    systemはプロンプトキャッシュ対象のブロックとして送る
+    （モデルごとの最小長に満たない場合、キャッシュはAPI側で無視される）.
+    toolを指定した場合はそのツールの呼び出しを強制する.
+    """
+    request: dict[str, Any] = {
+        "model": CLAUDE_MODEL,
+        "max_tokens": max_tokens,
+        "messages": [*(history or ()), {"role": "user", "content": prompt}],
+    }
+    if system:
+        request["system"] = [
+            {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+        ]
+    if tool:
+        request["tools"] = [tool]
+        request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+    return request
+
+
+def _mock_text() -> str:
+    """モックモードのレスポンス文字列."""
     return json.dumps(_MOCK_RESPONSE, ensure_ascii=False)
 
 
-def rewrite_text(text: str, instruction: str) -> str:
-    """テキストをLLMでリライトする.
+def _mock_chunks(text: str) -> Iterator[str]:
+    """モックのストリーミング: 一定長ずつに区切って返す."""
+    for start in range(0, len(text), _MOCK_STREAM_CHUNK):
+        yield text[start:start + _MOCK_STREAM_CHUNK]
+
+
+def _tool_input(response: Any, name: str) -> dict[str, Any]:
+    """レスポンスから指定ツールの入力を取り出す."""
+    for block in response.content:
+        if getattr(block, "type", None) == "tool_use" and block.name == name:
+            return dict(block.input)
+    raise LLMError(f"レスポンスに {name} の呼び出しが含まれていません")
+
+
+def _tool_json_deltas(stream: Any) -> Iterator[str]:
+    """ストリームイベントからツール入力のJSON断片を取り出す."""
+    for event in stream:
+        if event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+            yield event.delta.partial_json
+
+
+def _estimate_tokens(request: dict[str, Any]) -> int:
+    """入力トークン数の概算（日本語主体のため2文字≒1トークンとみなす）."""
+    chars = sum(len(block["text"]) for block in request.get("system", ()))
+    chars += sum(len(json.dumps(tool, ensure_ascii=False)) for tool in request.get("tools", ()))
+    for message in request["messages"]:
+        content = message["content"]
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content))
+    return chars // 2 + 1
+
+
+def _record_usage(usage: Any) -> None:
+    """レスポンスのトークン使用量（キャッシュ読み書きを含む）を集計する.
+
+    計測中の段階があれば、その段階の属性にも記録する.
+    """
+    if usage is None:
+        return
+    counts = {
+        name: getattr(usage, name, None) or 0
+        for name in (
+            "input_tokens",
+            "output_tokens",
+            "cache_creation_input_tokens",
+            "cache_read_input_tokens",
+        )
+    }
+    for name, count in counts.items():
+        _stats.incr(name, count)
+    annotate(**counts)
+
+
+def _require(client: Any) -> Any:
+    """本番モードでクライアントが得られない場合はLLMErrorにする."""
+    if client is None:
+        raise LLMError(
+            "Claude APIクライアントを初期化できません（APIキーを確認してください）"
+        )
+    return client
+
+
+def _retry_after(error: Exception) -> float | None:
+    """レスポンスヘッダのretry-after（秒）を取得する."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        # HTTP-date形式は扱わず、通常のバックオフに任せる
+        pass
+    return None
+
+
+def _before_attempt(tokens: int) -> float:
+    """ブレーカーとレート制限を確認し、送信までの待ち秒数を返す."""
+    request_bucket, token_bucket, breaker = _get_limits()
+    if not breaker.allow():
+        _stats.incr("breaker_rejections")
+        raise CircuitOpenError("Claude APIの障害が続いているため、呼び出しを一時停止しています")
+
+    wait = max(request_bucket.reserve(1), token_bucket.reserve(tokens))
+    if wait > 0:
+        _stats.incr("throttled")
+    _stats.incr("requests")
+    return wait
+
+
+def _after_failure(error: Exception, attempt: int) -> float | None:
+    """失敗を記録し、リトライするなら待ち秒数を、諦めるならNoneを返す."""
+    import anthropic
+
+    _, _, breaker = _get_limits()
+    status = getattr(error, "status_code", None)
+    connection_error = isinstance(error, anthropic.APIConnectionError)
+
+    if status == 429:
+        _stats.incr("rate_limited")
+
+    # 接続障害・5xxのみをプロバイダ障害としてブレーカーに数える
+    if connection_error or (status is not None and status >= 500):
+        if breaker.record_failure():
+            _stats.incr("breaker_trips")
+    else:
+        breaker.record_success()
+
+    retryable = connection_error or status in _RETRYABLE_STATUS or (
+        status is not None and status >= 500
+    )
+    if not retryable or attempt >= _setting("max_retries"):
+        _stats.incr("failures")
+        return None
+
+    _stats.incr("retries")
+    return backoff_delay(
+        attempt,
+        base=_setting("backoff_base"),
+        cap=_setting("backoff_cap"),
+        retry_after=_retry_after(error),
+    )
+
+
+def _call_with_retries(send: Callable[[], Any], tokens: int) -> Any:
+    """レート制御・リトライ・ブレーカーを適用して1回分の送信処理を実行する."""
+    attempt = 0
+    while True:
+        wait = _before_attempt(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            result = send()
+        except Exception as e:
+            delay = _after_failure(e, attempt)
+            if delay is None:
+                raise LLMError(f"Claude APIの呼び出しに失敗しました: {e}") from e
+            time.sleep(delay)
+            attempt += 1
+            continue
+        _get_limits()[2].record_success()
+        return result
+
+
+async def _acall_with_retries(send: Callable[[], Awaitable[Any]], tokens: int) -> Any:
+    """_call_with_retriesの非同期版（同時実行数は送信中のみセマフォで制限）."""
+    attempt = 0
+    while True:
+        wait = _before_attempt(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            async with _get_semaphore():
+                result = await send()
+        except Exception as e:
+            delay = _after_failure(e, attempt)
+            if delay is None:
+                raise LLMError(f"Claude APIの呼び出しに失敗しました: {e}") from e
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        _get_limits()[2].record_success()
+        return result
+
+
+def call_claude(
+    prompt: str,
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> str:
+    """Claude APIを呼び出す（本番/モック切替）.
 
     Args:
-        text: 元のテキスト
-        instruction: リライト指示（例: "より丁寧に", "簡潔に"）
+        prompt: プロンプト文字列（最後のuserターン）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
 
     Returns:
-        リライト後のテキスト
+        レスポンス文字列
+
+    Raises:
+        LLMError: 本番モードでリトライしても呼び出しに失敗した場合
     """
-    api_key = _get_api_key()
+    if get_llm_mode() == "mock":
+        return _mock_text()
+
+    client = _require(get_client())
+    request = _message_request(prompt, max_tokens, system, history)
+    response = _call_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return response.content[0].text
+
+
+def call_claude_tool(
+    prompt: str,
+    tool: dict[str, Any],
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """ツール呼び出しを強制してClaude APIを呼び出し、ツール入力を返す.
+
+    出力はツールの入力スキーマに沿った形で返るため、JSONのパースは不要.
+
+    Args:
+        prompt: プロンプト文字列（最後のuserターン）
+        tool: ツール定義（name / description / input_schema）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
+
+    Returns:
+        ツール入力（モックモードではモック用のサンプル）
+
+    Raises:
+        LLMError: 本番モードで呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        return json.loads(_mock_text())
+
+    client = _require(get_client())
+    request = _message_request(prompt, max_tokens, system, history, tool)
+    response = _call_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return _tool_input(response, tool["name"])
 
-    if api_key:
+
+def _stream_pieces(
+    request: dict[str, Any], pieces: Callable[[Any], Iterator[str]]
+) -> Iterator[str]:
+    """ストリームを開き、piecesで取り出した断片を順に返す.
+
+    最初の断片を受け取るまではリトライ対象、受信途中のエラーはLLMErrorとして送出する.
+    """
+    client = _require(get_client())
+
+    def open_stream() -> tuple[Any, Any, Iterator[str], str]:
+        manager = client.messages.stream(**request)
+        stream = manager.__enter__()
         try:
-            from anthropic import Anthropic
+            chunks = pieces(stream)
+            first = next(chunks, "")
+        except BaseException:
+            manager.__exit__(*sys.exc_info())
+            raise
+        return manager, stream, chunks, first
+
+    manager, stream, chunks, first = _call_with_retries(open_stream, _estimate_tokens(request))
+    try:
+        if first:
+            yield first
+        yield from chunks
+        _record_usage(stream.get_final_message().usage)
+    except Exception as e:
+        raise LLMError(f"Claude APIのストリーミング中にエラーが発生しました: {e}") from e
+    finally:
+        manager.__exit__(None, None, None)
+
+
+def stream_claude(
+    prompt: str,
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> Iterator[str]:
+    """Claude APIをストリーミングで呼び出し、受信したテキスト片を順に返す.
+
+    最初のテキスト片を受け取るまではcall_claudeと同様にリトライする.
+    受信途中のエラーはリトライせずLLMErrorとして送出する.
+
+    Args:
+        prompt: プロンプト文字列（最後のuserターン）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
+
+    Yields:
+        レスポンスのテキスト片
+
+    Raises:
+        LLMError: 本番モードで呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        yield from _mock_chunks(_mock_text())
+        return
+
+    request = _message_request(prompt, max_tokens, system, history)
+    yield from _stream_pieces(request, lambda stream: iter(stream.text_stream))
+
+
+def stream_claude_tool(
+    prompt: str,
+    tool: dict[str, Any],
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> Iterator[str]:
+    """call_claude_toolのストリーミング版. ツール入力のJSON断片を順に返す.
+
+    Args:
+        prompt: プロンプト文字列（最後のuserターン）
+        tool: ツール定義（name / description / input_schema）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
+
+    Yields:
+        ツール入力JSONの断片（連結すると入力全体になる）
+
+    Raises:
+        LLMError: 本番モードで呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        yield from _mock_chunks(_mock_text())
+        return
+
+    request = _message_request(prompt, max_tokens, system, history, tool)
+    yield from _stream_pieces(request, _tool_json_deltas)
 
-            client = Anthropic(api_key=api_key)
 
-            prompt = f"""以下のテキストを「{instruction}」という指示に従ってリライトしてください。
+async def acall_claude(
+    prompt: str,
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> str:
+    """call_claudeの非同期版.
+
+    同時実行数はイベントループごとのセマフォ（max_concurrency）で制限する.
+    タスクをキャンセルすると待機中・通信中のリクエストも中断される.
+
+    Args:
+        prompt: プロンプト文字列（最後のuserターン）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
+
+    Returns:
+        レスポンス文字列
+
+    Raises:
+        LLMError: 本番モードでリトライしても呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        return _mock_text()
+
+    client = _require(get_async_client())
+    request = _message_request(prompt, max_tokens, system, history)
+    response = await _acall_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return response.content[0].text
+
+
+async def acall_claude_tool(
+    prompt: str,
+    tool: dict[str, Any],
+    max_tokens: int = 4096,
+    system: str | None = None,
+    history: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """call_claude_toolの非同期版.
+
+    Args:
+        prompt: プロンプト文字列（最後のuserターン）
+        tool: ツール定義（name / description / input_schema）
+        max_tokens: 最大トークン数
+        system: 全リクエスト共通の指示（プロンプトキャッシュ対象）
+        history: promptより前の会話ターン
+
+    Returns:
+        ツール入力（モックモードではモック用のサンプル）
+
+    Raises:
+        LLMError: 本番モードで呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        return json.loads(_mock_text())
+
+    client = _require(get_async_client())
+    request = _message_request(prompt, max_tokens, system, history, tool)
+    response = await _acall_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return _tool_input(response, tool["name"])
+
+
+def _rewrite_prompt(text: str, instruction: str) -> str:
+    """リライト用プロンプトを組み立てる."""
+    return f"""以下のテキストを「{instruction}」という指示に従ってリライトしてください。
 リライト後のテキストのみを出力してください。説明や前置きは不要です。
 
 ---
@@ -140,16 +808,9 @@ def rewrite_text(text: str, instruction: str) -> str:
 
 リライト後:"""
 
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2048,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            return response.content[0].text.strip()
-        except Exception:
-            pass
 
-    # モックモード: 簡易的なリライト
+def _mock_rewrite(text: str, instruction: str) -> str:
+    """モックモード: 簡易的なリライト."""
     mock_rewrites = {
         "より丁寧に": f"【丁寧版】\n{text}",
         "簡潔に": text[:len(text) // 2] + "...(以下省略)",
@@ -163,3 +824,54 @@ def rewrite_text(text: str, instruction: str) -> str:
 
     return f"【{instruction}版】\n{text}"
 
+
+def rewrite_text(text: str, instruction: str) -> str:
+    """テキストをLLMでリライトする.
+
+    Args:
+        text: 元のテキスト
+        instruction: リライト指示（例: "より丁寧に", "簡潔に"）
+
+    Returns:
+        リライト後のテキスト
+
+    Raises:
+        LLMError: 本番モードでリトライしても呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        return _mock_rewrite(text, instruction)
+
+    client = _require(get_client())
+    prompt = _rewrite_prompt(text, instruction)
+    request = _message_request(prompt, 2048)
+    response = _call_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return response.content[0].text.strip()
+
+
+async def arewrite_text(text: str, instruction: str) -> str:
+    """rewrite_textの非同期版.
+
+    Args:
+        text: 元のテキスト
+        instruction: リライト指示（例: "より丁寧に", "簡潔に"）
+
+    Returns:
+        リライト後のテキスト
+
+    Raises:
+        LLMError: 本番モードでリトライしても呼び出しに失敗した場合
+    """
+    if get_llm_mode() == "mock":
+        return _mock_rewrite(text, instruction)
+
+    client = _require(get_async_client())
+    prompt = _rewrite_prompt(text, instruction)
+    request = _message_request(prompt, 2048)
+    response = await _acall_with_retries(
+        lambda: client.messages.create(**request), _estimate_tokens(request)
+    )
+    _record_usage(response.usage)
+    return response.content[0].text.strip()
@@ -1,47 +1,34 @@
 """LLM用プロンプトテンプレート."""
 
-STRUCTURE_PROMPT_TEMPLATE = """\
+# 全リクエスト共通の指示（systemブロックとしてプロンプトキャッシュの対象にする）
+# 出力の形はツール定義（src.schema.build_jobspec_tool）で指定する
+STRUCTURE_SYSTEM_PROMPT = """\
 あなたは求人情報を構造化するエキスパートです。
-以下の求人テキストを解析し、指定されたJSON形式で出力してください。
+ユーザーが送る求人テキストを解析し、record_job_spec ツールで結果を記録してください。
 
+## 記録ルール（厳守）
+1. 情報が不明・欠損の場合は文字列型はnull、配列型は[]とすること
+2. 値は日本語で埋めること（固有名詞・技術用語は原文のまま可）
+3. 報酬は円単位の数値にすること（例: 70万円 → 700000）
+4. remote_type はフルリモートなら "full_remote"、一部出社なら "hybrid"、常駐なら "on_site"
+5. テキストに書かれていない情報を推測で埋めないこと（不明点は risks_or_unknowns に記載）
+"""
+
+# リクエストごとに変わる部分
+STRUCTURE_USER_TEMPLATE = """\
 ## 入力テキスト
 {job_text}
+"""
 
-## 出力ルール（厳守）
-1. JSONのみを出力すること（説明文・マークダウン記法は禁止）
-2. 指定されたキー以外は絶対に追加しないこと
-3. 情報が不明・欠損の場合は文字列型はnull、配列型は[]とすること
-4. 値は日本語で埋めること（固有名詞・技術用語は原文のまま可）
-5. enumフィールドは指定された値のみ使用すること
-   - remote_type: "full_remote" | "hybrid" | "on_site" | null
-   - rate.unit: "hourly" | "daily" | "monthly" | "yearly" | null
-
-## JSON雛形（キー順序を維持すること）
-{{
-  "title": "案件タイトル",
-  "company": "企業名",
-  "role": "ポジション・役割",
-  "summary": "案件概要（1〜3文）",
-  "must_requirements": ["必須スキル1", "必須スキル2"],
-  "nice_to_have": ["歓迎スキル1", "歓迎スキル2"],
-  "tasks": ["業務内容1", "業務内容2"],
-  "stack_keywords": ["技術キーワード1", "技術キーワード2"],
-  "location": "勤務地",
-  "remote_type": "full_remote",
-  "rate": {{
-    "min": 600000,
-    "max": 800000,
-    "unit": "monthly"
-  }},
-  "start_date": "開始時期（例: 2024年2月〜、即日可）",
-  "duration": "期間（例: 3ヶ月〜、長期）",
-  "interview_count": 2,
-  "working_hours": "稼働時間（例: 週5日、140-180h/月）",
-  "contract_type": "契約形態（例: 業務委託、派遣）",
-  "notes": "備考・特記事項",
-  "risks_or_unknowns": ["不明点1", "懸念点1"]
-}}
-
-## 出力
+# 見出しから抽出済みの項目がある場合にユーザープロンプトへ添える（ツールも不足項目だけに絞る）
+STRUCTURE_MISSING_FIELDS_NOTE = """\
+## 記録する項目
+{fields}
+（その他の項目は抽出済みのため記録不要です）
 """
 
+# 記録内容が検証に失敗した場合の修正依頼（前回の記録内容をassistantターンとして渡した後に送る）
+STRUCTURE_RETRY_PROMPT = """\
+上記の記録内容はスキーマの検証に失敗しました。
+エラー: {error}
+修正して record_job_spec で記録し直してください。"""
@@ -0,0 +1,164 @@
+"""LLM呼び出しのレート制御・リトライ・サーキットブレーカー."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+
+class LLMError(RuntimeError):
+    """LLM呼び出しに失敗した（リトライ上限到達・設定不備など）."""
+
+
+class CircuitOpenError(LLMError):
+    """サーキットブレーカーが開いているため呼び出しを拒否した."""
+
+
+class TokenBucket:
+    """1分あたりの上限を守るトークンバケット.
+
+    reserve()は不足分を前借りして待ち時間を返すため、
+    同時に待つ呼び出し同士でも到着順に間隔が空く.
+    """
+
+    def __init__(self, per_minute: float, burst: float | None = None) -> None:
+        """バケットを初期化する.
+
+        Args:
+            per_minute: 1分あたりの補充量（0以下なら無制限）
+            burst: バケット容量（省略時は per_minute）
+        """
+        self.per_minute = per_minute
+        self.capacity = burst if burst is not None else per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """amount分を確保し、使用可能になるまでの待ち秒数を返す."""
+        if self.per_minute <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated) * self.per_minute / 60
+            self._level = min(self.capacity, self._level + refill)
+            self._updated = now
+
+            # 容量を超える要求は容量分として扱う（永久に待たないように）
+            self._level -= min(amount, self.capacity)
+            if self._level >= 0:
+                return 0.0
+            return -self._level * 60 / self.per_minute
+
+
+class CircuitBreaker:
+    """連続失敗で呼び出しを一定時間遮断するサーキットブレーカー.
+
+    closed → （連続失敗が閾値に達する）→ open → （reset_timeout経過）→ half_open.
+    half_openでは試行を1件だけ通し、成功すればclosed、失敗すれば再びopen.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """ブレーカーを初期化する.
+
+        Args:
+            failure_threshold: openにする連続失敗回数
+            reset_timeout: openからhalf_openに移るまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """現在の状態（"closed" | "open" | "half_open"）."""
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """呼び出しを通してよいか判定する."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """成功を記録する."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """失敗を記録する.
+
+        Returns:
+            今回の失敗でopenに遷移した場合True
+        """
+        with self._lock:
+            self._failures += 1
+            was_probing = self._probing
+            self._probing = False
+            if was_probing or (
+                self._opened_at is None and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 1.0,
+    cap: float = 30.0,
+    retry_after: float | None = None,
+) -> float:
+    """指数バックオフ（フルジッタ）の待ち秒数を返す.
+
+    Args:
+        attempt: 0始まりのリトライ回数
+        base: 初回の基準秒数
+        cap: 上限秒数
+        retry_after: サーバー指定の待ち秒数（あればこれ以上待つ）
+
+    Returns:
+        待ち秒数
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class Counters:
+    """スレッドセーフな名前付きカウンタ."""
+
+    def __init__(self, *names: str) -> None:
+        self._values = dict.fromkeys(names, 0)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """カウンタを加算する."""
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        """現在値のコピーを返す."""
+        with self._lock:
+            return dict(self._values)
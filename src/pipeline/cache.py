@@ -0,0 +1,243 @@
+"""構造化結果のキャッシュ（メモリLRU + SQLite の2層）."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.llm.client import CLAUDE_MODEL
+from src.llm.prompts import (
+    STRUCTURE_MISSING_FIELDS_NOTE,
+    STRUCTURE_SYSTEM_PROMPT,
+    STRUCTURE_USER_TEMPLATE,
+)
+from src.pipeline.rules import rules_signature
+from src.schema import JobSpec, build_jobspec_tool
+from src.utils.vocabulary import get_vocabulary
+
+# 既定の保存先・上限（環境変数で上書き可能）
+DEFAULT_CACHE_PATH = ".jobspec/structure_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 10_000
+
+
+def fingerprint(*parts: str) -> str:
+    """文字列群から安定したハッシュ値を作る."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _normalize_text(text: str) -> str:
+    """転送・再貼り付けで変わりやすい空白差分を吸収する."""
+    lines = (line.strip() for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class StructureCache:
+    """structure_jobの結果を保持する2層キャッシュ.
+
+    1層目はプロセス内のLRU、2層目はSQLiteファイル.
+    キーはマスク済みテキスト・プロンプト指紋・モデル名のハッシュで、
+    プロンプト（とルール抽出・キーワード辞書の版）が変わると旧エントリは参照されず、起動時に削除される.
+    """
+
+    def __init__(
+        self,
+        prompt_fingerprint: str,
+        model: str,
+        path: str | None = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ) -> None:
+        """キャッシュを初期化する.
+
+        Args:
+            prompt_fingerprint: プロンプトテンプレートの指紋
+            model: モデル名
+            path: SQLiteファイルのパス（Noneまたは空ならメモリのみ）
+            ttl_seconds: エントリの有効期間（秒）
+            max_memory_entries: メモリ層の最大件数
+            max_disk_entries: ディスク層の最大件数
+        """
+        self.prompt_fingerprint = prompt_fingerprint
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+
+        self._db: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS structure_cache ("
+                " key TEXT PRIMARY KEY,"
+                " prompt_fp TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " job_json TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_structure_cache_accessed"
+                " ON structure_cache (accessed_at)"
+            )
+            # プロンプト変更で無効になったエントリと期限切れを掃除
+            self._db.execute(
+                "DELETE FROM structure_cache WHERE prompt_fp != ? OR created_at < ?",
+                (prompt_fingerprint, time.time() - ttl_seconds),
+            )
+            self._db.commit()
+
+    def make_key(self, masked_text: str) -> str:
+        """マスク済みテキストからキャッシュキーを作る."""
+        return fingerprint(self.model, self.prompt_fingerprint, _normalize_text(masked_text))
+
+    def get(self, key: str) -> JobSpec | None:
+        """キャッシュからJobSpecを取得する（なければNone）."""
+        now = time.time()
+
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created_at, job_json = item
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return JobSpec.model_validate_json(job_json)
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created_at, job_json FROM structure_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    created_at, job_json = row
+                    if now - created_at <= self.ttl_seconds:
+                        self._db.execute(
+                            "UPDATE structure_cache SET accessed_at = ? WHERE key = ?",
+                            (now, key),
+                        )
+                        self._db.commit()
+                        self._remember(key, created_at, job_json)
+                        self._stats["disk_hits"] += 1
+                        return JobSpec.model_validate_json(job_json)
+                    self._db.execute("DELETE FROM structure_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats["expired"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, job: JobSpec) -> None:
+        """JobSpecをキャッシュに保存する."""
+        now = time.time()
+        job_json = job.model_dump_json()
+
+        with self._lock:
+            self._remember(key, now, job_json)
+            self._stats["stores"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO structure_cache"
+                    " (key, prompt_fp, created_at, accessed_at, job_json)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, self.prompt_fingerprint, now, now, job_json),
+                )
+                overflow = self._db.execute(
+                    "SELECT COUNT(*) FROM structure_cache"
+                ).fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM structure_cache WHERE key IN ("
+                        " SELECT key FROM structure_cache ORDER BY accessed_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._stats["disk_evictions"] += overflow
+                self._db.commit()
+
+    def clear(self) -> None:
+        """全エントリを削除する（統計はリセットしない）."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM structure_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, int]:
+        """ヒット/ミス等のカウンタを返す."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        return stats
+
+    def _remember(self, key: str, created_at: float, job_json: str) -> None:
+        """メモリ層に格納し、上限を超えたら古い順に追い出す（ロック保持前提）."""
+        self._memory[key] = (created_at, job_json)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+
+_default_cache: StructureCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_structure_cache() -> StructureCache:
+    """プロセス共通のキャッシュを取得する.
+
+    設定は環境変数 JOBSPEC_CACHE_PATH（空文字でメモリのみ）,
+    JOBSPEC_CACHE_TTL, JOBSPEC_CACHE_MEMORY_ENTRIES, JOBSPEC_CACHE_DISK_ENTRIES.
+    """
+    global _default_cache
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = StructureCache(
+                    prompt_fingerprint=fingerprint(
+                        STRUCTURE_SYSTEM_PROMPT,
+                        STRUCTURE_USER_TEMPLATE,
+                        STRUCTURE_MISSING_FIELDS_NOTE,
+                        json.dumps(build_jobspec_tool(), sort_keys=True),
+                        # ルール抽出とキーワードの正規化も結果を変えるため、その版も含める
+                        rules_signature(),
+                        get_vocabulary().signature(),
+                    ),
+                    model=CLAUDE_MODEL,
+                    path=os.environ.get("JOBSPEC_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl_seconds=float(os.environ.get("JOBSPEC_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                    max_memory_entries=int(
+                        os.environ.get("JOBSPEC_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES)
+                    ),
+                    max_disk_entries=int(
+                        os.environ.get("JOBSPEC_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES)
+                    ),
+                )
+    return _default_cache
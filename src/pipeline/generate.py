@@ -1,53 +1,250 @@
-"""JobSpecからテキストを生成するパイプライン（テンプレートベース）."""
+"""JobSpecからテキストを生成するパイプライン（テンプレートベース）.
+
+要約・メールのテンプレートは `{name}` 形式で書き、Template で一度だけ解析して
+差し込み位置で分割しておく（描画は文字列の連結1回）. メールはトーン・訴求軸・メール種別（EMAIL_TEMPLATES）の
+組み合わせごとにコンパイルしたものを使い回す. 案件ごとのフィールドの整形も1回だけで、
+要約とメールで共有する.
+
+    for rendered in render_many(jobs, tone="丁寧", angle="報酬", email_template="初回提案"):
+        write(rendered.summary, rendered.email, rendered.questions)
+"""
 
 from __future__ import annotations
 
+import json
+import string
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+
 from src.schema import JobSpec
+from src.utils.instrumentation import stage, timed
+
 
+class Template:
+    """差し込み位置で分割済みのテンプレート.
 
-def _format_list(items: list[str], default: str = "要確認") -> str:
-    """リストをカンマ区切り文字列に変換."""
-    return "、".join(items) if items else default
+    作成時に `{name}` の位置で分割し、そのままの文字列と差し込み枠（空文字）の並びと、
+    枠の位置・フィールド名の組を作っておく. 描画は並びを複製して枠を埋め、str.join で
+    連結するだけで、テンプレートを解析し直さない.
 
+    Args:
+        source: テンプレート（`{name}` で差し込み、`{{` `}}` で波括弧そのもの）
+
+    Raises:
+        ValueError: `{name!r}` や `{name:>10}` のような書式指定、または名前が不正な場合
+    """
 
-def _format_value(value: str | int | None, default: str = "要確認") -> str:
-    """値を文字列に変換（Noneは「要確認」）."""
-    return str(value) if value is not None else default
+    __slots__ = ("source", "fields", "_parts", "_slots")
+
+    def __init__(self, source: str) -> None:
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                raise ValueError(f"テンプレートの差し込みが不正です: {{{field}}}")
+            slots.append((len(parts), field))
+            parts.append("")
+        self.source = source
+        self.fields = tuple(field for _, field in slots)
+        # 例: ['【案件サマリ】', '', '\n\n■ 企業: ', '', ...] と ((1, 'title'), (3, 'company'), ...)
+        self._parts = parts
+        self._slots = tuple(slots)
+
+    def render(self, fields: Mapping[str, str]) -> str:
+        """フィールドを差し込んだ文字列.
+
+        Raises:
+            KeyError: テンプレートの差し込みに対応するフィールドがない場合
+        """
+        parts = self._parts.copy()
+        for position, name in self._slots:
+            parts[position] = fields[name]
+        return "".join(parts)
+
+
+# メールテンプレート種別（本文の前後に付ける定型文）
+EMAIL_TEMPLATES: dict[str, dict[str, str]] = {
+    "初回提案": {
+        "prefix": "",
+        "suffix": "\n\nご興味がございましたら、詳細をお伝えいたします。\nご検討のほど、よろしくお願いいたします。",
+    },
+    "フォローアップ": {
+        "prefix": "先日ご案内した案件について、改めてご連絡いたします。\n\n",
+        "suffix": "\n\nご状況いかがでしょうか。\nご不明点等ございましたら、お気軽にお申し付けください。",
+    },
+    "リマインド": {
+        "prefix": "お忙しいところ恐れ入ります。\n先日の案件について、リマインドのご連絡です。\n\n",
+        "suffix": "\n\n本案件は他候補者との調整も進んでおります。\nご興味がございましたら、お早めにご連絡いただけますと幸いです。",
+    },
+    "再提案": {
+        "prefix": "以前ご案内した案件について、条件が更新されましたのでご連絡いたします。\n\n",
+        "suffix": "\n\n前回よりも条件が改善されております。\n改めてご検討いただけますと幸いです。",
+    },
+}
+
+_UNKNOWN = "要確認"
+
+_RATE_UNITS = {
+    "hourly": "時給",
+    "daily": "日給",
+    "monthly": "月額",
+    "yearly": "年額",
+}
+
+_REMOTE_LABELS = {
+    "full_remote": "フルリモート",
+    "hybrid": "一部リモート",
+    "on_site": "オンサイト",
+}
+
+# トーン別の挨拶
+_GREETINGS = {
+    "丁寧": "お世話になっております。",
+    "カジュアル": "こんにちは！",
+    "ビジネス": "いつもお世話になっております。",
+}
+_DEFAULT_GREETING = "お世話になっております。"
+
+# 訴求軸別のアピールポイント（{...} は _job_fields のキー）
+_APPEALS = {
+    "技術成長": "技術スタックは{stack_keywords}を中心としており、スキルアップにつながる環境です。",
+    "報酬": "報酬は{rate}となっており、ご経験に見合った待遇をご用意しております。",
+    "リモート": "勤務形態は{remote}で、柔軟な働き方が可能です。",
+}
+_DEFAULT_APPEAL = "魅力的な案件となっております。"
+
+_SUMMARY_TEMPLATE = Template("\n".join([
+    "【案件サマリ】{title}",
+    "",
+    "■ 企業: {company}",
+    "■ ポジション: {role}",
+    "■ 概要: {summary}",
+    "",
+    "■ 必須スキル: {must_requirements}",
+    "■ 歓迎スキル: {nice_to_have}",
+    "■ 業務内容: {tasks}",
+    "■ 技術スタック: {stack_keywords}",
+    "",
+    "■ 勤務地: {location}",
+    "■ リモート: {remote}",
+    "■ 報酬: {rate}",
+    "■ 開始時期: {start_date}",
+    "■ 期間: {duration}",
+    "■ 稼働: {working_hours}",
+    "■ 契約形態: {contract_type}",
+    "■ 面談回数: {interview_count}",
+    "",
+    "■ 備考: {notes}",
+    "■ 不明点・リスク: {risks_or_unknowns}",
+]))
+
+# {greeting} と {appeal} は compile_email_template で置き換える
+_EMAIL_BODY_TEMPLATE = "\n".join([
+    "{greeting}",
+    "",
+    "下記案件のご紹介です。",
+    "",
+    "【{title}】",
+    "企業: {company}",
+    "ポジション: {role}",
+    "",
+    "概要: {summary}",
+    "",
+    "必須スキル: {must_requirements}",
+    "報酬: {rate}",
+    "勤務地: {location}（{remote}）",
+    "開始: {start_date}",
+    "",
+    "{appeal}",
+])
 
 
 def _format_rate(job: JobSpec) -> str:
     """報酬を文字列に変換."""
-    if job.rate is None:
-        return "要確認"
-
-    unit_map = {
-        "hourly": "時給",
-        "daily": "日給",
-        "monthly": "月額",
-        "yearly": "年額",
-    }
-    unit_str = unit_map.get(job.rate.unit or "", "")
-
-    if job.rate.min is not None and job.rate.max is not None:
-        return f"{unit_str}{int(job.rate.min):,}〜{int(job.rate.max):,}円"
-    elif job.rate.min is not None:
-        return f"{unit_str}{int(job.rate.min):,}円〜"
-    elif job.rate.max is not None:
-        return f"{unit_str}〜{int(job.rate.max):,}円"
+    rate = job.rate
+    if rate is None:
+        return _UNKNOWN
+
+    unit_str = _RATE_UNITS.get(rate.unit or "", "")
+    if rate.min is not None and rate.max is not None:
+        return f"{unit_str}{int(rate.min):,}〜{int(rate.max):,}円"
+    elif rate.min is not None:
+        return f"{unit_str}{int(rate.min):,}円〜"
+    elif rate.max is not None:
+        return f"{unit_str}〜{int(rate.max):,}円"
     else:
-        return "要確認"
+        return _UNKNOWN
+
 
+def _job_fields(job: JobSpec) -> dict[str, str]:
+    """テンプレートに差し込むフィールドを1回だけ整形する.
 
-def _format_remote(remote_type: str | None) -> str:
-    """リモートタイプを日本語に変換."""
-    remote_map = {
-        "full_remote": "フルリモート",
-        "hybrid": "一部リモート",
-        "on_site": "オンサイト",
+    値がなければ「要確認」、リストは「、」区切り（空なら「要確認」）.
+    案件ごとに呼ばれるため、関数呼び出しを挟まずに書いている.
+    """
+    unknown = _UNKNOWN
+    interview_count = job.interview_count
+    return {
+        "title": job.title if job.title is not None else unknown,
+        "company": job.company if job.company is not None else unknown,
+        "role": job.role if job.role is not None else unknown,
+        "summary": job.summary if job.summary is not None else unknown,
+        "must_requirements": "、".join(job.must_requirements) if job.must_requirements else unknown,
+        "nice_to_have": "、".join(job.nice_to_have) if job.nice_to_have else unknown,
+        "tasks": "、".join(job.tasks) if job.tasks else unknown,
+        "stack_keywords": "、".join(job.stack_keywords) if job.stack_keywords else unknown,
+        "location": job.location if job.location is not None else unknown,
+        "remote": _REMOTE_LABELS.get(job.remote_type or "", unknown),
+        "rate": _format_rate(job),
+        "start_date": job.start_date if job.start_date is not None else unknown,
+        "duration": job.duration if job.duration is not None else unknown,
+        "working_hours": job.working_hours if job.working_hours is not None else unknown,
+        "contract_type": job.contract_type if job.contract_type is not None else unknown,
+        "interview_count": str(interview_count) if interview_count is not None else unknown,
+        "notes": job.notes if job.notes is not None else unknown,
+        "risks_or_unknowns": (
+            "、".join(job.risks_or_unknowns) if job.risks_or_unknowns else "特になし"
+        ),
     }
-    return remote_map.get(remote_type or "", "要確認")
 
 
+def _escape(text: str) -> str:
+    """定型文をテンプレートに埋め込めるよう波括弧をエスケープする."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=128)
+def compile_email_template(
+    tone: str, angle: str, email_template: str | None = None
+) -> Template:
+    """挨拶・訴求文・前後の定型文を埋め込んだメールのテンプレート.
+
+    トーン・訴求軸・メール種別の組み合わせごとに1回だけコンパイルする.
+
+    Args:
+        tone: トーン
+        angle: 訴求軸
+        email_template: EMAIL_TEMPLATES のキー（Noneなら前後の定型文なし）
+
+    Raises:
+        KeyError: email_template が EMAIL_TEMPLATES にない場合
+    """
+    body = _EMAIL_BODY_TEMPLATE.replace(
+        "{greeting}", _escape(_GREETINGS.get(tone, _DEFAULT_GREETING))
+    ).replace("{appeal}", _APPEALS.get(angle, _escape(_DEFAULT_APPEAL)))
+    if email_template is not None:
+        tmpl = EMAIL_TEMPLATES[email_template]
+        body = _escape(tmpl["prefix"]) + body + _escape(tmpl["suffix"])
+    return Template(body)
+
+
+@timed("generate_internal_summary")
 def generate_internal_summary(job: JobSpec) -> str:
     """社内共有用のサマリを生成する.
 
@@ -57,83 +254,28 @@ def generate_internal_summary(job: JobSpec) -> str:
     Returns:
         社内向けサマリ文字列
     """
-    lines = [
-        f"【案件サマリ】{_format_value(job.title)}",
-        "",
-        f"■ 企業: {_format_value(job.company)}",
-        f"■ ポジション: {_format_value(job.role)}",
-        f"■ 概要: {_format_value(job.summary)}",
-        "",
-        f"■ 必須スキル: {_format_list(job.must_requirements)}",
-        f"■ 歓迎スキル: {_format_list(job.nice_to_have)}",
-        f"■ 業務内容: {_format_list(job.tasks)}",
-        f"■ 技術スタック: {_format_list(job.stack_keywords)}",
-        "",
-        f"■ 勤務地: {_format_value(job.location)}",
-        f"■ リモート: {_format_remote(job.remote_type)}",
-        f"■ 報酬: {_format_rate(job)}",
-        f"■ 開始時期: {_format_value(job.start_date)}",
-        f"■ 期間: {_format_value(job.duration)}",
-        f"■ 稼働: {_format_value(job.working_hours)}",
-        f"■ 契約形態: {_format_value(job.contract_type)}",
-        f"■ 面談回数: {_format_value(job.interview_count)}",
-        "",
-        f"■ 備考: {_format_value(job.notes)}",
-        f"■ 不明点・リスク: {_format_list(job.risks_or_unknowns, '特になし')}",
-    ]
-    return "\n".join(lines)
-
-
-def generate_sales_email(job: JobSpec, tone: str, angle: str) -> str:
+    return _SUMMARY_TEMPLATE.render(_job_fields(job))
+
+
+@timed("generate_sales_email")
+def generate_sales_email(
+    job: JobSpec, tone: str, angle: str, email_template: str | None = None
+) -> str:
     """営業メール文面を生成する.
 
     Args:
         job: 構造化された求人情報
         tone: トーン（例: "丁寧", "カジュアル", "ビジネス"）
         angle: 訴求軸（例: "技術成長", "報酬", "リモート"）
+        email_template: EMAIL_TEMPLATES のキー（指定すれば前後に定型文を付ける）
 
     Returns:
         営業メール文字列
     """
-    # トーン別の挨拶
-    greeting_map = {
-        "丁寧": "お世話になっております。",
-        "カジュアル": "こんにちは！",
-        "ビジネス": "いつもお世話になっております。",
-    }
-    greeting = greeting_map.get(tone, "お世話になっております。")
-
-    # 訴求軸別のアピールポイント
-    if angle == "技術成長":
-        appeal = f"技術スタックは{_format_list(job.stack_keywords)}を中心としており、スキルアップにつながる環境です。"
-    elif angle == "報酬":
-        appeal = f"報酬は{_format_rate(job)}となっており、ご経験に見合った待遇をご用意しております。"
-    elif angle == "リモート":
-        appeal = f"勤務形態は{_format_remote(job.remote_type)}で、柔軟な働き方が可能です。"
-    else:
-        appeal = "魅力的な案件となっております。"
-
-    lines = [
-        greeting,
-        "",
-        f"下記案件のご紹介です。",
-        "",
-        f"【{_format_value(job.title)}】",
-        f"企業: {_format_value(job.company)}",
-        f"ポジション: {_format_value(job.role)}",
-        "",
-        f"概要: {_format_value(job.summary)}",
-        "",
-        f"必須スキル: {_format_list(job.must_requirements)}",
-        f"報酬: {_format_rate(job)}",
-        f"勤務地: {_format_value(job.location)}（{_format_remote(job.remote_type)}）",
-        f"開始: {_format_value(job.start_date)}",
-        "",
-        appeal,
-    ]
-    return "\n".join(lines)
+    return compile_email_template(tone, angle, email_template).render(_job_fields(job))
 
 
+@timed("generate_questions")
 def generate_questions(job: JobSpec) -> list[str]:
     """確認すべき質問リストを生成する.
 
@@ -185,3 +327,89 @@ def generate_questions(job: JobSpec) -> list[str]:
 
     return questions
 
+
+@timed("generate_export_markdown")
+def generate_export_markdown(job: JobSpec, summary: str, email: str, questions: list[str]) -> str:
+    """Markdownエクスポート用テキストを生成."""
+    questions_md = "\n".join(f"- {q}" for q in questions)
+    job_json = json.dumps(job.model_dump(), ensure_ascii=False, indent=2)
+
+    return f"""# 案件レポート: {job.title or "無題"}
+
+生成日時: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+
+---
+
+## 社内要約
+
+{summary}
+
+---
+
+## 提案メール
+
+{email}
+
+---
+
+## ヒアリング質問
+
+{questions_md}
+
+---
+
+## 構造化データ (JSON)
+
+```json
+{job_json}
+```
+"""
+
+
+@dataclass(frozen=True)
+class RenderedJob:
+    """1案件分の生成物."""
+
+    summary: str
+    email: str
+    questions: list[str]
+
+
+def render_job(
+    job: JobSpec, tone: str, angle: str, email_template: str | None = None
+) -> RenderedJob:
+    """1案件の社内要約・営業メール・質問リストをまとめて生成する（フィールドの整形は1回）."""
+    fields = _job_fields(job)
+    with stage("generate_internal_summary"):
+        summary = _SUMMARY_TEMPLATE.render(fields)
+    with stage("generate_sales_email"):
+        email = compile_email_template(tone, angle, email_template).render(fields)
+    return RenderedJob(summary=summary, email=email, questions=generate_questions(job))
+
+
+def render_many(
+    jobs: Iterable[JobSpec], tone: str, angle: str, email_template: str | None = None
+) -> Iterator[RenderedJob]:
+    """複数案件の生成物を順に返す（夜間バッチ用）.
+
+    テンプレートは最初に1回だけ用意し、入力は遅延的に読み出す.
+    計測は generate_internal_summary / generate_sales_email と同じ段階名で案件ごとに行う.
+
+    Args:
+        jobs: 構造化された求人情報（イテレータ可）
+        tone: トーン
+        angle: 訴求軸
+        email_template: EMAIL_TEMPLATES のキー（指定すれば前後に定型文を付ける）
+
+    Yields:
+        入力順の RenderedJob
+    """
+    render_email = compile_email_template(tone, angle, email_template).render
+    render_summary = _SUMMARY_TEMPLATE.render
+    for job in jobs:
+        fields = _job_fields(job)
+        with stage("generate_internal_summary"):
+            summary = render_summary(fields)
+        with stage("generate_sales_email"):
+            email = render_email(fields)
+        yield RenderedJob(summary, email, generate_questions(job))
@@ -0,0 +1,260 @@
+"""アップロードされたファイルからの案件票の一括取り込み.
+
+画面の一括取り込みページで使う. 1ファイルに複数の案件票をまとめて受け取り、
+(ID, 本文) に分解してから並列に構造化する.
+
+- CSV: 本文の列（`text` / `本文` / `案件票` / `body`、なければ1列目）を1行1件. UTF-8（BOM可）かShift_JIS
+- XLSX: 先頭シートをCSVと同じ規則で読む（openpyxl が必要）
+- ZIP: 中の .txt / .md を1ファイル1件、.csv / .xlsx / .jsonl は上の規則で読む.
+  展開後の大きさとファイル数には上限がある（MAX_ZIP_MEMBER_BYTES など）
+- JSONL: 1行1件（`{"id": ..., "text": ...}`）. .txt / .md は1ファイル1件
+
+    tickets = read_tickets("tickets.csv", data)
+    job_id = executor.submit(structure_tickets_task(tickets, tone="丁寧", angle="採用穴埋め"))
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import PurePosixPath
+from typing import Any
+
+from src.pipeline.jobs import ProgressReporter
+from src.pipeline.records import TICKET_SUFFIXES, build_record
+from src.pipeline.structure import DEFAULT_MAX_WORKERS, iter_structure_jobs
+
+# 取り込めるファイルの拡張子
+UPLOAD_SUFFIXES = (".csv", ".xlsx", ".zip", ".jsonl", *TICKET_SUFFIXES)
+
+# 本文・IDとみなす列名（大文字小文字は区別しない）
+TEXT_COLUMNS = ("text", "本文", "案件票", "body")
+ID_COLUMNS = ("id", "案件id", "案件番号")
+
+# 1ファイルから取り込む最大件数
+MAX_TICKETS = 2000
+
+# ZIPから読む上限（展開後の1ファイルの大きさ・合計の大きさ・ファイル数）. 小さなZIPが
+# 展開すると巨大になる場合（zip bomb）にメモリを使い切らないよう、読む前に確かめる
+MAX_ZIP_MEMBER_BYTES = 10 * 1024 * 1024
+MAX_ZIP_TOTAL_BYTES = 100 * 1024 * 1024
+MAX_ZIP_MEMBERS = MAX_TICKETS
+
+# 表に出す列（CSVの列順でもある）
+TABLE_COLUMNS = (
+    "id",
+    "title",
+    "company",
+    "rate_min",
+    "rate_max",
+    "rate_unit",
+    "remote_type",
+    "location",
+    "start_date",
+    "stack_keywords",
+    "error",
+)
+
+
+def _decode(data: bytes) -> str:
+    """UTF-8（BOM可）として読み、だめならShift_JIS（Excelの既定）として読む."""
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp932")
+
+
+def _iter_table(rows: Iterable[list[Any]], source: str) -> Iterator[tuple[str, str]]:
+    """見出し行つきの表から (ID, 本文) を読み出す."""
+    rows = iter(rows)
+    header = [str(cell or "").strip().lower() for cell in next(rows, [])]
+    text_col = next((header.index(c) for c in TEXT_COLUMNS if c in header), 0)
+    id_col = next((header.index(c) for c in ID_COLUMNS if c in header), None)
+    for lineno, row in enumerate(rows, start=2):
+        text = str(row[text_col] or "").strip() if text_col < len(row) else ""
+        if not text:
+            continue
+        ticket_id = row[id_col] if id_col is not None and id_col < len(row) else None
+        yield f"{source}:{ticket_id if ticket_id not in (None, '') else lineno}", text
+
+
+def _iter_xlsx(data: bytes, source: str) -> Iterator[tuple[str, str]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ValueError("XLSXの読み込みには openpyxl が必要です（pip install openpyxl）") from e
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = ([*row] for row in workbook.worksheets[0].iter_rows(values_only=True))
+        yield from _iter_table(rows, source)
+    finally:
+        workbook.close()
+
+
+def _iter_file(name: str, data: bytes) -> Iterator[tuple[str, str]]:
+    """ZIP以外の1ファイルから (ID, 本文) を読み出す."""
+    suffix = PurePosixPath(name).suffix.lower()
+    if suffix == ".csv":
+        yield from _iter_table(csv.reader(io.StringIO(_decode(data))), name)
+    elif suffix == ".xlsx":
+        yield from _iter_xlsx(data, name)
+    elif suffix == ".jsonl":
+        for lineno, line in enumerate(_decode(data).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                text = record["text"]
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                raise ValueError(f"{name} の{lineno}行目が不正です: {e}") from e
+            yield f"{name}:{record.get('id', lineno)}", text
+    elif suffix in TICKET_SUFFIXES:
+        text = _decode(data).strip()
+        if text:
+            yield name, text
+    else:
+        raise ValueError(f"対応していない形式です: {name}")
+
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    """ZIPの1ファイルを展開する（limit バイトを超えるならValueError）."""
+    if info.file_size > limit:
+        raise ValueError(f"{info.filename} は展開後の大きさが上限を超えています")
+    # ヘッダの大きさが偽られていても、limit を超えて展開しない
+    with archive.open(info) as member:
+        data = member.read(limit + 1)
+    if len(data) > limit:
+        raise ValueError(f"{info.filename} は展開後の大きさが上限を超えています")
+    return data
+
+
+def _iter_zip(data: bytes) -> Iterator[tuple[str, str]]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = []
+        for info in sorted(archive.infolist(), key=lambda info: info.filename):
+            path = PurePosixPath(info.filename)
+            # ディレクトリ・macOSのメタデータ・入れ子のZIPは読まない
+            if info.is_dir() or path.parts[0] == "__MACOSX" or path.name.startswith("."):
+                continue
+            if path.suffix.lower() not in UPLOAD_SUFFIXES or path.suffix.lower() == ".zip":
+                continue
+            members.append(info)
+        if len(members) > MAX_ZIP_MEMBERS:
+            raise ValueError(f"ZIPの中のファイルは{MAX_ZIP_MEMBERS}個までです")
+
+        remaining = MAX_ZIP_TOTAL_BYTES
+        for info in members:
+            if info.file_size > remaining:
+                raise ValueError(
+                    f"ZIPの中身が大きすぎます（展開後の合計 {MAX_ZIP_TOTAL_BYTES // (1024 * 1024)}MB まで）"
+                )
+            content = _read_member(archive, info, min(MAX_ZIP_MEMBER_BYTES, remaining))
+            remaining -= len(content)
+            yield from _iter_file(info.filename, content)
+
+
+def read_tickets(name: str, data: bytes, limit: int = MAX_TICKETS) -> list[tuple[str, str]]:
+    """アップロードされたファイルを (ID, 本文) のリストにする.
+
+    Args:
+        name: ファイル名（拡張子で形式を判定する）
+        data: ファイルの内容
+        limit: 取り込む最大件数
+
+    Returns:
+        (ID, 本文) のリスト（ファイル内の順）
+
+    Raises:
+        ValueError: 形式が不正・未対応、または件数が limit を超える場合
+    """
+    try:
+        if PurePosixPath(name).suffix.lower() == ".zip":
+            tickets = _iter_zip(data)
+        else:
+            tickets = _iter_file(name, data)
+        result = []
+        for ticket in tickets:
+            if len(result) >= limit:
+                raise ValueError(f"1回に取り込めるのは{limit}件までです")
+            result.append(ticket)
+        return result
+    except (csv.Error, zipfile.BadZipFile, UnicodeDecodeError) as e:
+        raise ValueError(f"{name} を読み込めません: {e}") from e
+
+
+def structure_tickets_task(
+    tickets: list[tuple[str, str]],
+    tone: str,
+    angle: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Callable[[ProgressReporter], list[dict[str, Any]]]:
+    """案件票をまとめて構造化するジョブ（JobExecutor.submit に渡す）.
+
+    完了した順に進捗を報告する. 途中までのレコード（src.cli と同じ形式）は完了順に追記していく
+    1つのリストで、毎回作り直さずに同じリストを partial として渡す（読む側は複製して使う）.
+
+    Returns:
+        レコードのリストを返すジョブ関数（入力順）
+    """
+
+    def run(report: ProgressReporter) -> list[dict[str, Any]]:
+        records: list[dict[str, Any] | None] = [None] * len(tickets)
+        completed: list[dict[str, Any]] = []
+        report(progress=0.0, message=f"0 / {len(tickets)}", partial=completed)
+        texts = (text for _, text in tickets)
+        for result in iter_structure_jobs(texts, max_workers=max_workers):
+            record = build_record(tickets[result.index][0], result, tone, angle)
+            records[result.index] = record
+            completed.append(record)
+            report(
+                progress=len(completed) / len(tickets),
+                message=f"{len(completed)} / {len(tickets)}",
+            )
+        return [record for record in records if record is not None]
+
+    return run
+
+
+def record_row(record: dict[str, Any]) -> dict[str, Any]:
+    """build_record のレコードを表の1行（TABLE_COLUMNS の列）にする."""
+    job = record.get("job") or {}
+    rate = job.get("rate") or {}
+    return {
+        "id": record["id"],
+        "title": job.get("title"),
+        "company": job.get("company"),
+        "rate_min": rate.get("min"),
+        "rate_max": rate.get("max"),
+        "rate_unit": rate.get("unit"),
+        "remote_type": job.get("remote_type"),
+        "location": job.get("location"),
+        "start_date": job.get("start_date"),
+        "stack_keywords": job.get("stack_keywords", []),
+        "error": record.get("error"),
+    }
+
+
+def iter_jsonl(records: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """レコードをJSONLの行として順に返す."""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_csv(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """表の行をCSVの行として順に返す（ExcelでそのままひらけるようBOMをつける）."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TABLE_COLUMNS, extrasaction="ignore")
+    buffer.write("\ufeff")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, "stack_keywords": "、".join(row["stack_keywords"])})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # 0件のときも見出しは返す
+    if buffer.tell():
+        yield buffer.getvalue()
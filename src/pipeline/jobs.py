@@ -0,0 +1,200 @@
+"""プロセス内で共有するバックグラウンドジョブの実行器.
+
+Streamlit のスクリプトスレッドでLLM呼び出しを待つと、そのセッションは結果が出るまで
+何もできない. ジョブをこの実行器に投げればスクリプトはすぐに戻り、進捗と待ち順は
+再実行のたびに問い合わせられる. どのセッションからでも投入でき、結果は再実行を
+またいで残る.
+
+    executor = JobExecutor()
+    job_id = executor.submit(lambda report: structure_job(text), owner=session_id, label="案件A")
+    executor.get(job_id)              # → Job(status="running", progress=0.4, ...)
+    executor.queue_position(job_id)   # 待ち行列で何番目か（実行中・完了ならNone）
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal, Protocol
+
+from src.pipeline.structure import DEFAULT_MAX_WORKERS
+
+# 完了したジョブを保持する最大件数（古いものから捨てる）
+DEFAULT_KEEP_FINISHED = 1000
+
+JobStatus = Literal["queued", "running", "done", "failed", "cancelled"]
+
+
+class ProgressReporter(Protocol):
+    """ジョブ関数に渡す進捗の報告先."""
+
+    def __call__(
+        self, progress: float | None = None, message: str | None = None, partial: Any = None
+    ) -> None: ...
+
+
+@dataclass(frozen=True)
+class Job:
+    """ジョブ1件の状態（取得時点のスナップショット）."""
+
+    id: str
+    owner: str
+    label: str
+    submitted_at: float
+    status: JobStatus = "queued"
+    progress: float = 0.0
+    message: str = ""
+    partial: Any = None
+    result: Any = None
+    error: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        """完了・失敗・取り消しのいずれかか."""
+        return self.status in ("done", "failed", "cancelled")
+
+
+def get_job_workers() -> int:
+    """同時に実行するジョブ数（環境変数 JOBSPEC_JOB_WORKERS）."""
+    return int(os.environ.get("JOBSPEC_JOB_WORKERS", DEFAULT_MAX_WORKERS))
+
+
+class JobExecutor:
+    """スレッドプールでジョブを実行し、状態・進捗・待ち順を保持する.
+
+    Args:
+        max_workers: 同時に実行するジョブ数（省略時は get_job_workers()）
+        keep_finished: 完了したジョブを保持する最大件数（超えた分は次の投入時に捨てる）
+    """
+
+    def __init__(
+        self, max_workers: int | None = None, keep_finished: int = DEFAULT_KEEP_FINISHED
+    ) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or get_job_workers(), thread_name_prefix="jobspec-job"
+        )
+        self._keep_finished = keep_finished
+        # 投入順に保持する（dictは挿入順）
+        self._jobs: dict[str, Job] = {}
+        self._futures: dict[str, Future[None]] = {}
+        self._queued: list[str] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self, func: Callable[[ProgressReporter], Any], owner: str = "", label: str = ""
+    ) -> str:
+        """ジョブを投入する.
+
+        Args:
+            func: 実行する関数（進捗の報告先を受け取り、結果を返す）
+            owner: 投入したセッションなどの識別子（jobs() の絞り込みに使う）
+            label: 表示用の名前
+
+        Returns:
+            ジョブID
+        """
+        job = Job(id=uuid.uuid4().hex, owner=owner, label=label, submitted_at=time.time())
+        with self._lock:
+            self._jobs[job.id] = job
+            self._queued.append(job.id)
+            self._evict()
+        future = self._pool.submit(self._run, job.id, func)
+        self._futures[job.id] = future
+        # 終わったジョブのFutureは取り消しに使えないので捨てる
+        future.add_done_callback(lambda _: self._futures.pop(job.id, None))
+        return job.id
+
+    def _update(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs[job_id] = dataclasses.replace(job, **changes)
+
+    def _run(self, job_id: str, func: Callable[[ProgressReporter], Any]) -> None:
+        with self._lock:
+            if job_id in self._queued:
+                self._queued.remove(job_id)
+        self._update(job_id, status="running", started_at=time.time())
+
+        def report(
+            progress: float | None = None, message: str | None = None, partial: Any = None
+        ) -> None:
+            changes: dict[str, Any] = {}
+            if progress is not None:
+                changes["progress"] = min(max(progress, 0.0), 1.0)
+            if message is not None:
+                changes["message"] = message
+            if partial is not None:
+                changes["partial"] = partial
+            self._update(job_id, **changes)
+
+        try:
+            result = func(report)
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+        else:
+            self._update(
+                job_id, status="done", progress=1.0, result=result, finished_at=time.time()
+            )
+
+    def _evict(self) -> None:
+        """完了したジョブが上限を超えたら古いものから捨てる（ロック内で呼ぶ）."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self._keep_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job | None:
+        """ジョブの現在の状態."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner: str | None = None) -> list[Job]:
+        """ジョブの一覧（投入順）.
+
+        Args:
+            owner: 指定すればそのownerのジョブだけ
+        """
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def queue_position(self, job_id: str) -> int | None:
+        """待ち行列での順番（1始まり。実行中・完了ならNone）."""
+        with self._lock:
+            try:
+                return self._queued.index(job_id) + 1
+            except ValueError:
+                return None
+
+    def cancel(self, job_id: str) -> bool:
+        """まだ始まっていないジョブを取り消す.
+
+        Returns:
+            取り消せたか（実行中・完了済みならFalse）
+        """
+        future = self._futures.get(job_id)
+        if future is None or not future.cancel():
+            return False
+        with self._lock:
+            if job_id in self._queued:
+                self._queued.remove(job_id)
+        self._update(job_id, status="cancelled", finished_at=time.time())
+        return True
+
+    def discard(self, job_id: str) -> None:
+        """完了したジョブを一覧から取り除く（結果を受け取った後に呼ぶ）."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """実行器を止める（待ち行列のジョブは実行しない）."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,139 @@
+"""LLM出力の壊れたJSONをローカルで修復するユーティリティ."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+from src.llm.resilience import Counters
+
+# 修復の試行回数・成功回数・（検証まで通って）省略できたLLM再呼び出し回数
+repair_stats = Counters("attempts", "repaired", "failed", "saved_round_trips")
+
+# ```json ... ``` 形式のコードフェンス（閉じフェンスがない場合も許容）
+_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+
+# 切り詰められたJSONを閉じる際、末尾から遡って試すカンマ位置の数
+_MAX_CUT_CANDIDATES = 3
+
+
+def _strip_fences(text: str) -> str:
+    """マークダウンのコードフェンスを取り除く."""
+    match = _FENCE_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+def _closers(stack: list[str]) -> str:
+    """開いている括弧を閉じる文字列."""
+    return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """文字列リテラル外の `,` 直後が `}` / `]` の場合、そのカンマを取り除く."""
+    out: list[str] = []
+    in_string = False
+    escape = False
+    pending_comma = -1
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch in "}]" and pending_comma >= 0:
+            del out[pending_comma]
+        if not ch.isspace():
+            pending_comma = -1
+
+        if ch == ",":
+            pending_comma = len(out)
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+
+    return "".join(out)
+
+
+def _candidates(text: str) -> list[str]:
+    """最初の `{` から始まるJSONオブジェクトの候補を作る.
+
+    括弧が釣り合えばその範囲を、途中で切れていれば括弧を補って閉じたものと、
+    直近のカンマ位置で切って閉じたものを返す.
+    """
+    start = text.find("{")
+    if start < 0:
+        return []
+
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    commas: list[tuple[int, list[str]]] = []
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return [text[start:i + 1]]
+        elif ch == ",":
+            commas.append((i, list(stack)))
+
+    # 途中で切れている: 開いている文字列・括弧を閉じる
+    body = text[start:].rstrip()
+    candidates = [body + ('"' if in_string else "") + _closers(stack)]
+    for i, open_stack in reversed(commas[-_MAX_CUT_CANDIDATES:]):
+        candidates.append(text[start:i] + _closers(open_stack))
+    return candidates
+
+
+def repair_json(text: str) -> dict[str, Any] | None:
+    """壊れたJSON文字列の修復を試み、成功すればオブジェクトを返す.
+
+    対応する崩れ方: コードフェンス、前後の説明文、末尾カンマ、
+    文字列中の生の改行、途中で切れた閉じ括弧.
+
+    Args:
+        text: LLMの生出力
+
+    Returns:
+        修復できた場合はdict、できなければNone
+    """
+    repair_stats.incr("attempts")
+
+    for candidate in _candidates(_strip_fences(text)):
+        try:
+            data = json.loads(_strip_trailing_commas(candidate), strict=False)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            repair_stats.incr("repaired")
+            return data
+
+    repair_stats.incr("failed")
+    return None
+
+
+def get_repair_stats() -> dict[str, int]:
+    """修復の試行・成功・失敗・省略できたLLM再呼び出しの回数を返す."""
+    return repair_stats.snapshot()
@@ -0,0 +1,96 @@
+"""ストリーミング中の不完全なJSONから、閉じたトップレベルのフィールドを取り出す."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class PartialObjectParser:
+    """チャンク単位で届くJSONオブジェクトを逐次解析する.
+
+    トップレベルのキーと値のペアが閉じた時点（`,` または最後の `}`）で
+    その値をデコードして返す. 先頭の `{` より前の文字列は読み飛ばす.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key_start = -1
+        self._key: str | None = None
+        self._value_start = -1
+        self.done = False
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """チャンクを追加し、新たに閉じたフィールドを返す.
+
+        Args:
+            chunk: 追加の受信テキスト
+
+        Returns:
+            今回の追加で確定したフィールド（キー → デコード済みの値）
+        """
+        self._buf += chunk
+        completed: dict[str, Any] = {}
+        buf = self._buf
+
+        for i in range(self._pos, len(buf)):
+            if self.done:
+                break
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_value(buf[self._value_start:i], completed)
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ":" and self._expect_key and self._key_start >= 0:
+                    try:
+                        self._key = json.loads(buf[self._key_start:i].strip())
+                    except json.JSONDecodeError:
+                        self._key = None
+                    self._value_start = i + 1
+                    self._expect_key = False
+                elif ch == ",":
+                    self._close_value(buf[self._value_start:i], completed)
+                    self._expect_key = True
+                    self._key_start = -1
+
+        self._pos = len(buf)
+        return completed
+
+    def _close_value(self, raw: str, completed: dict[str, Any]) -> None:
+        """値のテキストをデコードして確定済みに加える."""
+        if self._key is None or self._expect_key:
+            return
+        try:
+            completed[self._key] = json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+        self._key = None
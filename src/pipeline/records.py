@@ -0,0 +1,33 @@
+"""一括構造化の入出力レコード.
+
+コマンドラインツール（src.cli）と画面の一括取り込み（src.pipeline.intake）で共有する.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from src.pipeline.generate import render_job
+from src.pipeline.structure import StructureResult
+
+# 1ファイル1件として読み込む案件票の拡張子
+TICKET_SUFFIXES = (".txt", ".md")
+
+
+def build_record(
+    ticket_id: str, result: StructureResult, tone: str, angle: str
+) -> dict[str, Any]:
+    """構造化結果から出力1行分のdictを作る."""
+    if not result.ok:
+        return {"id": ticket_id, "ok": False, "error": str(result.error)}
+
+    job = result.job
+    rendered = render_job(job, tone=tone, angle=angle)
+    return {
+        "id": ticket_id,
+        "ok": True,
+        "job": job.model_dump(),
+        "summary": rendered.summary,
+        "email": rendered.email,
+        "questions": rendered.questions,
+    }
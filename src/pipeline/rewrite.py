@@ -0,0 +1,192 @@
+"""リライト案の並列生成とメモ化.
+
+提案メールを複数のスタイルでリライトして見比べるとき、スタイルごとに順番にLLMを呼ぶと
+その回数分の往復を待つことになる. ここでは選ばれたスタイルを並列に呼び出し、
+できたものから順に返す. 結果は (本文のハッシュ, 指示) をキーにLRUで保持するため、
+同じメールで同じスタイルを選び直してもLLMは呼ばない.
+
+    for result in iter_rewrites(email, ["簡潔に", "より丁寧に"]):
+        print(result.instruction, result.text)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from src.llm.client import CLAUDE_MODEL, get_llm_mode, rewrite_text
+from src.pipeline.cache import fingerprint
+
+# 保持するリライト結果の最大件数（環境変数 JOBSPEC_REWRITE_CACHE_ENTRIES で上書き可能）
+DEFAULT_REWRITE_CACHE_ENTRIES = 512
+
+# 同時に呼び出すリライトの数
+DEFAULT_REWRITE_WORKERS = 6
+
+
+@dataclass(frozen=True)
+class RewriteResult:
+    """リライト1件分の結果."""
+
+    instruction: str
+    text: str | None = None
+    error: Exception | None = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """リライトできたか."""
+        return self.error is None
+
+
+class RewriteCache:
+    """リライト結果のLRU（プロセス内のみ）.
+
+    キーはモデル名・LLMモード・指示・本文のハッシュで、本文そのものは保持しない.
+
+    Args:
+        max_entries: 保持する最大件数
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_REWRITE_CACHE_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, instruction: str) -> str:
+        """本文と指示からキーを作る."""
+        return fingerprint(CLAUDE_MODEL, get_llm_mode(), instruction, text)
+
+    def get(self, text: str, instruction: str) -> str | None:
+        """保持しているリライト結果（なければNone）."""
+        key = self.make_key(text, instruction)
+        with self._lock:
+            rewritten = self._entries.get(key)
+            if rewritten is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return rewritten
+
+    def put(self, text: str, instruction: str, rewritten: str) -> None:
+        """リライト結果を保持し、上限を超えたら古い順に追い出す."""
+        key = self.make_key(text, instruction)
+        with self._lock:
+            self._entries[key] = rewritten
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """全エントリを削除する（統計はリセットしない）."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """ヒット/ミス等のカウンタを返す."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+_default_cache: RewriteCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_rewrite_cache() -> RewriteCache:
+    """プロセス共通のリライトキャッシュを取得する."""
+    global _default_cache
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = RewriteCache(
+                    max_entries=int(
+                        os.environ.get(
+                            "JOBSPEC_REWRITE_CACHE_ENTRIES", DEFAULT_REWRITE_CACHE_ENTRIES
+                        )
+                    )
+                )
+    return _default_cache
+
+
+def _rewrite_one(text: str, instruction: str, cache: RewriteCache | None) -> RewriteResult:
+    """1件をリライトし、例外も結果として返す."""
+    try:
+        rewritten = rewrite_text(text, instruction)
+    except Exception as e:
+        return RewriteResult(instruction=instruction, error=e)
+    if cache is not None:
+        cache.put(text, instruction, rewritten)
+    return RewriteResult(instruction=instruction, text=rewritten)
+
+
+def iter_rewrites(
+    text: str,
+    instructions: Iterable[str],
+    max_workers: int = DEFAULT_REWRITE_WORKERS,
+    use_cache: bool = True,
+) -> Iterator[RewriteResult]:
+    """テキストを複数の指示で並列にリライトし、できた順に返す.
+
+    保持済みの結果は最初にまとめて返し、残りだけをLLMに問い合わせる.
+    1件の失敗で全体は止まらず、エラーは RewriteResult.error に入る.
+
+    Args:
+        text: 元のテキスト
+        instructions: リライト指示（重複は1回だけ処理する）
+        max_workers: 同時に呼び出す数
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Yields:
+        完了順の RewriteResult
+    """
+    cache = get_rewrite_cache() if use_cache else None
+    missing = []
+    for instruction in dict.fromkeys(instructions):
+        rewritten = cache.get(text, instruction) if cache is not None else None
+        if rewritten is not None:
+            yield RewriteResult(instruction=instruction, text=rewritten, cached=True)
+        else:
+            missing.append(instruction)
+    if not missing:
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(missing)), thread_name_prefix="rewrite"
+    ) as pool:
+        pending: set[Future[RewriteResult]] = {
+            pool.submit(_rewrite_one, text, instruction, cache) for instruction in missing
+        }
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # 途中で打ち切られた場合は未着手の呼び出しを捨てる
+            for future in pending:
+                future.cancel()
+
+
+def rewrite_variants(
+    text: str, instructions: Iterable[str], use_cache: bool = True
+) -> dict[str, RewriteResult]:
+    """テキストを複数の指示で並列にリライトする.
+
+    Returns:
+        指示 → RewriteResult（指示の順）
+    """
+    instructions = list(dict.fromkeys(instructions))
+    results = {r.instruction: r for r in iter_rewrites(text, instructions, use_cache=use_cache)}
+    return {instruction: results[instruction] for instruction in instructions}
@@ -0,0 +1,413 @@
+"""【見出し】形式の案件票をルールで構造化する（LLMを使わない高速経路）.
+
+    【単価】70〜90万円/月
+    【勤務地】東京都渋谷区（週2出社、それ以外リモート可）
+    【必須スキル】
+    ・Python 3年以上
+
+のような見出し付きの案件票から、既知の見出しをJobSpecのフィールドに割り当てる.
+抽出できたフィールドの割合（カバー率）が十分高ければ判断の要るフィールド（JUDGMENT_FIELDS）
+だけを、足りなければ不足フィールドすべてをLLMに問い合わせる（src.pipeline.structure）.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import unicodedata
+from typing import Any
+
+from src.schema import JobSpec
+from src.utils.pii import REPLACEMENTS
+from src.utils.vocabulary import get_vocabulary
+
+# カバー率がこれ以上なら判断の要るフィールドだけをLLMに問い合わせる
+# （環境変数 JOBSPEC_RULES_MIN_COVERAGE で上書き）
+DEFAULT_MIN_COVERAGE = 0.9
+
+# ルールで埋めることを目指すフィールド（risks_or_unknowns は判断が要るためLLMに任せる）
+RULE_FIELDS = (
+    "title",
+    "company",
+    "role",
+    "summary",
+    "must_requirements",
+    "nice_to_have",
+    "tasks",
+    "stack_keywords",
+    "location",
+    "remote_type",
+    "rate",
+    "start_date",
+    "duration",
+    "interview_count",
+    "working_hours",
+    "contract_type",
+    "notes",
+)
+
+# 抽出の規則（正規表現・解析の手順）を変えたら上げる. 構造化キャッシュのキーに含まれる
+RULES_VERSION = 1
+
+# 判断が要るためルールだけでは確定させないフィールド（欠けていればカバー率によらずLLMに問い合わせる）
+JUDGMENT_FIELDS = ("role", "risks_or_unknowns")
+
+# 見出しのうちこの割合を超えて変わっていれば、編集ではなく別の案件票とみなして全体を構造化し直す
+MAX_CHANGED_RATIO = 0.5
+
+# 見出し → フィールド名
+_HEADINGS = {
+    "案件名": "title",
+    "案件": "title",
+    "タイトル": "title",
+    "企業": "company",
+    "企業名": "company",
+    "会社": "company",
+    "会社名": "company",
+    "クライアント": "company",
+    "ポジション": "role",
+    "役割": "role",
+    "職種": "role",
+    "募集職種": "role",
+    "概要": "summary",
+    "案件概要": "summary",
+    "必須スキル": "must_requirements",
+    "必須": "must_requirements",
+    "必須要件": "must_requirements",
+    "歓迎スキル": "nice_to_have",
+    "歓迎": "nice_to_have",
+    "歓迎要件": "nice_to_have",
+    "尚可": "nice_to_have",
+    "尚可スキル": "nice_to_have",
+    "業務内容": "tasks",
+    "作業内容": "tasks",
+    "担当業務": "tasks",
+    "開発環境": "stack_keywords",
+    "使用技術": "stack_keywords",
+    "技術スタック": "stack_keywords",
+    "環境": "stack_keywords",
+    "勤務地": "location",
+    "作業場所": "location",
+    "場所": "location",
+    "リモート": "remote_type",
+    "勤務形態": "remote_type",
+    "単価": "rate",
+    "報酬": "rate",
+    "金額": "rate",
+    "開始": "start_date",
+    "開始時期": "start_date",
+    "期間": "duration",
+    "契約期間": "duration",
+    "面談": "interview_count",
+    "面談回数": "interview_count",
+    "稼働": "working_hours",
+    "稼働時間": "working_hours",
+    "勤務時間": "working_hours",
+    "契約": "contract_type",
+    "契約形態": "contract_type",
+    "備考": "notes",
+    "その他": "notes",
+}
+
+_LIST_FIELDS = frozenset({"must_requirements", "nice_to_have", "tasks", "stack_keywords"})
+
+_HEADING_RE = re.compile(r"^\s*【([^】]+)】\s*(.*)$")
+_BULLET_RE = re.compile(r"^(?:[・\-\*●○■□◆◇•‣]|\d+[.)．）])\s*")
+_INLINE_SPLIT_RE = re.compile(r"\s*[、，,]\s*")
+
+# 報酬: 「70〜90万円/月」「700,000円〜」「〜90万円」「80万円」
+_NUM = r"(\d[\d,]*(?:\.\d+)?)"
+_YEN = r"(万円?|円)"
+_RANGE_RE = re.compile(rf"{_NUM}\s*(万円?|円)?\s*[〜~～\-－]\s*{_NUM}\s*{_YEN}")
+_MIN_ONLY_RE = re.compile(rf"{_NUM}\s*{_YEN}\s*[〜~～](?!\s*\d)")
+_MAX_ONLY_RE = re.compile(rf"[〜~～]\s*{_NUM}\s*{_YEN}")
+_SINGLE_RE = re.compile(rf"{_NUM}\s*{_YEN}")
+_RATE_UNITS = (
+    (re.compile(r"/\s*h\b|/\s*時間?|時給|時間単価", re.IGNORECASE), "hourly"),
+    (re.compile(r"/\s*日|日給|日額|日単価"), "daily"),
+    (re.compile(r"/\s*年|年収|年額|年俸"), "yearly"),
+    (re.compile(r"/\s*(?:人)?月|月額|月給|月単価|人月"), "monthly"),
+)
+
+# リモート可否（上から順に判定）
+_REMOTE_RULES = (
+    (re.compile(r"フル出社|リモート不可|出社必須|完全常駐"), "on_site"),
+    (re.compile(r"[週月]\s*\d\s*日?\s*(?:出社|リモート|在宅)|一部リモート|一部在宅|ハイブリッド|リモート併用"), "hybrid"),
+    (re.compile(r"フルリモート|完全リモート|フル在宅|完全在宅|リモート100"), "full_remote"),
+    (re.compile(r"常駐|オンサイト"), "on_site"),
+    (re.compile(r"リモート可|在宅可"), "hybrid"),
+)
+_REMOTE_HINT_RE = re.compile(r"[（(][^）)]*(?:出社|リモート|在宅|常駐)[^）)]*[）)]")
+
+_INTERVIEW_RE = re.compile(r"(\d+)\s*回")
+
+# 技術キーワード候補（英数字の語）とその除外語
+_TECH_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.]*")
+_TECH_STOPWORDS = frozenset({"or", "and", "etc", "the", "of", "to", "in", "on", "for", "with", "h"})
+# PIIマスク後の [EMAIL] などは技術名ではない
+_PLACEHOLDER_RE = re.compile("|".join(re.escape(v) for v in REPLACEMENTS.values()))
+
+
+def get_min_coverage() -> float:
+    """LLMを省略するのに必要なカバー率."""
+    return float(os.environ.get("JOBSPEC_RULES_MIN_COVERAGE", DEFAULT_MIN_COVERAGE))
+
+
+def rules_signature() -> str:
+    """抽出規則の版と設定を表す文字列（規則・見出し・カバー率の閾値が変われば変わる）."""
+    return json.dumps(
+        {
+            "version": RULES_VERSION,
+            "headings": _HEADINGS,
+            "fields": RULE_FIELDS,
+            "judgment_fields": JUDGMENT_FIELDS,
+            "min_coverage": get_min_coverage(),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+
+
+def split_headings(text: str) -> dict[str, list[str]]:
+    """案件票を見出しごとの行リストに分ける.
+
+    最初の見出しより前の行は "" に入る. 同じ見出しが複数あれば行をつなげる.
+
+    Args:
+        text: 案件票テキスト
+
+    Returns:
+        見出し（【】の中身）→ 空行を除いた本文の行リスト
+    """
+    sections: dict[str, list[str]] = {"": []}
+    current = sections[""]
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            current = sections.setdefault(match.group(1).strip(), [])
+            line = match.group(2)
+        line = line.strip()
+        if line:
+            current.append(line)
+    return sections
+
+
+def _split_sections(text: str) -> dict[str, list[str]]:
+    """案件票をフィールドごとの行リストに分ける（未知の見出しは無視）."""
+    sections: dict[str, list[str]] = {}
+    for heading, lines in split_headings(text).items():
+        field = _HEADINGS.get(heading)
+        # 同じフィールドに対応する見出しが複数あれば最初のものを使う
+        if field is not None and field not in sections:
+            sections[field] = lines
+    return sections
+
+
+def heading_field(heading: str) -> str | None:
+    """見出しに対応するフィールド名（未知の見出しはNone）."""
+    return _HEADINGS.get(heading)
+
+
+def _parse_list(lines: list[str]) -> list[str]:
+    """箇条書き（・/-/1. など）を項目のリストにする."""
+    items: list[str] = []
+    for line in lines:
+        if _BULLET_RE.match(line):
+            item = _BULLET_RE.sub("", line, count=1).strip()
+            if item:
+                items.append(item)
+        else:
+            # 「Python、SQL」のような1行書き
+            items.extend(part for part in _INLINE_SPLIT_RE.split(line) if part)
+    return items
+
+
+def _yen(number: str, suffix: str | None) -> int | float:
+    value = float(number.replace(",", ""))
+    if suffix and suffix.startswith("万"):
+        value *= 10_000
+    return int(value) if value.is_integer() else value
+
+
+def parse_rate(text: str) -> dict[str, Any] | None:
+    """「70〜90万円/月」のような報酬表記をRateのdictにする.
+
+    Args:
+        text: 報酬の表記
+
+    Returns:
+        {"min", "max", "unit"}。金額が読み取れなければNone
+    """
+    low: int | float | None = None
+    high: int | float | None = None
+
+    if match := _RANGE_RE.search(text):
+        # 「70〜90万円」の下限は上限側の単位（万）に従う
+        low_suffix = match.group(2) or match.group(4)
+        low = _yen(match.group(1), low_suffix)
+        high = _yen(match.group(3), match.group(4))
+    elif match := _MIN_ONLY_RE.search(text):
+        low = _yen(match.group(1), match.group(2))
+    elif match := _MAX_ONLY_RE.search(text):
+        high = _yen(match.group(1), match.group(2))
+    elif match := _SINGLE_RE.search(text):
+        low = high = _yen(match.group(1), match.group(2))
+    else:
+        return None
+
+    unit = next((name for pattern, name in _RATE_UNITS if pattern.search(text)), None)
+    return {"min": low, "max": high, "unit": unit}
+
+
+def parse_remote(text: str) -> str | None:
+    """「週2出社」「フルリモート」などの表記からremote_typeを判定する."""
+    for pattern, remote_type in _REMOTE_RULES:
+        if pattern.search(text):
+            return remote_type
+    return None
+
+
+def _stack_from(lines: list[str]) -> list[str]:
+    """文中の技術名を重複なく取り出す（辞書の語は正式名、それ以外は英数字の語）."""
+    vocabulary = get_vocabulary()
+    seen: dict[int, str] = {}
+    for line in lines:
+        text = unicodedata.normalize("NFKC", _PLACEHOLDER_RE.sub(" ", line))
+        found: list[tuple[int, int, str]] = []
+        for start, end, term_id in vocabulary.find_terms(text):
+            # 1文字の語（C, R）は誤検出が多いため拾わないが、英数字の語としても扱わない
+            if end - start >= 2:
+                found.append((start, term_id, vocabulary.name(term_id)))
+            text = text[:start] + " " * (end - start) + text[end:]
+        for match in _TECH_TOKEN_RE.finditer(text):
+            token = match.group().rstrip(".")
+            if len(token) < 2 or token.lower() in _TECH_STOPWORDS:
+                continue
+            found.append((match.start(), vocabulary.term_id(token), vocabulary.canonicalize(token)))
+        for _, term_id, name in sorted(found, key=lambda item: item[0]):
+            seen.setdefault(term_id, name)
+    return list(seen.values())
+
+
+def extract_fields(text: str) -> dict[str, Any]:
+    """【見出し】形式の案件票からJobSpecのフィールドを抽出する.
+
+    Args:
+        text: 案件票テキスト（PIIマスク後）
+
+    Returns:
+        抽出できたフィールドだけを含むdict（JobSpec.model_validateに渡せる形）
+    """
+    sections = _split_sections(text)
+    fields: dict[str, Any] = {}
+
+    for field, lines in sections.items():
+        if not lines:
+            continue
+        value = " ".join(lines)
+        if field in _LIST_FIELDS:
+            items = _parse_list(lines)
+            if field == "stack_keywords":
+                items = _stack_from(items) or items
+            if items:
+                fields[field] = items
+        elif field == "rate":
+            rate = parse_rate(value)
+            if rate is not None:
+                fields["rate"] = rate
+        elif field == "remote_type":
+            remote_type = parse_remote(value)
+            if remote_type is not None:
+                fields["remote_type"] = remote_type
+        elif field == "interview_count":
+            if match := _INTERVIEW_RE.search(value):
+                fields["interview_count"] = int(match.group(1))
+        elif field == "location":
+            # 「東京都渋谷区（週2出社）」の括弧内はリモート可否として扱う
+            fields.setdefault("remote_type", parse_remote(value))
+            location = _REMOTE_HINT_RE.sub("", value).strip()
+            if location:
+                fields["location"] = location
+        elif field == "summary":
+            fields["summary"] = "".join(lines)
+        else:
+            fields[field] = value
+
+    if fields.get("remote_type") is None:
+        fields.pop("remote_type", None)
+
+    if "stack_keywords" not in fields:
+        # 開発環境の見出しがなければ、スキル・業務内容に出てくる技術名を拾う
+        source = [
+            *([fields["title"]] if "title" in fields else []),
+            *fields.get("must_requirements", []),
+            *fields.get("nice_to_have", []),
+            *fields.get("tasks", []),
+        ]
+        stack = _stack_from(source)
+        if stack:
+            fields["stack_keywords"] = stack
+
+    return fields
+
+
+def coverage(fields: dict[str, Any]) -> float:
+    """RULE_FIELDS のうち抽出できた割合."""
+    return sum(1 for name in RULE_FIELDS if name in fields) / len(RULE_FIELDS)
+
+
+def missing_fields(fields: dict[str, Any], judgment_only: bool = False) -> list[str]:
+    """LLMに問い合わせるべきフィールド（JobSpecの定義順）.
+
+    Args:
+        fields: ルールで抽出済みのフィールド
+        judgment_only: Trueなら JUDGMENT_FIELDS のうち欠けているものだけを返す
+    """
+    return [
+        name
+        for name in JobSpec.model_fields
+        if name not in fields and (not judgment_only or name in JUDGMENT_FIELDS)
+    ]
+
+
+def diff_sections(prev_text: str, new_text: str) -> tuple[set[str], list[str]] | None:
+    """2つの案件票を見出し単位で比較し、再抽出が必要なフィールドを求める.
+
+    Args:
+        prev_text: 前回の案件票テキスト
+        new_text: 編集後の案件票テキスト
+
+    Returns:
+        (影響を受けるフィールド名, 変更された見出し)。何か変わっていれば JUDGMENT_FIELDS は
+        案件全体から判断するため常に含む. 見出しの外や未知の見出しが変わった場合は対応する
+        フィールドが決まらず、見出しの MAX_CHANGED_RATIO を超えて変わった場合は別の案件票と
+        みなすため、どちらもNone
+    """
+    old = split_headings(prev_text)
+    new = split_headings(new_text)
+    headings = [h for h in dict.fromkeys([*old, *new]) if old.get(h) or new.get(h)]
+    changed = [h for h in headings if old.get(h, []) != new.get(h, [])]
+    if not changed:
+        return set(), []
+    if len(changed) > MAX_CHANGED_RATIO * len(headings):
+        return None
+
+    fields: set[str] = set()
+    for heading in changed:
+        field = _HEADINGS.get(heading)
+        if field is None:
+            return None
+        fields.add(field)
+
+    # 他の見出しから導出しているフィールド
+    if "location" in fields:
+        fields.add("remote_type")
+    new_fields = {_HEADINGS.get(h) for h in new}
+    if "stack_keywords" not in new_fields and fields & {
+        "title", "must_requirements", "nice_to_have", "tasks"
+    }:
+        fields.add("stack_keywords")
+    fields.update(JUDGMENT_FIELDS)
+
+    return fields, changed
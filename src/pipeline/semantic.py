@@ -0,0 +1,302 @@
+"""文字n-gram TF-IDF による類似案件検索.
+
+形態素解析器を使わず、NFKC正規化した文字2-gram・3-gramをハッシュして固定次元の
+ベクトルにする（feature hashing）. 日本語・英語が混ざった案件票でもそのまま扱え、
+`PostgreSQL` と `Postgres` のような表記揺れも部分一致として効く.
+技術キーワードだけでなく、タイトル・概要・業務内容・必須/歓迎スキルも対象にする.
+
+案件ベクトルはL2正規化して float32 の行列に積むため、検索は行列とベクトルの積1回と
+argpartition で済む. ネットワーク・GPUは使わない.
+
+    index = SemanticIndex()
+    index.add_job("job-1", job)
+    index.query_job(current_job, top_k=3)   # → [("job-1", 0.83), ...]
+
+    index.save(".jobspec/semantic")          # 2回目以降は追加分だけ追記する
+    index = SemanticIndex.load(".jobspec/semantic")   # 行列はメモリマップで読む
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import unicodedata
+from collections.abc import Hashable, Iterable
+from pathlib import Path
+
+import numpy as np
+
+from src.schema import JobSpec
+
+# ベクトルの次元（2のべき乗）. 10万件で約100MB
+DEFAULT_DIM = 256
+
+# 文書頻度を数えるn-gramハッシュの空間（2**FEATURE_BITS）
+FEATURE_BITS = 20
+
+_NGRAM_SIZES = (2, 3)
+_VECTORS_FILE = "vectors.f32"
+_DF_FILE = "df.npy"
+_META_FILE = "meta.json"
+_FORMAT_VERSION = 1
+
+# n-gramハッシュ用の奇数乗数（64bitで桁あふれさせて混ぜる）
+_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64
+)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def job_document(job: JobSpec) -> str:
+    """類似検索に使うJobSpecのテキスト（タイトル・役割・概要・要件・業務・技術）."""
+    parts = [job.title, job.role, job.summary]
+    parts += job.must_requirements + job.nice_to_have + job.tasks + job.stack_keywords
+    return "\n".join(part for part in parts if part)
+
+
+def _ngram_features(text: str) -> np.ndarray:
+    """テキストの文字n-gramを FEATURE_BITS ビットのハッシュ値の配列にする."""
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    hashes = []
+    for n in _NGRAM_SIZES:
+        if len(codes) < n:
+            continue
+        # 桁あふれはハッシュとして意図したもの
+        with np.errstate(over="ignore"):
+            h = np.full(len(codes) - n + 1, n, dtype=np.uint64)
+            for offset in range(n):
+                h = h + codes[offset:len(codes) - n + 1 + offset] * _MULTIPLIERS[offset]
+            h ^= h >> np.uint64(33)
+            h *= _MIX
+            h ^= h >> np.uint64(29)
+        hashes.append(h >> np.uint64(64 - FEATURE_BITS))
+    if not hashes:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(hashes).astype(np.int64)
+
+
+class SemanticIndex:
+    """文字n-gram TF-IDFベクトルによる類似案件検索のインデックス.
+
+    IDFは追加済みの案件から逐次更新し、各案件はその時点のIDFで重み付けする
+    （案件数が増えるとIDFはほぼ一定になる）. 文書頻度は追加時に加算するだけで、
+    削除・置き換えでは減らさない.
+
+    Args:
+        dim: ベクトルの次元（2のべき乗）
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM) -> None:
+        if dim <= 0 or dim & (dim - 1):
+            raise ValueError("dim は2のべき乗にしてください")
+        self.dim = dim
+        self._shift = np.int64(FEATURE_BITS - dim.bit_length() + 1)
+        self._df = np.zeros(1 << FEATURE_BITS, dtype=np.int32)
+        self._num_docs = 0
+        # 保存済みファイルをマップした行列（読み込み時のみ）と、その後に追加した行
+        self._base = np.empty((0, dim), dtype=np.float32)
+        self._tail = np.empty((64, dim), dtype=np.float32)
+        self._tail_size = 0
+        self._ids: list[Hashable | None] = []
+        self._positions: dict[Hashable, int] = {}
+        # save() 用: 保存先、保存済みの行数、保存済みの行を書き換えたか
+        self._saved_path: Path | None = None
+        self._saved_rows = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, job_id: Hashable) -> bool:
+        return job_id in self._positions
+
+    def ids(self) -> list[Hashable]:
+        """登録されている案件ID（追加順）."""
+        with self._lock:
+            return list(self._positions)
+
+    def _vectorize(self, text: str, update_df: bool) -> np.ndarray:
+        """テキストをL2正規化したTF-IDFベクトルにする."""
+        features, counts = np.unique(_ngram_features(text), return_counts=True)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not len(features):
+            return vector
+        if update_df:
+            self._df[features] += 1
+            self._num_docs += 1
+        idf = np.log((1 + self._num_docs) / (1 + self._df[features])) + 1.0
+        weights = (1.0 + np.log(counts)) * idf
+        # 次元への割り当てと符号は、n-gramハッシュの別々のビットから決める
+        buckets = features >> self._shift
+        signs = np.where(features & 1, 1.0, -1.0)
+        vector += np.bincount(buckets, weights=weights * signs, minlength=self.dim)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _row(self, position: int) -> np.ndarray:
+        base_rows = len(self._base)
+        if position < base_rows:
+            return self._base[position]
+        return self._tail[position - base_rows]
+
+    def add(self, job_id: Hashable, text: str) -> None:
+        """案件を追加する（同じIDがあれば置き換える）.
+
+        Args:
+            job_id: 案件ID（save() する場合はJSONにできる値）
+            text: 案件のテキスト
+        """
+        with self._lock:
+            vector = self._vectorize(text, update_df=True)
+            position = self._positions.get(job_id)
+            if position is not None:
+                self._row(position)[:] = vector
+                self._dirty |= position < self._saved_rows
+                return
+
+            if self._tail_size == len(self._tail):
+                grown = np.empty((2 * len(self._tail), self.dim), dtype=np.float32)
+                grown[:self._tail_size] = self._tail
+                self._tail = grown
+            self._tail[self._tail_size] = vector
+            self._tail_size += 1
+            self._positions[job_id] = len(self._ids)
+            self._ids.append(job_id)
+
+    def add_job(self, job_id: Hashable, job: JobSpec) -> None:
+        """JobSpecのテキストで案件を追加する."""
+        self.add(job_id, job_document(job))
+
+    def remove(self, job_id: Hashable) -> bool:
+        """案件を削除する（行は0ベクトルにして残す）.
+
+        Returns:
+            削除したか（登録されていなければFalse）
+        """
+        with self._lock:
+            position = self._positions.pop(job_id, None)
+            if position is None:
+                return False
+            self._row(position)[:] = 0.0
+            self._ids[position] = None
+            self._dirty |= position < self._saved_rows
+            return True
+
+    def query(
+        self, text: str, top_k: int = 3, exclude: Iterable[Hashable] = ()
+    ) -> list[tuple[Hashable, float]]:
+        """テキストが似ている案件をコサイン類似度の高い順に返す.
+
+        Args:
+            text: 検索するテキスト
+            top_k: 返す件数
+            exclude: 結果から除く案件ID
+
+        Returns:
+            (案件ID, コサイン類似度) のリスト（類似度が0以下のものは含まない）
+        """
+        with self._lock:
+            query = self._vectorize(text, update_df=False)
+            if top_k <= 0 or not self._positions or not query.any():
+                return []
+            scores = np.concatenate(
+                [self._base @ query, self._tail[:self._tail_size] @ query]
+            )
+            for job_id in exclude:
+                position = self._positions.get(job_id)
+                if position is not None:
+                    scores[position] = -np.inf
+
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [
+                (self._ids[position], float(scores[position]))
+                for position in best
+                if scores[position] > 0 and self._ids[position] is not None
+            ]
+
+    def query_job(
+        self, job: JobSpec, top_k: int = 3, exclude: Iterable[Hashable] = ()
+    ) -> list[tuple[Hashable, float]]:
+        """JobSpecのテキストで類似案件を検索する."""
+        return self.query(job_document(job), top_k=top_k, exclude=exclude)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """ディレクトリに保存する.
+
+        前回と同じ保存先で、保存済みの行を書き換えていなければ、追加した行だけを追記する.
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors_path = directory / _VECTORS_FILE
+        with self._lock:
+            rows = len(self._ids)
+            append = (
+                self._saved_path == directory.resolve()
+                and not self._dirty
+                and vectors_path.exists()
+                and vectors_path.stat().st_size == self._saved_rows * self.dim * 4
+            )
+            if append:
+                with open(vectors_path, "ab") as f:
+                    for position in range(self._saved_rows, rows):
+                        f.write(self._row(position).tobytes())
+            else:
+                # 読み込み元のファイルをマップしたまま書き換えないよう、別名で書いて置き換える
+                tmp = vectors_path.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(self._base.tobytes())
+                    f.write(self._tail[:self._tail_size].tobytes())
+                os.replace(tmp, vectors_path)
+
+            np.save(directory / _DF_FILE, self._df)
+            meta = {
+                "version": _FORMAT_VERSION,
+                "dim": self.dim,
+                "rows": rows,
+                "num_docs": self._num_docs,
+                "ids": self._ids,
+            }
+            tmp = directory / (_META_FILE + ".tmp")
+            tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, directory / _META_FILE)
+
+            self._saved_path = directory.resolve()
+            self._saved_rows = rows
+            self._dirty = False
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> SemanticIndex:
+        """save() したディレクトリから読み込む（行列はコピーオンライトでメモリマップする）.
+
+        Raises:
+            ValueError: 形式が異なる、またはファイルが壊れている場合
+        """
+        directory = Path(path)
+        meta = json.loads((directory / _META_FILE).read_text(encoding="utf-8"))
+        if meta.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"対応していない形式です: {meta.get('version')}")
+
+        index = cls(dim=meta["dim"])
+        rows = meta["rows"]
+        vectors_path = directory / _VECTORS_FILE
+        if vectors_path.stat().st_size < rows * index.dim * 4:
+            raise ValueError(f"{vectors_path} が壊れています")
+        if rows:
+            index._base = np.memmap(
+                vectors_path, dtype=np.float32, mode="c", shape=(rows, index.dim)
+            )
+        index._df = np.load(directory / _DF_FILE)
+        index._num_docs = meta["num_docs"]
+        # JSONでは配列になるため、IDはタプルに戻す
+        index._ids = [tuple(i) if isinstance(i, list) else i for i in meta["ids"]]
+        index._positions = {
+            job_id: position for position, job_id in enumerate(index._ids) if job_id is not None
+        }
+        index._saved_path = directory.resolve()
+        index._saved_rows = rows
+        return index
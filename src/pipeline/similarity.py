@@ -0,0 +1,232 @@
+"""履歴からの類似案件検索."""
+
+from __future__ import annotations
+
+import heapq
+import random
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Hashable, Iterable, Iterator
+from functools import lru_cache
+
+from src.schema import JobSpec
+from src.utils.vocabulary import get_vocabulary, keyword_ids
+
+
+def calculate_similarity(job1: JobSpec, job2: JobSpec) -> tuple[float, list[str]]:
+    """2つの案件の類似度を計算.
+
+    Returns:
+        (類似度スコア 0-1, 共通キーワードリスト)
+    """
+    keywords1 = get_vocabulary().keyword_map(job1.stack_keywords)
+    keywords2 = get_vocabulary().keyword_map(job2.stack_keywords)
+
+    if not keywords1 or not keywords2:
+        return 0.0, []
+
+    common = keywords1.keys() & keywords2.keys()
+    union = keywords1.keys() | keywords2.keys()
+
+    score = len(common) / len(union) if union else 0.0
+    return score, [keywords1[term_id] for term_id in common]
+
+
+def find_similar_jobs(current_job: JobSpec, history: list[dict], top_n: int = 3) -> list[dict]:
+    """履歴から類似案件を検索."""
+    results = []
+
+    for entry in history:
+        hist_job = entry["job"]
+        if hist_job == current_job:
+            continue
+
+        score, common_keywords = calculate_similarity(current_job, hist_job)
+        if score > 0:
+            results.append({
+                "entry": entry,
+                "score": score,
+                "common_keywords": common_keywords,
+            })
+
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:top_n]
+
+
+# MinHash の既定パラメータ（bands × rows = num_perm）
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+# approximate未指定時、登録件数がこれを超えたらMinHash/LSHで検索する
+APPROXIMATE_THRESHOLD = 10_000
+
+# キーワードごとのMinHash値を覚えておく最大件数（辞書にない語もあるため上限を設ける）
+HASH_CACHE_SIZE = 8192
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_keywords(keywords: Iterable[str]) -> frozenset[str]:
+    """比較用にキーワードを正規化する（正式名にそろえて小文字化）."""
+    return frozenset(name.lower() for name in get_vocabulary().keyword_map(keywords).values())
+
+
+class SimilarityIndex:
+    """技術キーワードによる類似案件検索のインデックス.
+
+    キーワードは技術語彙の整数IDにそろえて持ち、ID → 案件IDの転置インデックスで
+    厳密なJaccard上位k件を求める.
+    approximate=True の問い合わせでは MinHash/LSH で候補を絞ってから採点するため、
+    アーカイブが大きくても候補数がほぼ一定に保たれる.
+    追加・削除はどちらも案件1件分のキーワード数に比例する.
+
+    Args:
+        num_perm: MinHashの署名長
+        bands: LSHのバンド数（num_permを割り切れること）
+        seed: MinHashのハッシュ関数を決める乱数シード
+    """
+
+    def __init__(
+        self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS, seed: int = 1
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm は bands で割り切れる必要があります")
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._rows = num_perm // bands
+        self._keyword_hashes = lru_cache(maxsize=HASH_CACHE_SIZE)(self._keyword_hashes_uncached)
+        self._keywords: dict[Hashable, frozenset[int]] = {}
+        self._postings: dict[int, set[Hashable]] = defaultdict(set)
+        self._signatures: dict[Hashable, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[Hashable]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def __contains__(self, job_id: Hashable) -> bool:
+        return job_id in self._keywords
+
+    def _keyword_hashes_uncached(self, term_id: int) -> tuple[int, ...]:
+        """キーワード1つ分の、各ハッシュ関数での値（よく使う語の分はLRUで覚えておく）."""
+        return tuple(((a * term_id + b) % _MERSENNE_PRIME) & _MAX_HASH for a, b in self._perms)
+
+    def _signature(self, keywords: frozenset[int]) -> tuple[int, ...]:
+        return tuple(map(min, zip(*(self._keyword_hashes(kw) for kw in keywords))))
+
+    def _bands(self, signature: tuple[int, ...]) -> Iterator[tuple[int, tuple[int, ...]]]:
+        for band, start in enumerate(range(0, len(signature), self._rows)):
+            yield band, signature[start:start + self._rows]
+
+    def add(self, job_id: Hashable, keywords: Iterable[str]) -> None:
+        """案件を追加する（同じIDがあれば置き換える）.
+
+        Args:
+            job_id: 案件ID
+            keywords: 技術キーワード
+        """
+        normalized = keyword_ids(keywords)
+        with self._lock:
+            self.remove(job_id)
+            if not normalized:
+                return
+            self._keywords[job_id] = normalized
+            for kw in normalized:
+                self._postings[kw].add(job_id)
+            signature = self._signature(normalized)
+            self._signatures[job_id] = signature
+            for key in self._bands(signature):
+                self._buckets[key].add(job_id)
+
+    def add_job(self, job_id: Hashable, job: JobSpec) -> None:
+        """JobSpecの技術キーワードで案件を追加する."""
+        self.add(job_id, job.stack_keywords)
+
+    def remove(self, job_id: Hashable) -> bool:
+        """案件を削除する.
+
+        Returns:
+            削除したか（登録されていなければFalse）
+        """
+        with self._lock:
+            keywords = self._keywords.pop(job_id, None)
+            if keywords is None:
+                return False
+            for kw in keywords:
+                ids = self._postings[kw]
+                ids.discard(job_id)
+                if not ids:
+                    del self._postings[kw]
+            for key in self._bands(self._signatures.pop(job_id)):
+                ids = self._buckets[key]
+                ids.discard(job_id)
+                if not ids:
+                    del self._buckets[key]
+            return True
+
+    def query(
+        self,
+        keywords: Iterable[str],
+        top_k: int = 3,
+        exclude: Iterable[Hashable] = (),
+        approximate: bool | None = None,
+    ) -> list[tuple[Hashable, float, list[str]]]:
+        """キーワードが似ている案件を類似度の高い順に返す.
+
+        Args:
+            keywords: 検索する技術キーワード
+            top_k: 返す件数
+            exclude: 結果から除く案件ID
+            approximate: TrueならMinHash/LSHで候補を絞る（近似）。
+                Noneなら登録件数が APPROXIMATE_THRESHOLD を超えたときだけ近似する
+
+        Returns:
+            (案件ID, Jaccard類似度, 共通キーワード) のリスト
+        """
+        excluded = set(exclude)
+        mapping = get_vocabulary().keyword_map(keywords)
+        query = frozenset(mapping)
+
+        with self._lock:
+            if not query or top_k <= 0:
+                return []
+            if approximate is None:
+                approximate = len(self._keywords) > APPROXIMATE_THRESHOLD
+            if approximate:
+                candidates: set[Hashable] = set()
+                for key in self._bands(self._signature(query)):
+                    candidates |= self._buckets.get(key, set())
+                overlaps = {
+                    job_id: len(query & self._keywords[job_id]) for job_id in candidates
+                }
+            else:
+                counter: Counter[Hashable] = Counter()
+                for kw in query:
+                    counter.update(self._postings.get(kw, ()))
+                overlaps = dict(counter)
+
+            scored = []
+            for job_id, common in overlaps.items():
+                if not common or job_id in excluded:
+                    continue
+                score = common / (len(query) + len(self._keywords[job_id]) - common)
+                scored.append((score, job_id))
+            best = heapq.nlargest(top_k, scored, key=lambda item: item[0])
+            return [
+                (job_id, score, sorted(mapping[kw] for kw in query & self._keywords[job_id]))
+                for score, job_id in best
+            ]
+
+    def query_job(
+        self,
+        job: JobSpec,
+        top_k: int = 3,
+        exclude: Iterable[Hashable] = (),
+        approximate: bool | None = None,
+    ) -> list[tuple[Hashable, float, list[str]]]:
+        """JobSpecの技術キーワードで類似案件を検索する."""
+        return self.query(job.stack_keywords, top_k=top_k, exclude=exclude, approximate=approximate)
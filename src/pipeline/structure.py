@@ -3,61 +3,497 @@
 from __future__ import annotations
 
 import json
+import time
+from collections.abc import Awaitable, Callable, Generator, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
 
 from pydantic import ValidationError
 
-from src.schema import JobSpec
+from src.schema import JobSpec, build_jobspec_tool
 from src.utils.pii import mask_pii
-from src.llm.prompts import STRUCTURE_PROMPT_TEMPLATE
-from src.llm.client import call_claude
+from src.llm.prompts import (
+    STRUCTURE_MISSING_FIELDS_NOTE,
+    STRUCTURE_RETRY_PROMPT,
+    STRUCTURE_SYSTEM_PROMPT,
+    STRUCTURE_USER_TEMPLATE,
+)
+from src.llm.client import (
+    acall_claude_tool,
+    call_claude_tool,
+    is_api_available,
+    stream_claude_tool,
+)
+from src.pipeline.cache import get_structure_cache
+from src.pipeline.json_repair import repair_json, repair_stats
+from src.pipeline.partial_json import PartialObjectParser
+from src.pipeline.rules import (
+    JUDGMENT_FIELDS,
+    coverage,
+    diff_sections,
+    extract_fields,
+    get_min_coverage,
+    heading_field,
+    missing_fields,
+    split_headings,
+)
+from src.utils.instrumentation import annotate, record, stage
 
+# バッチ処理の既定ワーカー数
+DEFAULT_MAX_WORKERS = 8
 
-def structure_job(job_text: str) -> JobSpec:
-    """求人テキストを構造化してJobSpecを返す.
 
-    Args:
-        job_text: 求人の生テキスト
+@dataclass(frozen=True)
+class StructureResult:
+    """一括構造化の1件分の結果."""
 
-    Returns:
-        構造化されたJobSpec
+    index: int
+    job: JobSpec | None = None
+    error: Exception | None = None
 
-    Raises:
-        ValueError: 2回リトライしてもJSONパース/バリデーションに失敗した場合
+    @property
+    def ok(self) -> bool:
+        """構造化に成功したか."""
+        return self.error is None
+
+
+def _extract_known(masked_text: str) -> tuple[dict[str, Any], float]:
+    """見出しからルールで抽出したフィールドとカバー率を返す（検証に通らなければ空）."""
+    with stage("rules"):
+        known = extract_fields(masked_text)
+        try:
+            JobSpec.model_validate(known)
+        except ValidationError:
+            known = {}
+        rule_coverage = coverage(known)
+        annotate(coverage=rule_coverage)
+    return known, rule_coverage
+
+
+def _structure_steps(
+    job_text: str, use_cache: bool, known_out: dict[str, Any] | None = None
+) -> Generator[dict[str, Any], dict[str, Any] | str, JobSpec]:
+    """構造化の手順本体（LLM呼び出し自体は呼び出し側が行う）.
+
+    call_claude_toolへの引数（prompt/tool/system/history）をyieldし、
+    sendされたツール入力（ストリーミング時はJSON文字列）で処理を進める.
+    同期版・非同期版・ストリーミング版がこの手順を共有する.
+    known_outを渡すと、ルールで抽出済みのフィールドが最初のyieldまでに入る.
     """
     # 1. PIIマスク
-    masked_text = mask_pii(job_text)
+    with stage("mask_pii", chars=len(job_text)):
+        masked_text = mask_pii(job_text)
+
+    # 2. 見出し形式ならルールで抽出する. 十分に埋まれば、LLMには判断の要るフィールドだけを問い合わせる
+    known, rule_coverage = _extract_known(masked_text)
+    judgment_only = bool(known) and rule_coverage >= get_min_coverage()
+    if judgment_only and not missing_fields(known, judgment_only=True):
+        return JobSpec.model_validate(known)
+    if known_out is not None:
+        known_out.update(known)
 
-    # 2. プロンプト組み立て
-    prompt = STRUCTURE_PROMPT_TEMPLATE.format(job_text=masked_text)
+    cache = get_structure_cache() if use_cache and is_api_available() else None
+    cache_key = ""
+    if cache is not None:
+        cache_key = cache.make_key(masked_text)
+        cached = cache.get(cache_key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    # 3. プロンプト組み立て（共通指示はキャッシュ対象のsystemに置き、出力形式はツールで指定）
+    #    ルールで抽出済みのフィールドがあれば、不足フィールドだけを問い合わせる
+    with stage("build_prompt"):
+        prompt = STRUCTURE_USER_TEMPLATE.format(job_text=masked_text)
+        if known:
+            missing = missing_fields(known, judgment_only=judgment_only)
+            prompt += STRUCTURE_MISSING_FIELDS_NOTE.format(fields="、".join(missing))
+            tool = build_jobspec_tool(missing)
+        else:
+            tool = build_jobspec_tool()
 
-    # 3. LLM呼び出し（最大2回リトライ）
-    last_response = ""
+    job = yield from _llm_steps(prompt, tool, known)
+
+    if cache is not None:
+        cache.put(cache_key, job)
+    return job
+
+
+def _llm_steps(
+    prompt: str, tool: dict[str, Any], known: dict[str, Any]
+) -> Generator[dict[str, Any], dict[str, Any] | str, JobSpec]:
+    """LLMに記録させ、knownと合わせて検証する（最大2回）.
+
+    knownの値はLLMの記録内容より優先する.
+    """
+    last_output = ""
     last_error: Exception | None = None
 
     for attempt in range(2):
-        if attempt == 0:
-            current_prompt = prompt
-        else:
-            # リトライ時は修正指示を追加
-            current_prompt = (
-                prompt
-                + f"\n\n---\n前回の出力:\n{last_response}\n\n"
-                "上記の出力はJSONとして壊れています。修正してJSONのみを出力してください。"
-            )
+        request: dict[str, Any] = {
+            "prompt": prompt,
+            "tool": tool,
+            "system": STRUCTURE_SYSTEM_PROMPT,
+        }
+        if attempt > 0:
+            # リトライ時は前回の記録内容をassistantターンとして渡し、エラー内容を伝える
+            request["prompt"] = STRUCTURE_RETRY_PROMPT.format(error=last_error)
+            request["history"] = [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": last_output},
+            ]
 
-        last_response = call_claude(current_prompt)
+        response = yield request
 
-        # 4. JSONパース & バリデーション
+        # ストリーミングで受けたJSON文字列が壊れていればローカルで修復
+        repaired = False
+        if isinstance(response, str):
+            try:
+                with stage("json_loads", attempt=attempt + 1):
+                    data = json.loads(response)
+            except json.JSONDecodeError as e:
+                data = repair_json(response)
+                if data is None:
+                    last_output = response
+                    last_error = e
+                    continue
+                repaired = True
+        else:
+            data = response
+
+        last_output = json.dumps(data, ensure_ascii=False)
         try:
-            data = json.loads(last_response)
-            return JobSpec(**data)
-        except json.JSONDecodeError as e:
-            last_error = e
-            continue
+            with stage("validate", attempt=attempt + 1):
+                job = JobSpec.model_validate(
+                    {**data, **known} if known and isinstance(data, dict) else data
+                )
         except ValidationError as e:
             last_error = e
             continue
 
+        if repaired:
+            repair_stats.incr("saved_round_trips")
+        return job
+
     # 2回失敗した場合
     raise ValueError(f"JSONパース/バリデーションに失敗しました: {last_error}")
 
+
+def _restructure_steps(
+    prev_text: str, prev_job: JobSpec, new_text: str, use_cache: bool
+) -> Generator[dict[str, Any], dict[str, Any] | str, JobSpec]:
+    """編集前後の差分から、変更された見出しに対応するフィールドだけを再抽出する手順."""
+    with stage("mask_pii", chars=len(prev_text) + len(new_text)):
+        prev_masked = mask_pii(prev_text)
+        new_masked = mask_pii(new_text)
+
+    with stage("section_diff"):
+        diff = diff_sections(prev_masked, new_masked)
+        annotate(changed=None if diff is None else len(diff[1]))
+
+    if diff is None:
+        # 見出しに対応づけられない変更・別の案件票は全体を構造化し直す
+        return (yield from _structure_steps(new_text, use_cache))
+
+    changed_fields, changed_headings = diff
+    if not changed_fields:
+        return prev_job
+
+    # 変更のないフィールドは前回の結果を引き継ぎ、変更分はルールで抽出できればそれを使う
+    extracted, _ = _extract_known(new_masked)
+    sections = split_headings(new_masked)
+    present = {field for heading in sections if (field := heading_field(heading))}
+
+    base = prev_job.model_dump()
+    for field in changed_fields:
+        del base[field]
+        if field in extracted:
+            base[field] = extracted[field]
+        elif field not in present and field not in (
+            "remote_type", "stack_keywords", *JUDGMENT_FIELDS
+        ):
+            # 見出しごと削除されたフィールドは未設定に戻す（判断の要るフィールドはLLMに問い合わせる）
+            base[field] = JobSpec.model_fields[field].get_default(call_default_factory=True)
+
+    missing = [field for field in JobSpec.model_fields if field not in base]
+    if not missing:
+        try:
+            return JobSpec.model_validate(base)
+        except ValidationError:
+            return (yield from _structure_steps(new_text, use_cache))
+
+    # ルールで埋まらなかったフィールドだけを問い合わせる. 判断の要るフィールドは案件全体から
+    # 決めるため、そのときは全文を、それ以外は変更された見出しだけを送る
+    with stage("build_prompt"):
+        if set(missing) & set(JUDGMENT_FIELDS):
+            changed_text = new_masked
+        else:
+            changed_text = "\n".join(
+                f"【{heading}】\n" + "\n".join(sections[heading])
+                for heading in changed_headings
+                if heading in sections
+            )
+        prompt = STRUCTURE_USER_TEMPLATE.format(job_text=changed_text)
+        prompt += STRUCTURE_MISSING_FIELDS_NOTE.format(fields="、".join(missing))
+        tool = build_jobspec_tool(missing)
+
+    return (yield from _llm_steps(prompt, tool, base))
+
+
+def _run_steps(
+    steps: Generator[dict[str, Any], dict[str, Any] | str, JobSpec],
+    call: Callable[..., dict[str, Any]],
+    request: dict[str, Any] | None = None,
+    attempt: int = 1,
+) -> JobSpec:
+    """手順を同期のLLM呼び出しで最後まで進める.
+
+    requestを渡した場合は、途中まで進めた手順をその呼び出しから再開する.
+    """
+    mock = not is_api_available()
+    try:
+        if request is None:
+            request = next(steps)
+        while True:
+            with stage("llm_attempt", attempt=attempt, mock=mock):
+                response = call(**request)
+            request = steps.send(response)
+            attempt += 1
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun_steps(
+    steps: Generator[dict[str, Any], dict[str, Any] | str, JobSpec],
+    call: Callable[..., Awaitable[dict[str, Any]]],
+) -> JobSpec:
+    """手順を非同期のLLM呼び出しで最後まで進める."""
+    mock = not is_api_available()
+    try:
+        request = next(steps)
+        attempt = 1
+        while True:
+            with stage("llm_attempt", attempt=attempt, mock=mock):
+                response = await call(**request)
+            request = steps.send(response)
+            attempt += 1
+    except StopIteration as done:
+        return done.value
+
+
+def structure_job(job_text: str, use_cache: bool = True) -> JobSpec:
+    """求人テキストを構造化してJobSpecを返す.
+
+    【見出し】形式の案件票はルールで抽出し、カバー率が十分ならLLMを呼ばない.
+    足りない場合は不足フィールドだけをLLMに問い合わせる.
+    同じ案件票（マスク後テキストが同一）の結果はキャッシュから返す.
+    モックモードではキャッシュを使わない.
+
+    Args:
+        job_text: 求人の生テキスト
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Returns:
+        構造化されたJobSpec
+
+    Raises:
+        ValueError: 2回リトライしてもJSONパース/バリデーションに失敗した場合
+    """
+    with stage("structure_job"):
+        return _run_steps(_structure_steps(job_text, use_cache), call_claude_tool)
+
+
+async def astructure_job(job_text: str, use_cache: bool = True) -> JobSpec:
+    """structure_jobの非同期版.
+
+    LLM呼び出しはacall_claude_tool経由で、同時実行数はセマフォで制限される.
+    タスクのキャンセルは実行中のLLM呼び出しまで伝播する.
+
+    Args:
+        job_text: 求人の生テキスト
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Returns:
+        構造化されたJobSpec
+
+    Raises:
+        ValueError: 2回リトライしてもJSONパース/バリデーションに失敗した場合
+    """
+    with stage("structure_job"):
+        return await _arun_steps(_structure_steps(job_text, use_cache), acall_claude_tool)
+
+
+def restructure_job(
+    prev_text: str, prev_job: JobSpec, new_text: str, use_cache: bool = True
+) -> JobSpec:
+    """編集された案件票を、前回の結果との差分だけ構造化し直す.
+
+    見出し単位で前回のテキストと比較し、変更された見出しに対応するフィールドだけを
+    ルールで再抽出する. ルールで埋まらないものは変更された見出しだけをLLMに送って補う.
+    見出しの外や未知の見出しが変わった場合は structure_job と同じく全体を構造化する.
+
+    Args:
+        prev_text: 前回構造化した求人テキスト
+        prev_job: prev_textの構造化結果
+        new_text: 編集後の求人テキスト
+        use_cache: Falseならキャッシュを参照・保存しない（全体を構造化し直す場合）
+
+    Returns:
+        構造化されたJobSpec
+
+    Raises:
+        ValueError: 2回リトライしてもJSONパース/バリデーションに失敗した場合
+    """
+    with stage("restructure_job"):
+        return _run_steps(
+            _restructure_steps(prev_text, prev_job, new_text, use_cache), call_claude_tool
+        )
+
+
+def stream_structure_job(job_text: str, use_cache: bool = True) -> Iterator[JobSpec]:
+    """求人テキストをストリーミングで構造化し、途中経過のJobSpecを順に返す.
+
+    LLMのツール入力（JSON）を逐次解析し、トップレベルのフィールドが閉じるたびに
+    そこまでの値を埋めたJobSpecを返す（未確定のフィールドは未設定のまま）.
+    最後に返すJobSpecが最終結果で、structure_jobと同じ検証・リトライを経ている.
+
+    Args:
+        job_text: 求人の生テキスト
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Yields:
+        途中経過のJobSpec（最後の1件が完成版）
+
+    Raises:
+        ValueError: 2回リトライしてもJSONパース/バリデーションに失敗した場合
+    """
+    known: dict[str, Any] = {}
+    steps = _structure_steps(job_text, use_cache, known_out=known)
+    try:
+        request = next(steps)
+    except StopIteration as done:
+        # ルールで構造化できた / キャッシュヒット
+        yield done.value
+        return
+
+    parser = PartialObjectParser()
+    # ルールで抽出済みのフィールドは先に表示し、LLMの値で上書きしない
+    fields: dict[str, Any] = dict(known)
+    chunks: list[str] = []
+    if fields:
+        yield JobSpec.model_validate(fields)
+
+    # ジェネレータをまたぐためwithは使わず、所要時間を直接記録する
+    started = time.perf_counter()
+    for chunk in stream_claude_tool(**request):
+        chunks.append(chunk)
+        closed = parser.feed(chunk)
+        if not closed:
+            continue
+        updated = False
+        for key, value in closed.items():
+            if key not in JobSpec.model_fields or key in known:
+                continue
+            try:
+                JobSpec.model_validate({key: value})
+            except ValidationError:
+                # 不正な値は途中経過に出さず、最終検証に任せる
+                continue
+            fields[key] = value
+            updated = True
+        if updated:
+            yield JobSpec.model_validate(fields)
+
+    record(
+        "llm_attempt",
+        time.perf_counter() - started,
+        attempt=1,
+        stream=True,
+        mock=not is_api_available(),
+    )
+
+    # 最終結果はstructure_jobと同じ手順で検証し、壊れていれば通常呼び出しでリトライ
+    try:
+        request = steps.send("".join(chunks))
+    except StopIteration as done:
+        yield done.value
+        return
+    yield _run_steps(steps, call_claude_tool, request=request, attempt=2)
+
+
+def _structure_one(index: int, job_text: str, use_cache: bool) -> StructureResult:
+    """1件を構造化し、例外も結果として返す."""
+    try:
+        return StructureResult(index=index, job=structure_job(job_text, use_cache=use_cache))
+    except Exception as e:
+        return StructureResult(index=index, error=e)
+
+
+def iter_structure_jobs(
+    texts: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    use_cache: bool = True,
+) -> Iterator[StructureResult]:
+    """複数の求人テキストを並列に構造化し、完了した順に結果を返す.
+
+    入力は遅延的に読み出し、同時に保持する未完了タスクは max_workers の2倍まで.
+    1件の失敗で全体は止まらず、エラーは StructureResult.error に入る.
+
+    Args:
+        texts: 求人の生テキスト（イテレータ可）
+        max_workers: 並列実行するスレッド数
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Yields:
+        完了順の StructureResult（index は入力順の位置）
+    """
+    inputs = enumerate(texts)
+    pending: dict[Future[StructureResult], int] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="structure") as pool:
+
+        def submit_next() -> bool:
+            item = next(inputs, None)
+            if item is None:
+                return False
+            index, job_text = item
+            pending[pool.submit(_structure_one, index, job_text, use_cache)] = index
+            return True
+
+        try:
+            for _ in range(max_workers * 2):
+                if not submit_next():
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    yield future.result()
+                    submit_next()
+        finally:
+            # 途中で打ち切られた場合は未着手のタスクを捨てる
+            for future in pending:
+                future.cancel()
+
+
+def structure_jobs(
+    texts: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    use_cache: bool = True,
+) -> list[StructureResult]:
+    """複数の求人テキストを並列に構造化する.
+
+    Args:
+        texts: 求人の生テキスト
+        max_workers: 並列実行するスレッド数
+        use_cache: Falseならキャッシュを参照・保存しない
+
+    Returns:
+        入力順に並んだ StructureResult のリスト
+    """
+    return sorted(
+        iter_structure_jobs(texts, max_workers=max_workers, use_cache=use_cache),
+        key=lambda result: result.index,
+    )
@@ -2,38 +2,100 @@
 
 from __future__ import annotations
 
-from typing import Literal
+import copy
+from functools import lru_cache
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from src.utils.vocabulary import canonicalize_keywords
+
+# 構造化に使うツール名（LLMに強制呼び出しさせる）
+JOBSPEC_TOOL_NAME = "record_job_spec"
 
 
 class Rate(BaseModel):
     """報酬レンジを表すモデル."""
 
-    min: float | None = None
-    max: float | None = None
-    unit: Literal["hourly", "daily", "monthly", "yearly"] | None = None
+    min: float | None = Field(default=None, description="下限金額（円）")
+    max: float | None = Field(default=None, description="上限金額（円）")
+    unit: Literal["hourly", "daily", "monthly", "yearly"] | None = Field(
+        default=None, description="金額の単位期間"
+    )
 
 
 class JobSpec(BaseModel):
     """求人情報を表すメインモデル."""
 
-    title: str | None = None
-    company: str | None = None
-    role: str | None = None
-    summary: str | None = None
-    must_requirements: list[str] = Field(default_factory=list)
-    nice_to_have: list[str] = Field(default_factory=list)
-    tasks: list[str] = Field(default_factory=list)
-    stack_keywords: list[str] = Field(default_factory=list)
-    location: str | None = None
-    remote_type: Literal["full_remote", "hybrid", "on_site"] | None = None
-    rate: Rate | None = None
-    start_date: str | None = None
-    duration: str | None = None
-    interview_count: int | None = None
-    working_hours: str | None = None
-    contract_type: str | None = None
-    notes: str | None = None
-    risks_or_unknowns: list[str] = Field(default_factory=list)
+    title: str | None = Field(default=None, description="案件タイトル")
+    company: str | None = Field(default=None, description="企業名")
+    role: str | None = Field(default=None, description="ポジション・役割")
+    summary: str | None = Field(default=None, description="案件概要（1〜3文）")
+    must_requirements: list[str] = Field(default_factory=list, description="必須スキル・経験")
+    nice_to_have: list[str] = Field(default_factory=list, description="歓迎スキル・経験")
+    tasks: list[str] = Field(default_factory=list, description="業務内容")
+    stack_keywords: list[str] = Field(default_factory=list, description="技術キーワード")
+    location: str | None = Field(default=None, description="勤務地")
+    remote_type: Literal["full_remote", "hybrid", "on_site"] | None = Field(
+        default=None, description="リモート可否（フル/一部/出社）"
+    )
+    rate: Rate | None = Field(default=None, description="報酬レンジ")
+    start_date: str | None = Field(default=None, description="開始時期（例: 2024年2月〜、即日可）")
+    duration: str | None = Field(default=None, description="期間（例: 3ヶ月〜、長期）")
+    interview_count: int | None = Field(default=None, description="面談回数")
+    working_hours: str | None = Field(default=None, description="稼働時間（例: 週5日、140-180h/月）")
+    contract_type: str | None = Field(default=None, description="契約形態（例: 業務委託、派遣）")
+    notes: str | None = Field(default=None, description="備考・特記事項")
+    risks_or_unknowns: list[str] = Field(default_factory=list, description="不明点・懸念点")
+
+    @field_validator("stack_keywords")
+    @classmethod
+    def _canonicalize_stack_keywords(cls, value: list[str]) -> list[str]:
+        """技術キーワードを正式名にそろえる（AWS / Amazon Web Services / ＡＷＳ → AWS）."""
+        return canonicalize_keywords(value)
+
+
+def _inline_refs(node: Any, defs: dict[str, Any]) -> Any:
+    """JSON Schemaの `$ref` を `$defs` の内容で置き換える."""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            resolved = _inline_refs(copy.deepcopy(defs[ref.rsplit("/", 1)[1]]), defs)
+            siblings = {k: v for k, v in node.items() if k != "$ref"}
+            return {**resolved, **_inline_refs(siblings, defs)}
+        return {k: _inline_refs(v, defs) for k, v in node.items() if k != "$defs"}
+    if isinstance(node, list):
+        return [_inline_refs(item, defs) for item in node]
+    return node
+
+
+@lru_cache(maxsize=1)
+def _jobspec_input_schema() -> dict[str, Any]:
+    """JobSpecのJSON Schema（参照を展開済み）."""
+    schema = JobSpec.model_json_schema()
+    return _inline_refs(schema, schema.get("$defs", {}))
+
+
+def build_jobspec_tool(fields: list[str] | None = None) -> dict[str, Any]:
+    """JobSpecを記録するツール定義を返す.
+
+    入力スキーマは JobSpec.model_json_schema() から生成するため、
+    モデルを変更すればツール定義も自動的に追従する.
+
+    Args:
+        fields: 記録させるフィールド名（Noneなら全フィールド）
 
+    Returns:
+        Messages APIの tools に渡すツール定義
+    """
+    schema = copy.deepcopy(_jobspec_input_schema())
+    if fields is not None:
+        wanted = set(fields)
+        schema["properties"] = {k: v for k, v in schema["properties"].items() if k in wanted}
+        if "required" in schema:
+            schema["required"] = [k for k in schema["required"] if k in wanted]
+    return {
+        "name": JOBSPEC_TOOL_NAME,
+        "description": "求人テキストから抽出した構造化データを記録する。",
+        "input_schema": schema,
+    }
@@ -0,0 +1,500 @@
+"""案件履歴の永続ストア（SQLite / WALモード）.
+
+一覧表示に必要な列（タイトル・企業名・日時・JobSpec）と、生成済みテキスト
+（サマリ・メール・質問）を別テーブルに分け、テキストは履歴を開いたときだけ読む.
+WALモードなので、書き込み中でも他のスレッド・プロセスから読み出せる.
+
+    store = get_history_store()
+    entry_id = store.add("Pythonエンジニア", job, summary, email, questions)
+    for entry in store.recent(limit=20):
+        ...
+    artifacts = store.load_artifacts(entry_id)
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.pipeline.semantic import SemanticIndex
+from src.pipeline.similarity import SimilarityIndex, normalize_keywords
+from src.schema import JobSpec
+from src.utils.vocabulary import get_vocabulary
+
+# 既定の保存先（環境変数 JOBSPEC_HISTORY_PATH で上書き、空文字でメモリのみ）
+DEFAULT_HISTORY_PATH = ".jobspec/history.sqlite3"
+
+# 文字n-gramの類似検索で、検索時にその場で取り込む追加分の上限.
+# これより多ければ別スレッドで取り込み、使えるようになるまでは技術キーワードの類似度で答える
+SEMANTIC_SYNC_LIMIT = 200
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " created_at REAL NOT NULL,"
+    " title TEXT NOT NULL,"
+    " company TEXT,"
+    " job_json TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_history_created_at ON history (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_history_title ON history (title)",
+    "CREATE INDEX IF NOT EXISTS idx_history_company ON history (company)",
+    # 生成済みテキスト（履歴を開いたときだけ読む）
+    "CREATE TABLE IF NOT EXISTS history_artifacts ("
+    " entry_id INTEGER PRIMARY KEY REFERENCES history (id) ON DELETE CASCADE,"
+    " summary TEXT NOT NULL,"
+    " email TEXT NOT NULL,"
+    " questions_json TEXT NOT NULL)",
+    # 正規化済みの技術キーワード
+    "CREATE TABLE IF NOT EXISTS history_keywords ("
+    " keyword TEXT NOT NULL,"
+    " entry_id INTEGER NOT NULL REFERENCES history (id) ON DELETE CASCADE,"
+    " PRIMARY KEY (keyword, entry_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_history_keywords_entry ON history_keywords (entry_id)",
+    # 追加・削除のたびに増える版数（キャッシュの無効化に使う）
+    "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO history_meta (key, value) VALUES ('version', 0)",
+    "CREATE TRIGGER IF NOT EXISTS history_version_insert AFTER INSERT ON history BEGIN"
+    " UPDATE history_meta SET value = value + 1 WHERE key = 'version'; END",
+    "CREATE TRIGGER IF NOT EXISTS history_version_delete AFTER DELETE ON history BEGIN"
+    " UPDATE history_meta SET value = value + 1 WHERE key = 'version'; END",
+)
+
+_ENTRY_COLUMNS = "id, created_at, title, company, job_json"
+
+_memory_ids = itertools.count()
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """履歴1件分（一覧表示用。生成済みテキストは含まない）."""
+
+    id: int
+    created_at: float
+    title: str
+    company: str | None
+    job: JobSpec
+
+
+@dataclass(frozen=True)
+class HistoryArtifacts:
+    """履歴1件分の生成済みテキスト."""
+
+    summary: str
+    email: str
+    questions: list[str]
+
+
+def _entry(row: tuple) -> HistoryEntry:
+    entry_id, created_at, title, company, job_json = row
+    return HistoryEntry(
+        id=entry_id,
+        created_at=created_at,
+        title=title,
+        company=company,
+        job=JobSpec.model_validate_json(job_json),
+    )
+
+
+class HistoryStore:
+    """案件履歴のSQLiteストア.
+
+    接続はスレッドごとに持ち、書き込みはプロセス内でロックして直列化する.
+    """
+
+    def __init__(self, path: str | None = DEFAULT_HISTORY_PATH, busy_timeout: float = 5.0) -> None:
+        """ストアを開く（なければ作る）.
+
+        Args:
+            path: SQLiteファイルのパス（Noneまたは空ならメモリのみ）
+            busy_timeout: 他プロセスの書き込みを待つ秒数
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._uri = Path(path).resolve().as_uri()
+        else:
+            # メモリ上のDBをスレッド間で共有する
+            self._uri = f"file:jobspec_history_{next(_memory_ids)}?mode=memory&cache=shared"
+        self._memory = not path
+        self._busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._index: SimilarityIndex | None = None
+        self._index_max_id = 0
+        self._semantic: SemanticIndex | None = None
+        self._semantic_max_id = 0
+        # 文字n-gramのインデックスはDBの隣に保存し、次回は読み込んで追加分だけを取り込む
+        self._semantic_dir = Path(path).with_suffix(".semantic") if path else None
+        self._semantic_thread: threading.Thread | None = None
+        self._semantic_generation = 0
+        self._index_lock = threading.Lock()
+
+        # メモリDBは接続が1つでも残っていれば消えないため、最初の接続を保持しておく
+        self._anchor = self._connect()
+        with self._anchor:
+            for statement in _SCHEMA:
+                self._anchor.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, timeout=self._busy_timeout)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if self._memory:
+            # 共有キャッシュはテーブル単位でロックするため、読み出しが書き込みを妨げないようにする
+            conn.execute("PRAGMA read_uncommitted=ON")
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """このスレッドの接続."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def add(
+        self, title: str, job: JobSpec, summary: str, email: str, questions: list[str]
+    ) -> int:
+        """履歴を1件追加する.
+
+        Returns:
+            追加した履歴のID
+        """
+        return self.add_many([(title, job, summary, email, questions)])[0]
+
+    def add_many(
+        self, entries: Iterable[tuple[str, JobSpec, str, str, list[str]]]
+    ) -> list[int]:
+        """履歴をまとめて1トランザクションで追加する.
+
+        Args:
+            entries: (タイトル, JobSpec, サマリ, メール, 質問) のイテラブル
+
+        Returns:
+            追加した履歴のID（入力順）
+        """
+        now = time.time()
+        ids: list[int] = []
+        with self._write_lock, self._conn as conn:
+            for title, job, summary, email, questions in entries:
+                cursor = conn.execute(
+                    "INSERT INTO history (created_at, title, company, job_json)"
+                    " VALUES (?, ?, ?, ?)",
+                    (
+                        now,
+                        title or "無題の案件",
+                        job.company,
+                        job.model_dump_json(exclude_defaults=True),
+                    ),
+                )
+                entry_id = cursor.lastrowid
+                conn.execute(
+                    "INSERT INTO history_artifacts (entry_id, summary, email, questions_json)"
+                    " VALUES (?, ?, ?, ?)",
+                    (entry_id, summary, email, json.dumps(questions, ensure_ascii=False)),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO history_keywords (keyword, entry_id) VALUES (?, ?)",
+                    [(kw, entry_id) for kw in normalize_keywords(job.stack_keywords)],
+                )
+                ids.append(entry_id)
+        return ids
+
+    def get(self, entry_id: int) -> HistoryEntry | None:
+        """IDで履歴を取得する."""
+        row = self._conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM history WHERE id = ?", (entry_id,)
+        ).fetchone()
+        return _entry(row) if row else None
+
+    def get_many(self, entry_ids: Iterable[int]) -> dict[int, HistoryEntry]:
+        """複数のIDで履歴を取得する（存在しないIDは含まれない）."""
+        ids = list(entry_ids)
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        rows = self._conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM history WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        return {row[0]: _entry(row) for row in rows}
+
+    def recent(self, limit: int = 20, offset: int = 0) -> list[HistoryEntry]:
+        """新しい順に履歴を返す."""
+        rows = self._conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM history"
+            " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+        return [_entry(row) for row in rows]
+
+    def search(
+        self,
+        title: str | None = None,
+        company: str | None = None,
+        keyword: str | None = None,
+        limit: int = 20,
+    ) -> list[HistoryEntry]:
+        """条件に合う履歴を新しい順に返す.
+
+        Args:
+            title: タイトルの前方一致
+            company: 企業名の完全一致
+            keyword: 技術キーワード（表記揺れは正式名にそろえて比べる）
+            limit: 最大件数
+        """
+        clauses: list[str] = []
+        params: list[object] = []
+        if title:
+            clauses.append("title >= ? AND title < ?")
+            params += [title, title + "\U0010ffff"]
+        if company:
+            clauses.append("company = ?")
+            params.append(company)
+        if keyword:
+            clauses.append("id IN (SELECT entry_id FROM history_keywords WHERE keyword = ?)")
+            params.append(next(iter(normalize_keywords([keyword])), ""))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM history{where}"
+            " ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [_entry(row) for row in rows]
+
+    def load_artifacts(self, entry_id: int) -> HistoryArtifacts | None:
+        """履歴の生成済みテキストを読み込む."""
+        row = self._conn.execute(
+            "SELECT summary, email, questions_json FROM history_artifacts WHERE entry_id = ?",
+            (entry_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        summary, email, questions_json = row
+        return HistoryArtifacts(summary=summary, email=email, questions=json.loads(questions_json))
+
+    def version(self) -> int:
+        """履歴の版数（どのプロセスからでも、追加・削除のたびに増える）."""
+        return self._conn.execute(
+            "SELECT value FROM history_meta WHERE key = 'version'"
+        ).fetchone()[0]
+
+    def count(self) -> int:
+        """履歴の件数."""
+        return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def delete(self, entry_id: int) -> bool:
+        """履歴を1件削除する."""
+        with self._write_lock, self._conn as conn:
+            deleted = conn.execute("DELETE FROM history WHERE id = ?", (entry_id,)).rowcount > 0
+        with self._index_lock:
+            if self._index is not None:
+                self._index.remove(entry_id)
+            if self._semantic is not None:
+                self._semantic.remove(entry_id)
+        return deleted
+
+    def clear(self) -> None:
+        """全履歴を削除する."""
+        with self._write_lock, self._conn as conn:
+            conn.execute("DELETE FROM history")
+        with self._index_lock:
+            self._index = None
+            self._index_max_id = 0
+            self._semantic = None
+            self._semantic_max_id = 0
+            # 取り込み中のスレッドの結果は捨てる
+            self._semantic_generation += 1
+            self._semantic_thread = None
+        if self._semantic_dir is not None:
+            shutil.rmtree(self._semantic_dir, ignore_errors=True)
+
+    def iter_keywords(self, after_id: int = 0) -> Iterator[tuple[int, list[str]]]:
+        """after_idより後の履歴の (ID, 正規化済みキーワード) を順に返す."""
+        rows = self._conn.execute(
+            "SELECT entry_id, keyword FROM history_keywords"
+            " WHERE entry_id > ? ORDER BY entry_id",
+            (after_id,),
+        )
+        for entry_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+            yield entry_id, [keyword for _, keyword in group]
+
+    def iter_jobs(self, after_id: int = 0) -> Iterator[tuple[int, JobSpec]]:
+        """after_idより後の履歴の (ID, JobSpec) を順に返す."""
+        rows = self._conn.execute(
+            "SELECT id, job_json FROM history WHERE id > ? ORDER BY id", (after_id,)
+        )
+        for entry_id, job_json in rows:
+            yield entry_id, JobSpec.model_validate_json(job_json)
+
+    def semantic_ready(self) -> bool:
+        """文字n-gramの類似検索が使えるか（Falseのあいだ similar は技術キーワードで答える）."""
+        with self._index_lock:
+            return self._semantic is not None
+
+    def prepare_semantic(self) -> None:
+        """文字n-gramのインデックスの読み込みと追加分の取り込みを別スレッドで始める.
+
+        起動時に呼んでおくと、最初の類似検索を待たずに準備できる. 実行中なら何もしない.
+        """
+        with self._index_lock:
+            self._start_semantic_sync()
+
+    def _start_semantic_sync(self) -> None:
+        """_index_lock を持って呼ぶ."""
+        if self._semantic_thread is not None:
+            return
+        self._semantic_thread = threading.Thread(
+            target=self._sync_semantic,
+            args=(self._semantic_generation,),
+            name="semantic-index",
+            daemon=True,
+        )
+        self._semantic_thread.start()
+
+    def _catch_up_semantic(self) -> SemanticIndex | None:
+        """検索に使う文字n-gramのインデックス（_index_lock を持って呼ぶ）.
+
+        追加分が SEMANTIC_SYNC_LIMIT 件以下ならその場で取り込み、多ければ別スレッドに任せて
+        取り込み済みの分で答える. まだ一度も使える状態になっていなければNone.
+        """
+        if self._semantic_thread is not None:
+            return self._semantic
+        if self._semantic is None:
+            self._start_semantic_sync()
+            return None
+        pending = self._conn.execute(
+            "SELECT COUNT(*) FROM history WHERE id > ?", (self._semantic_max_id,)
+        ).fetchone()[0]
+        if pending > SEMANTIC_SYNC_LIMIT:
+            self._start_semantic_sync()
+        elif pending:
+            for entry_id, entry_job in self.iter_jobs(self._semantic_max_id):
+                self._semantic.add_job(entry_id, entry_job)
+                self._semantic_max_id = entry_id
+        return self._semantic
+
+    def _load_semantic(self) -> tuple[SemanticIndex, int]:
+        """保存済みのインデックスと、取り込み済みの最大IDを返す（使えなければ空のインデックス）."""
+        if self._semantic_dir is not None and self._semantic_dir.exists():
+            try:
+                index = SemanticIndex.load(self._semantic_dir)
+            except (OSError, ValueError, KeyError):
+                index = None
+            if index is not None:
+                max_id = max((i for i in index.ids() if isinstance(i, int)), default=0)
+                row = self._conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'history'"
+                ).fetchone()
+                # DBより新しいIDを持っていれば別のDBのインデックスなので使わない
+                if max_id <= (row[0] if row else 0):
+                    return index, max_id
+        return SemanticIndex(), 0
+
+    def _sync_semantic(self, generation: int) -> None:
+        """インデックスを読み込み、追加分を取り込んで保存する（別スレッドで実行）."""
+        try:
+            with self._index_lock:
+                index, after_id = self._semantic, self._semantic_max_id
+            if index is None:
+                index, after_id = self._load_semantic()
+                if after_id:
+                    # 保存済みの分だけでも先に検索に使う
+                    with self._index_lock:
+                        if generation != self._semantic_generation:
+                            return
+                        self._semantic, self._semantic_max_id = index, after_id
+
+            last_id = after_id
+            for entry_id, entry_job in self.iter_jobs(after_id):
+                index.add_job(entry_id, entry_job)
+                last_id = entry_id
+
+            with self._index_lock:
+                if generation != self._semantic_generation:
+                    return
+                self._semantic = index
+                self._semantic_max_id = max(self._semantic_max_id, last_id)
+            if self._semantic_dir is not None:
+                index.save(self._semantic_dir)
+        finally:
+            with self._index_lock:
+                if self._semantic_thread is threading.current_thread():
+                    self._semantic_thread = None
+            # このスレッドの接続は以後使わない
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                del self._local.conn
+
+    def similar(
+        self,
+        job: JobSpec,
+        top_k: int = 3,
+        exclude: Iterable[int] = (),
+        semantic: bool = False,
+    ) -> list[tuple[HistoryEntry, float, list[str]]]:
+        """似ている履歴を返す.
+
+        類似検索のインデックスはストアごとに1つ持ち、前回以降に追加された履歴
+        （他のプロセスが追加したものを含む）だけを差分で取り込む.
+
+        Args:
+            job: 検索する案件
+            top_k: 返す件数
+            exclude: 結果から除く履歴ID
+            semantic: Trueなら概要・業務内容なども含めた文字n-gram TF-IDFで比べる
+                （Falseなら技術キーワードのJaccard類似度. Trueでもインデックスの
+                読み込み・構築が終わるまではこちらで答える）
+
+        Returns:
+            (履歴, 類似度, 共通キーワード) のリスト
+        """
+        with self._index_lock:
+            semantic_index = self._catch_up_semantic() if semantic else None
+            if semantic_index is not None:
+                hits = semantic_index.query_job(job, top_k=top_k, exclude=exclude)
+            else:
+                if self._index is None:
+                    self._index = SimilarityIndex()
+                for entry_id, keywords in self.iter_keywords(self._index_max_id):
+                    self._index.add(entry_id, keywords)
+                    self._index_max_id = entry_id
+                hits = self._index.query_job(job, top_k=top_k, exclude=exclude)
+
+        entries = self.get_many(hit[0] for hit in hits)
+        vocabulary = get_vocabulary()
+        keywords = vocabulary.keyword_map(job.stack_keywords)
+        results = []
+        for hit in hits:
+            # 他のプロセスで削除された履歴は除く
+            entry = entries.get(hit[0])
+            if entry is None:
+                continue
+            common = keywords.keys() & vocabulary.keyword_map(entry.job.stack_keywords).keys()
+            results.append((entry, hit[1], sorted(keywords[term_id] for term_id in common)))
+        return results
+
+
+_default_store: HistoryStore | None = None
+_default_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """共有の履歴ストアを返す（環境変数 JOBSPEC_HISTORY_PATH で保存先を指定）."""
+    global _default_store
+
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = HistoryStore(
+                    os.environ.get("JOBSPEC_HISTORY_PATH", DEFAULT_HISTORY_PATH)
+                )
+    return _default_store
@@ -0,0 +1,144 @@
+"""Streamlit の再実行をまたいだキャッシュ.
+
+ウィジェットを操作するたびにスクリプト全体が再実行されるため、入力が変わらない限り
+同じ結果になる処理はここを通す.
+
+- 生成物（エクスポート・JSON表示・類似案件）は `st.cache_data`.
+  JobSpec はハッシュ計算が重いので、内容のハッシュ（`job_key`）をキーにし、
+  本体は `_job` 引数（Streamlitがハッシュしない）で渡す
+- 共有クライアント・履歴ストア・ジョブ実行器は `st.cache_resource`
+
+各キャッシュの呼び出し回数と実行回数（ミス）は `cache_stats` に記録する.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import streamlit as st
+
+from src.llm.client import warm_up_client
+from src.llm.resilience import Counters
+from src.pipeline.generate import generate_export_markdown
+from src.pipeline.jobs import JobExecutor
+from src.schema import JobSpec
+from src.storage.history import HistoryEntry, HistoryStore, get_history_store
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# "<名前>.calls" / "<名前>.misses" の形で記録する
+cache_stats = Counters()
+
+
+def content_key(*parts: str) -> str:
+    """文字列の並びから内容のハッシュを作る."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def job_key(job: JobSpec) -> str:
+    """JobSpecの内容のハッシュ."""
+    return content_key(job.model_dump_json())
+
+
+def cached_data(name: str, **kwargs: Any) -> Callable[[F], F]:
+    """`st.cache_data` に呼び出し回数・ミス回数の記録を加えたデコレータ."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def compute(*args: Any, **kw: Any) -> Any:
+            # キャッシュにないときだけ実行される
+            cache_stats.incr(f"{name}.misses")
+            return func(*args, **kw)
+
+        cached = st.cache_data(show_spinner=False, **kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kw: Any) -> Any:
+            cache_stats.incr(f"{name}.calls")
+            return cached(*args, **kw)
+
+        wrapper.clear = cached.clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def get_cache_stats() -> list[dict[str, Any]]:
+    """キャッシュごとの呼び出し回数・ヒット数・ヒット率."""
+    values = cache_stats.snapshot()
+    names = sorted({key.rsplit(".", 1)[0] for key in values})
+    rows = []
+    for name in names:
+        calls = values.get(f"{name}.calls", 0)
+        hits = calls - values.get(f"{name}.misses", 0)
+        rows.append({
+            "cache": name,
+            "calls": calls,
+            "hits": hits,
+            "hit_rate": hits / calls if calls else 0.0,
+        })
+    return rows
+
+
+@st.cache_resource(show_spinner=False)
+def warm_up() -> None:
+    """Anthropicクライアントの事前接続（プロセス内で初回のみ）."""
+    warm_up_client()
+
+
+@st.cache_resource(show_spinner=False)
+def history_store() -> HistoryStore:
+    """全セッションで共有する履歴ストア（類似検索のインデックスは裏で準備を始める）."""
+    store = get_history_store()
+    store.prepare_semantic()
+    return store
+
+
+@st.cache_resource(show_spinner=False)
+def job_executor() -> JobExecutor:
+    """全セッションで共有するジョブ実行器."""
+    return JobExecutor()
+
+
+@cached_data("export_markdown", max_entries=64)
+def export_markdown(
+    key: str, _job: JobSpec, summary: str, email: str, questions: list[str]
+) -> str:
+    """エクスポート用のMarkdown."""
+    return generate_export_markdown(_job, summary, email, questions)
+
+
+@cached_data("job_json", max_entries=64)
+def job_json(key: str, _job: JobSpec) -> str:
+    """表示用に整形したJobSpecのJSON."""
+    return json.dumps(_job.model_dump(), ensure_ascii=False, indent=2)
+
+
+@cached_data("recent_history", max_entries=16)
+def recent_history(version: int, limit: int) -> list[HistoryEntry]:
+    """新しい順の履歴（versionが変わるまで再取得しない）."""
+    return history_store().recent(limit=limit)
+
+
+@cached_data("similar_history", max_entries=256)
+def similar_history(
+    key: str,
+    _job: JobSpec,
+    version: int,
+    top_k: int,
+    exclude: tuple[int, ...],
+    semantic_ready: bool,
+) -> list[tuple[HistoryEntry, float, list[str]]]:
+    """似ている履歴（versionが変わるまで再計算しない）.
+
+    インデックスの準備中は技術キーワードの類似度で答えるため、準備ができたら計算し直す.
+    """
+    return history_store().similar(_job, top_k=top_k, exclude=exclude, semantic=True)
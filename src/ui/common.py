@@ -0,0 +1,29 @@
+"""複数のページで使うUI部品."""
+
+from __future__ import annotations
+
+import secrets
+from collections.abc import Callable
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+
+def session_id() -> str:
+    """このセッションのID（ジョブの持ち主）.
+
+    推測できない乱数で、このセッションの状態にだけ持つ（URLには出さない）. URLを知っていても
+    他のセッションのジョブや結果は見えない代わりに、ページを再読み込みすると新しいセッションになる.
+    """
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = secrets.token_urlsafe(32)
+    return st.session_state["session_id"]
+
+
+def lazy_download_button(label: str, build: Callable[[], str], file_name: str, mime: str) -> None:
+    """押されたときに内容を作るダウンロードボタン."""
+    try:
+        st.download_button(label, data=build, file_name=file_name, mime=mime)
+    except StreamlitAPIException:
+        # dataに関数を渡せない古いStreamlitでは、表示時に作る
+        st.download_button(label, data=build(), file_name=file_name, mime=mime)
@@ -0,0 +1,211 @@
+"""パイプラインの処理段階ごとの計測（所要時間・属性）.
+
+無効時（既定）は stage() が共有のダミーを返すだけなので、ほぼコストはかからない.
+環境変数 JOBSPEC_METRICS=1 または enable() で有効になる.
+
+    with stage("mask_pii"):
+        masked = mask_pii(text)
+
+    add_hook(lambda event: print(event.name, event.duration))
+    get_stage_summary()  # {"mask_pii": {"count": ..., "p50": ..., ...}}
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+# 段階ごとに保持する直近の計測数（パーセンタイル計算用）
+MAX_SAMPLES = 10_000
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    """1段階分の計測結果."""
+
+    name: str
+    duration: float
+    attrs: dict[str, Any] = field(default_factory=dict)
+    error: bool = False
+
+
+_enabled = os.environ.get("JOBSPEC_METRICS", "") not in ("", "0")
+_hooks: list[Callable[[StageEvent], None]] = []
+_samples: dict[str, deque[float]] = {}
+_lock = threading.Lock()
+_current: ContextVar[_Stage | None] = ContextVar("jobspec_stage", default=None)
+
+
+class _Stage:
+    """計測中の段階（withブロック）."""
+
+    __slots__ = ("name", "attrs", "_start", "_token")
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> _Stage:
+        self._token = _current.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        duration = time.perf_counter() - self._start
+        _current.reset(self._token)
+        record(self.name, duration, error=exc_type is not None, **self.attrs)
+        return False
+
+    def annotate(self, **attrs: Any) -> None:
+        """この段階に属性（トークン数など）を追加する."""
+        self.attrs.update(attrs)
+
+
+class _NullStage:
+    """計測無効時に返す何もしない段階."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullStage:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        return False
+
+    def annotate(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable() -> None:
+    """計測を有効にする."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """計測を無効にする."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """計測が有効か."""
+    return _enabled
+
+
+def add_hook(callback: Callable[[StageEvent], None]) -> None:
+    """段階の計測が終わるたびに呼ばれるコールバックを登録する."""
+    with _lock:
+        _hooks.append(callback)
+
+
+def remove_hook(callback: Callable[[StageEvent], None]) -> None:
+    """登録済みのコールバックを解除する."""
+    with _lock:
+        if callback in _hooks:
+            _hooks.remove(callback)
+
+
+def stage(name: str, **attrs: Any) -> _Stage | _NullStage:
+    """段階を計測するコンテキストマネージャを返す.
+
+    Args:
+        name: 段階名（例: "mask_pii", "llm_attempt"）
+        **attrs: イベントに付ける属性（例: attempt=1）
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """実行中の段階に属性を追加する（段階外・無効時は何もしない）."""
+    if not _enabled:
+        return
+    current = _current.get()
+    if current is not None:
+        current.annotate(**attrs)
+
+
+def record(name: str, duration: float, error: bool = False, **attrs: Any) -> None:
+    """計測済みの所要時間を記録する（withで囲めない処理向け）.
+
+    Args:
+        name: 段階名
+        duration: 所要時間（秒）
+        error: 例外で終了したか
+        **attrs: イベントに付ける属性
+    """
+    if not _enabled:
+        return
+    event = StageEvent(name=name, duration=duration, attrs=attrs, error=error)
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=MAX_SAMPLES)
+        samples.append(duration)
+        hooks = tuple(_hooks)
+
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            # 計測の不具合で本処理を止めない
+            pass
+
+
+def timed(name: str) -> Callable[[_F], _F]:
+    """関数呼び出し全体を1段階として計測するデコレータ."""
+
+    def decorator(func: _F) -> _F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def get_stage_summary() -> dict[str, dict[str, float]]:
+    """段階ごとの件数・平均・p50/p95/p99（ミリ秒）を返す."""
+    with _lock:
+        snapshot = {name: sorted(samples) for name, samples in _samples.items()}
+
+    summary: dict[str, dict[str, float]] = {}
+    for name, ordered in snapshot.items():
+        if not ordered:
+            continue
+        summary[name] = {
+            "count": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+        }
+    return summary
+
+
+def reset() -> None:
+    """集計済みの計測値を破棄する（フックは残す）."""
+    with _lock:
+        _samples.clear()
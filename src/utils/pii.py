@@ -1,26 +1,237 @@
-"""個人情報（PII）のマスキングユーティリティ."""
+"""個人情報（PII）のマスキングユーティリティ.
 
+URL・メールアドレス・電話番号・郵便番号・辞書登録した人名を、1つの正規表現で
+1回の走査でマスクする.
+
+線形時間にするため、各パターンは
+- 直前の文字を後読みで制限し、数字列・英数字列の「先頭」からしか照合を始めない
+- 繰り返しは上限付きの強欲（possessive）量指定子にし、バックトラックさせない
+  （メールのドメイン部だけは最大8段の範囲で戻る）
+よう書いている. これにより1位置あたりの照合は定数回で終わり、長い数字とハイフンの
+連続のような入力でも処理時間は入力長に比例する.
+
+    mask_pii("担当: taro@example.co.jp / 090-1234-5678")
+    # → "担当: [EMAIL] / [PHONE]"
+
+    set_pii_names(["山田太郎", "佐藤花子"])       # 人名辞書（環境変数 JOBSPEC_PII_NAMES でも指定可）
+    "".join(mask_pii_stream(open("dump.txt")))    # 大きな入力を分割して処理
+"""
+
+from __future__ import annotations
+
+import os
 import re
+import threading
+from collections.abc import Iterable, Iterator
+
+# 1件のPIIとして扱う最大長（ストリーミング時の重なり幅はこれより長くする）
+MAX_URL_LENGTH = 2048
+MAX_NAME_LENGTH = 64
+_MAX_MATCH_LENGTH = len("https://") + MAX_URL_LENGTH
 
+# ストリーミング時に次のチャンクへ持ち越す文字数
+DEFAULT_STREAM_OVERLAP = _MAX_MATCH_LENGTH + 64
 
-# メールアドレス: user@example.com 形式
-EMAIL_PATTERN = re.compile(
-    r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+# URL: http(s)://… と www.… （URLに使えるASCII文字が続く範囲）
+URL_PATTERN = (
+    r"(?<![A-Za-z0-9])"
+    rf"(?:https?://|www\.)[A-Za-z0-9\-._~:/?#@!$&*+,;=%]{{1,{MAX_URL_LENGTH}}}+"
 )
 
-# 電話番号: 日本の一般的な形式に対応
-# - 090-1234-5678, 090_1234_5678, 09012345678
-# - 03-1234-5678, 0312345678
-# - +81-90-1234-5678
-PHONE_PATTERN = re.compile(
-    r"(?:\+81[-\s]?)?"  # 国際番号（任意）
-    r"0[0-9]{1,4}"      # 市外局番 or 携帯の先頭
-    r"[-\s_]?"          # 区切り（任意）
-    r"[0-9]{1,4}"       # 中間
-    r"[-\s_]?"          # 区切り（任意）
-    r"[0-9]{3,4}"       # 末尾
+# メールアドレス: user@example.com 形式（ローカル部の先頭からのみ照合）
+EMAIL_PATTERN = (
+    r"(?<![A-Za-z0-9._%+-])"
+    r"[A-Za-z0-9._%+-]{1,64}+@"
+    r"(?:[A-Za-z0-9-]{1,63}+\.){1,8}[A-Za-z]{2,24}+"
+    r"(?![A-Za-z0-9-])"
 )
 
+# 電話番号: 日本の一般的な形式に対応（桁数は置換時に検証する）
+# - 090-1234-5678, 090_1234_5678, 090 1234 5678, 09012345678
+# - 03-1234-5678, 03(1234)5678, 0312345678
+# - 090-12345678, 0901234-5678, 03-12345678（区切りが1つ）
+# - +81-90-1234-5678, +819012345678
+_SEP = r"[-‐－ _]"
+PHONE_PATTERN = (
+    r"(?<![0-9+\-‐－])"
+    r"(?:"
+    r"0[0-9]{9,10}+"
+    r"|\+81" + _SEP + r"?+[0-9]{9,10}+"
+    r"|(?:\+81" + _SEP + r"?+0?+[1-9][0-9]{0,3}+|0[0-9]{1,4}+)"
+    r"(?:" + _SEP + r"[0-9]{1,4}+" + _SEP + r"|\([0-9]{1,4}+\))[0-9]{3,4}+"
+    r"|(?:\+81" + _SEP + r"?+0?+[1-9][0-9]{0,7}+|0[0-9]{1,8}+)" + _SEP + r"[0-9]{3,8}+"
+    r")"
+    r"(?![0-9\-‐－])"
+)
+
+# 郵便番号: 〒150-0002、または直後に都道府県名が続く 150-0002
+POSTAL_PATTERN = (
+    r"(?:〒\s*+[0-9]{3}[-－]?[0-9]{4}"
+    r"|(?<![0-9\-－])[0-9]{3}[-－][0-9]{4}(?=\s{0,2}+[^\s0-9]{1,3}[都道府県]))"
+    r"(?![0-9])"
+)
+
+# いずれかのパターンの先頭になり得る文字（人名辞書の先頭文字は別途加える）
+_START_CHARS = r"A-Za-z0-9._%+\-〒"
+
+# マスク後の文字列
+REPLACEMENTS = {
+    "url": "[URL]",
+    "email": "[EMAIL]",
+    "phone": "[PHONE]",
+    "postal": "[POSTAL]",
+    "name": "[NAME]",
+}
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """単語集合を、共通の接頭辞をまとめた正規表現にする.
+
+    分岐は先頭文字ごとに1つしかないため、1位置あたりの照合は最長の単語長で終わる.
+    長い単語を優先するよう、単語の終端は子の後ろに置く.
+    """
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _phone_digits_ok(phone: str) -> bool:
+    """電話番号として妥当な桁数か（国内10〜11桁、+81は市外局番の0を除いて9〜10桁）."""
+    digits = sum(char.isdigit() for char in phone)
+    if phone.startswith("+81"):
+        digits -= 2
+        if phone[3:].lstrip("-‐－ _").startswith("0"):
+            digits -= 1
+        return 9 <= digits <= 10
+    return 10 <= digits <= 11
+
+
+class PiiScanner:
+    """複数種類のPIIを1回の走査でマスクするスキャナ.
+
+    Args:
+        names: マスクする人名（空なら人名はマスクしない）
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        words = sorted({n.strip() for n in names if n.strip() and len(n.strip()) <= MAX_NAME_LENGTH})
+        parts = [
+            f"(?P<url>{URL_PATTERN})",
+            f"(?P<email>{EMAIL_PATTERN})",
+            f"(?P<phone>{PHONE_PATTERN})",
+            f"(?P<postal>{POSTAL_PATTERN})",
+        ]
+        first_chars = _START_CHARS
+        if words:
+            parts.append(f"(?P<name>{_trie_regex(words)})")
+            first_chars += "".join(re.escape(c) for c in sorted({w[0] for w in words}))
+        self.names = tuple(words)
+        # PIIの先頭になり得ない文字（日本語の大半）では、各パターンを試さずに次へ進む
+        self._pattern = re.compile(f"(?=[{first_chars}])(?:" + "|".join(parts) + ")")
+
+    def _replace(self, match: re.Match[str]) -> str:
+        kind = match.lastgroup
+        if kind == "phone" and not _phone_digits_ok(match.group()):
+            return match.group()
+        return REPLACEMENTS[kind]
+
+    def mask(self, text: str) -> str:
+        """テキスト内のPIIをマスクする."""
+        return self._pattern.sub(self._replace, text)
+
+    def mask_stream(
+        self, chunks: Iterable[str], overlap: int = DEFAULT_STREAM_OVERLAP
+    ) -> Iterator[str]:
+        """分割して読み込んだテキストを、全体を保持せずにマスクする.
+
+        チャンク境界をまたぐPIIを取りこぼさないよう、末尾overlap文字は次のチャンクと
+        合わせてから処理する. 出力を連結すると mask(全体) と同じになる.
+
+        Args:
+            chunks: テキストの断片（ファイルオブジェクトなど）
+            overlap: 持ち越す文字数（1件のPIIの最大長より長くすること）
+
+        Yields:
+            マスク済みテキストの断片
+        """
+        if overlap <= _MAX_MATCH_LENGTH:
+            raise ValueError("overlap はPIIの最大長より長くしてください")
+
+        buffer = ""
+        # buffer[:start] は処理済みで、後読みの文脈としてだけ残している
+        start = 0
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) - start <= 2 * overlap:
+                continue
+            out, start = self._mask_until(buffer, start, len(buffer) - overlap)
+            yield out
+            # 後読み用に1文字だけ残して捨てる
+            buffer = buffer[start - 1:]
+            start = 1
+
+        if len(buffer) > start:
+            out, _ = self._mask_until(buffer, start, None)
+            yield out
+
+    def _mask_until(self, buffer: str, pos: int, cut: int | None) -> tuple[str, int]:
+        """buffer[pos:] のうち cut より前で始まるPIIまでをマスクし、(出力, 処理済み位置) を返す."""
+        pieces: list[str] = []
+        last = pos
+        for match in self._pattern.finditer(buffer, pos):
+            if cut is not None and match.start() >= cut:
+                break
+            pieces.append(buffer[last:match.start()])
+            pieces.append(self._replace(match))
+            last = match.end()
+        end = len(buffer) if cut is None else max(cut, last)
+        pieces.append(buffer[last:end])
+        return "".join(pieces), end
+
+
+def _load_names(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+_default_scanner: PiiScanner | None = None
+_default_lock = threading.Lock()
+
+
+def get_pii_scanner() -> PiiScanner:
+    """共有のスキャナを返す（人名辞書は環境変数 JOBSPEC_PII_NAMES のファイルから読む）."""
+    global _default_scanner
+
+    if _default_scanner is None:
+        with _default_lock:
+            if _default_scanner is None:
+                path = os.environ.get("JOBSPEC_PII_NAMES")
+                _default_scanner = PiiScanner(_load_names(path) if path else ())
+    return _default_scanner
+
+
+def set_pii_names(names: Iterable[str]) -> None:
+    """共有スキャナの人名辞書を差し替える."""
+    global _default_scanner
+
+    scanner = PiiScanner(names)
+    with _default_lock:
+        _default_scanner = scanner
+
 
 def mask_pii(text: str) -> str:
     """テキスト内の個人情報をマスクする.
@@ -29,13 +240,22 @@ def mask_pii(text: str) -> str:
         text: 対象テキスト
 
     Returns:
-        マスク済みテキスト（メール→[EMAIL], 電話→[PHONE]）
+        マスク済みテキスト（URL→[URL], メール→[EMAIL], 電話→[PHONE],
+        郵便番号→[POSTAL], 辞書の人名→[NAME]）
     """
-    # メールアドレスをマスク
-    text = EMAIL_PATTERN.sub("[EMAIL]", text)
+    return get_pii_scanner().mask(text)
 
-    # 電話番号をマスク
-    text = PHONE_PATTERN.sub("[PHONE]", text)
 
-    return text
+def mask_pii_stream(
+    chunks: Iterable[str], overlap: int = DEFAULT_STREAM_OVERLAP
+) -> Iterator[str]:
+    """mask_piiのストリーミング版（数MB以上の入力向け）.
 
+    Args:
+        chunks: テキストの断片
+        overlap: チャンク境界で持ち越す文字数
+
+    Yields:
+        マスク済みテキストの断片（連結すると mask_pii(全体) と同じ）
+    """
+    return get_pii_scanner().mask_stream(chunks, overlap=overlap)
@@ -0,0 +1,294 @@
+"""技術キーワードの正規化（表記揺れの統一と整数ID）.
+
+LLMやルールが出す技術キーワードは `AWS` / `Amazon Web Services` / `ＡＷＳ` のように
+表記が揺れるため、NFKC正規化と別名辞書で正式名にそろえ、安定した整数IDを振る.
+辞書にない語も、正規化した文字列から決まるIDを持つ（プロセスをまたいでも同じ）.
+
+    canonicalize_keywords(["aws", "Amazon Web Services", "ＰｏｓｔｇｒｅＳＱＬ"])
+    # → ["AWS", "PostgreSQL"]
+    keyword_ids(["Golang", "Go言語"])    # → frozenset({2})
+
+別名は文字単位のトライにまとめてあり、`find_terms` で文中の技術名を最長一致で拾える.
+環境変数 JOBSPEC_VOCABULARY にJSONファイル
+（`[{"id": 1001, "name": "Snowflake", "aliases": ["スノーフレーク"]}, ...]`）を指定すると
+組み込みの辞書に追加される.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections.abc import Iterable
+from functools import lru_cache
+
+# 辞書にない語のIDはこの値以上（辞書のIDと重ならない）
+UNKNOWN_ID_BASE = 1 << 32
+
+# 正規化の規則（normalize_key・表示名の作り方）を変えたら上げる. 構造化キャッシュのキーに含まれる
+VOCABULARY_VERSION = 1
+
+# (ID, 正式名, 別名). IDは公開後に変更・再利用しないこと
+_TERMS: tuple[tuple[int, str, tuple[str, ...]], ...] = (
+    # 言語
+    (1, "Python", ("python3", "python 3", "パイソン")),
+    (2, "Go", ("golang", "go言語", "go lang")),
+    (3, "TypeScript", ("ts", "タイプスクリプト")),
+    (4, "JavaScript", ("js", "ecmascript", "ジャバスクリプト")),
+    (5, "Java", ("ジャバ",)),
+    (6, "Kotlin", ("コトリン",)),
+    (7, "Scala", ("スカラ",)),
+    (8, "Ruby", ("ルビー",)),
+    (9, "PHP", ()),
+    (10, "C#", ("csharp", "c sharp", "シーシャープ")),
+    (11, "C++", ("cpp", "cplusplus")),
+    (12, "Rust", ()),
+    (13, "Swift", ()),
+    (14, "Dart", ()),
+    (15, "SQL", ()),
+    (16, "R", ()),
+    (17, "Elixir", ()),
+    (18, "Perl", ()),
+    (19, "C", ("c言語",)),
+    # フレームワーク・ライブラリ
+    (101, "React", ("react.js", "reactjs", "リアクト")),
+    (102, "Vue.js", ("vue", "vuejs", "vue3")),
+    (103, "Angular", ("angularjs",)),
+    (104, "Next.js", ("nextjs",)),
+    (105, "Nuxt.js", ("nuxt", "nuxtjs")),
+    (106, "Node.js", ("node", "nodejs", "node js")),
+    (107, "Django", ("ジャンゴ",)),
+    (108, "FastAPI", ("fast api",)),
+    (109, "Flask", ()),
+    (110, "Ruby on Rails", ("rails", "ror", "ルビーオンレイルズ")),
+    (111, "Spring Boot", ("spring", "springboot", "spring framework")),
+    (112, "Laravel", ()),
+    (113, "Express", ("express.js", "expressjs")),
+    (114, "NestJS", ("nest.js",)),
+    (115, "Flutter", ()),
+    (116, "React Native", ("reactnative",)),
+    (117, "Svelte", ()),
+    (118, "jQuery", ()),
+    (119, ".NET", ("dotnet", ".net core", "asp.net")),
+    (120, "GraphQL", ()),
+    (121, "gRPC", ()),
+    (122, "pandas", ()),
+    (123, "NumPy", ()),
+    (124, "PyTorch", ("torch",)),
+    (125, "TensorFlow", ()),
+    (126, "scikit-learn", ("sklearn", "scikit learn")),
+    # クラウド・インフラ
+    (201, "AWS", ("amazon web services", "amazon aws", "アマゾンウェブサービス")),
+    (202, "GCP", ("google cloud", "google cloud platform", "gcloud")),
+    (203, "Azure", ("microsoft azure",)),
+    (204, "Docker", ("ドッカー",)),
+    (205, "Kubernetes", ("k8s", "kube", "クバネティス")),
+    (206, "Terraform", ("テラフォーム",)),
+    (207, "Ansible", ()),
+    (208, "Linux", ()),
+    (209, "Nginx", ()),
+    (210, "GitHub Actions", ("gha",)),
+    (211, "CircleCI", ("circle ci",)),
+    (212, "Jenkins", ()),
+    (213, "Git", ()),
+    (214, "GitHub", ()),
+    (215, "GitLab", ()),
+    (216, "Datadog", ()),
+    (217, "Amazon ECS", ("ecs",)),
+    (218, "Amazon EKS", ("eks",)),
+    (219, "AWS Lambda", ("lambda",)),
+    (220, "Amazon S3", ("s3",)),
+    (221, "Amazon EC2", ("ec2",)),
+    (222, "Cloud Run", ()),
+    (223, "Firebase", ()),
+    (224, "Vercel", ()),
+    # データベース・データ基盤
+    (301, "PostgreSQL", ("postgres", "postgre", "psql", "ポスグレ")),
+    (302, "MySQL", ("マイエスキューエル",)),
+    (303, "Oracle Database", ("oracle", "oracle db")),
+    (304, "SQL Server", ("mssql", "microsoft sql server")),
+    (305, "MongoDB", ("mongo",)),
+    (306, "Redis", ()),
+    (307, "Elasticsearch", ("elastic search",)),
+    (308, "DynamoDB", ("dynamo db", "amazon dynamodb")),
+    (309, "BigQuery", ("bq", "big query")),
+    (310, "Snowflake", ()),
+    (311, "Redshift", ("amazon redshift",)),
+    (312, "Spark", ("apache spark", "pyspark")),
+    (313, "Airflow", ("apache airflow",)),
+    (314, "Kafka", ("apache kafka",)),
+    (315, "Dagster", ()),
+    (316, "dbt", ()),
+    (317, "Databricks", ()),
+    (318, "SQLite", ()),
+)
+
+# 正規化時に前後から取り除く記号
+_STRIP_CHARS = " \t\r\n・、。,;:：；()（）[]「」"
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_key(keyword: str) -> str:
+    """照合用のキー（NFKC・小文字化・空白の統一）."""
+    text = unicodedata.normalize("NFKC", keyword).strip(_STRIP_CHARS).lower()
+    return _SPACE_RE.sub(" ", text)
+
+
+def _unknown_id(key: str) -> int:
+    """辞書にない語のID（正規化キーから決まる）."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=7).digest()
+    return UNKNOWN_ID_BASE + int.from_bytes(digest, "big")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and (char.isalnum() or char in "+#")
+
+
+class Vocabulary:
+    """技術キーワードの辞書.
+
+    Args:
+        terms: (ID, 正式名, 別名) のイテラブル
+
+    Raises:
+        ValueError: IDや別名が重複している場合
+    """
+
+    def __init__(self, terms: Iterable[tuple[int, str, Iterable[str]]]) -> None:
+        self._names: dict[int, str] = {}
+        self._aliases: dict[str, int] = {}
+        self._trie: dict[str, dict] = {}
+        for term_id, name, aliases in terms:
+            if term_id in self._names or not 0 < term_id < UNKNOWN_ID_BASE:
+                raise ValueError(f"IDが不正または重複しています: {term_id}")
+            self._names[term_id] = name
+            for alias in (name, *aliases):
+                key = normalize_key(alias)
+                if self._aliases.setdefault(key, term_id) != term_id:
+                    raise ValueError(f"別名が重複しています: {alias}")
+                node = self._trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[""] = term_id
+        self._resolve = lru_cache(maxsize=8192)(self._resolve_uncached)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _resolve_uncached(self, keyword: str) -> tuple[int, str]:
+        key = normalize_key(keyword)
+        term_id = self._aliases.get(key)
+        if term_id is not None:
+            return term_id, self._names[term_id]
+        # 辞書にない語は表示用にNFKCだけかけて残す
+        display = _SPACE_RE.sub(" ", unicodedata.normalize("NFKC", keyword).strip(_STRIP_CHARS))
+        return _unknown_id(key), display
+
+    def signature(self) -> str:
+        """正規化の版と辞書の内容を表す文字列（辞書や規則が変われば変わる）."""
+        return json.dumps(
+            {
+                "version": VOCABULARY_VERSION,
+                "names": sorted(self._names.items()),
+                "aliases": sorted(self._aliases.items()),
+            },
+            ensure_ascii=False,
+        )
+
+    def name(self, term_id: int) -> str | None:
+        """辞書の語の正式名（辞書にないIDならNone）."""
+        return self._names.get(term_id)
+
+    def term_id(self, keyword: str) -> int:
+        """キーワードのID."""
+        return self._resolve(keyword)[0]
+
+    def canonicalize(self, keyword: str) -> str:
+        """キーワードを正式名にする（辞書になければNFKC正規化しただけの文字列）."""
+        return self._resolve(keyword)[1]
+
+    def keyword_map(self, keywords: Iterable[str]) -> dict[int, str]:
+        """キーワード列を ID → 正式名 のdictにする（空文字は除く、先に出たものを優先）."""
+        result: dict[int, str] = {}
+        for keyword in keywords:
+            term_id, name = self._resolve(keyword)
+            if name:
+                result.setdefault(term_id, name)
+        return result
+
+    def find_terms(self, text: str) -> list[tuple[int, int, int]]:
+        """文中の辞書の語を最長一致で探す.
+
+        英数字の別名は前後が英数字でない位置でだけ一致する（`Go` は `Google` に一致しない）.
+
+        Args:
+            text: 対象テキスト（NFKC正規化済みであること）
+
+        Returns:
+            (開始位置, 終了位置, ID) のリスト
+        """
+        found: list[tuple[int, int, int]] = []
+        pos = 0
+        length = len(text)
+        while pos < length:
+            best: tuple[int, int] | None = None
+            if pos == 0 or not (_is_word_char(text[pos - 1]) and _is_word_char(text[pos])):
+                node = self._trie
+                end = pos
+                while end < length:
+                    char = text[end]
+                    node = node.get(" " if char.isspace() else char.lower())
+                    if node is None:
+                        break
+                    end += 1
+                    if "" in node and not (
+                        end < length and _is_word_char(text[end - 1]) and _is_word_char(text[end])
+                    ):
+                        best = (end, node[""])
+            if best is None:
+                pos += 1
+                continue
+            found.append((pos, best[0], best[1]))
+            pos = best[0]
+        return found
+
+
+def _load_terms(path: str) -> list[tuple[int, str, list[str]]]:
+    with open(path, encoding="utf-8") as f:
+        return [(item["id"], item["name"], item.get("aliases", [])) for item in json.load(f)]
+
+
+_default_vocabulary: Vocabulary | None = None
+_default_lock = threading.Lock()
+
+
+def get_vocabulary() -> Vocabulary:
+    """共有の辞書を返す（環境変数 JOBSPEC_VOCABULARY のファイルがあれば追加する）."""
+    global _default_vocabulary
+
+    if _default_vocabulary is None:
+        with _default_lock:
+            if _default_vocabulary is None:
+                path = os.environ.get("JOBSPEC_VOCABULARY")
+                _default_vocabulary = Vocabulary([*_TERMS, *(_load_terms(path) if path else ())])
+    return _default_vocabulary
+
+
+def canonicalize_keywords(keywords: Iterable[str]) -> list[str]:
+    """技術キーワードを正式名にそろえ、重複を除く（順序は保つ）.
+
+    Args:
+        keywords: 技術キーワード
+
+    Returns:
+        正式名のリスト（辞書にない語はNFKC正規化しただけのもの）
+    """
+    return list(get_vocabulary().keyword_map(keywords).values())
+
+
+def keyword_ids(keywords: Iterable[str]) -> frozenset[int]:
+    """技術キーワードのIDの集合."""
+    return frozenset(get_vocabulary().keyword_map(keywords))
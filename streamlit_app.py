@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
 from datetime import datetime
+from typing import Any
 
 from dotenv import load_dotenv
 load_dotenv()  # .envファイルを読み込み
@@ -11,13 +13,26 @@ load_dotenv()  # .envファイルを読み込み
 import streamlit as st
 
 from src.schema import JobSpec
-from src.pipeline.structure import structure_job
-from src.pipeline.generate import (
-    generate_internal_summary,
-    generate_sales_email,
-    generate_questions,
+from src.pipeline.structure import restructure_job, stream_structure_job
+from src.pipeline.cache import get_structure_cache
+from src.pipeline.generate import EMAIL_TEMPLATES, render_job
+from src.pipeline.jobs import Job, ProgressReporter
+from src.pipeline.rewrite import RewriteResult, get_rewrite_cache, iter_rewrites
+from src.storage.history import HistoryEntry, HistoryStore
+from src.llm.client import is_api_available
+from src.ui.cache import (
+    content_key,
+    export_markdown,
+    get_cache_stats,
+    history_store,
+    job_executor,
+    job_json,
+    job_key,
+    recent_history,
+    similar_history,
+    warm_up,
 )
-from src.llm.client import is_api_available, rewrite_text
+from src.ui.common import lazy_download_button, session_id
 
 # サンプル案件票テキスト
 SAMPLE_JOB_TEXT = """\
@@ -54,25 +69,14 @@ SAMPLE_JOB_TEXT = """\
 服装自由、フレックス制度あり
 """
 
-# メールテンプレート種別
-EMAIL_TEMPLATES = {
-    "初回提案": {
-        "prefix": "",
-        "suffix": "\n\nご興味がございましたら、詳細をお伝えいたします。\nご検討のほど、よろしくお願いいたします。",
-    },
-    "フォローアップ": {
-        "prefix": "先日ご案内した案件について、改めてご連絡いたします。\n\n",
-        "suffix": "\n\nご状況いかがでしょうか。\nご不明点等ございましたら、お気軽にお申し付けください。",
-    },
-    "リマインド": {
-        "prefix": "お忙しいところ恐れ入ります。\n先日の案件について、リマインドのご連絡です。\n\n",
-        "suffix": "\n\n本案件は他候補者との調整も進んでおります。\nご興味がございましたら、お早めにご連絡いただけますと幸いです。",
-    },
-    "再提案": {
-        "prefix": "以前ご案内した案件について、条件が更新されましたのでご連絡いたします。\n\n",
-        "suffix": "\n\n前回よりも条件が改善されております。\n改めてご検討いただけますと幸いです。",
-    },
-}
+# サイドバーに表示する履歴の件数
+HISTORY_PAGE_SIZE = 20
+
+# 実行中のジョブがあるときに進捗を取りに行く間隔（秒）
+JOB_POLL_INTERVAL = 1.0
+
+# リライト案を横に並べる数
+REWRITE_COLUMNS = 3
 
 # リライトオプション
 REWRITE_OPTIONS = [
@@ -92,6 +96,9 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Anthropicクライアントの事前接続（プロセス内で初回のみ）
+warm_up()
+
 # カスタムCSS
 st.markdown("""
 <style>
@@ -554,111 +561,47 @@ def copy_button(text: str, button_id: str, label: str = "コピー") -> None:
     )
 
 
-def add_to_history(title: str, job: JobSpec, summary: str, email: str, questions: list[str]) -> None:
-    """履歴に追加."""
-    if "history" not in st.session_state:
-        st.session_state["history"] = []
-
-    entry = {
-        "id": len(st.session_state["history"]),
-        "title": title or "無題の案件",
-        "timestamp": datetime.now().strftime("%H:%M"),
-        "job": job,
-        "summary": summary,
-        "email": email,
-        "questions": questions,
-    }
-    st.session_state["history"].insert(0, entry)
-
-    if len(st.session_state["history"]) > 10:
-        st.session_state["history"] = st.session_state["history"][:10]
-
-
-def generate_export_markdown(job: JobSpec, summary: str, email: str, questions: list[str]) -> str:
-    """Markdownエクスポート用テキストを生成."""
-    questions_md = "\n".join(f"- {q}" for q in questions)
-    job_json = json.dumps(job.model_dump(), ensure_ascii=False, indent=2)
-
-    return f"""# 案件レポート: {job.title or "無題"}
-
-生成日時: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+def _reset_baseline() -> None:
+    """差分構造化の基準（前回構造化したテキストと結果）を捨てる."""
+    st.session_state.pop("structured_text", None)
+    st.session_state.pop("structured_job", None)
 
----
 
-## 社内要約
+def open_history(entry: HistoryEntry) -> None:
+    """履歴を開く（生成済みテキストはこのとき読み込む）."""
+    artifacts = history_store().load_artifacts(entry.id)
+    if artifacts is None:
+        st.warning("この履歴は削除されています")
+        return
+    st.session_state["job"] = entry.job
+    st.session_state["job_key"] = job_key(entry.job)
+    st.session_state["summary"] = artifacts.summary
+    st.session_state["email"] = artifacts.email
+    st.session_state.pop("email_area", None)
+    # 履歴には元のテキストがないため、次の Generate は差分でなく全体を構造化する
+    _reset_baseline()
+    st.session_state["questions"] = artifacts.questions
+    st.session_state["history_id"] = entry.id
+    st.rerun()
 
-{summary}
 
----
-
-## 提案メール
-
-{email}
-
----
-
-## ヒアリング質問
-
-{questions_md}
-
----
-
-## 構造化データ (JSON)
-
-```json
-{job_json}
-```
-"""
-
-
-def calculate_similarity(job1: JobSpec, job2: JobSpec) -> tuple[float, list[str]]:
-    """2つの案件の類似度を計算.
-
-    Returns:
-        (類似度スコア 0-1, 共通キーワードリスト)
-    """
-    keywords1 = set(kw.lower() for kw in job1.stack_keywords)
-    keywords2 = set(kw.lower() for kw in job2.stack_keywords)
-
-    if not keywords1 or not keywords2:
-        return 0.0, []
-
-    common = keywords1 & keywords2
-    union = keywords1 | keywords2
-
-    score = len(common) / len(union) if union else 0.0
-    return score, list(common)
-
-
-def find_similar_jobs(current_job: JobSpec, history: list[dict], top_n: int = 3) -> list[dict]:
-    """履歴から類似案件を検索."""
-    results = []
+# セッション初期化
+if "job_text_input" not in st.session_state:
+    st.session_state["job_text_input"] = ""
 
-    for entry in history:
-        hist_job = entry["job"]
-        if hist_job == current_job:
-            continue
+def _load_sample() -> None:
+    st.session_state["job_text_input"] = SAMPLE_JOB_TEXT
+    _reset_baseline()
 
-        score, common_keywords = calculate_similarity(current_job, hist_job)
-        if score > 0:
-            results.append({
-                "entry": entry,
-                "score": score,
-                "common_keywords": common_keywords,
-            })
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:top_n]
+def _clear_history() -> None:
+    history_store().clear()
+    st.session_state.pop("history_id", None)
 
 
-# セッション初期化
-if "job_text_input" not in st.session_state:
-    st.session_state["job_text_input"] = ""
-if "history" not in st.session_state:
-    st.session_state["history"] = []
-
-# --- サイドバー ---
-with st.sidebar:
+@st.fragment
+def render_sidebar() -> None:
+    """サイドバー（履歴の操作はサイドバーだけを再実行する）."""
     # APIステータス表示
     if is_api_available():
         st.markdown(
@@ -673,12 +616,27 @@ with st.sidebar:
 
     st.markdown('<div style="height: 1rem"></div>', unsafe_allow_html=True)
 
+    # 履歴が変わらない限り、一覧と類似案件は再実行のたびに計算し直さない
+    history_version = history_store().version()
+    recent_entries = recent_history(history_version, HISTORY_PAGE_SIZE)
+
     # 類似案件サジェスト
-    if "job" in st.session_state and st.session_state["history"]:
-        similar_jobs = find_similar_jobs(
-            st.session_state["job"],
-            st.session_state["history"],
-        )
+    if "job" in st.session_state and recent_entries:
+        current_job = st.session_state["job"]
+        history_id = st.session_state.get("history_id")
+        # 表示中の案件自身は除く（同じ内容の履歴がもう1件あることがあるため1件多く取る）
+        similar_jobs = [
+            {"entry": entry, "score": score, "common_keywords": common}
+            for entry, score, common in similar_history(
+                st.session_state["job_key"],
+                current_job,
+                history_version,
+                top_k=4,
+                exclude=(history_id,) if history_id is not None else (),
+                semantic_ready=history_store().semantic_ready(),
+            )
+            if entry.job != current_job
+        ][:3]
 
         if similar_jobs:
             st.markdown("### 🔗 類似案件")
@@ -689,79 +647,76 @@ with st.sidebar:
 
                 st.markdown(
                     f'<div class="similar-job">'
-                    f'<div class="similar-job-title">{entry["title"][:25]}{"..." if len(entry["title"]) > 25 else ""}</div>'
-                    f'<div class="similar-job-match">一致率 {score:.0%} ({", ".join(common[:3])})</div>'
+                    f'<div class="similar-job-title">{entry.title[:25]}{"..." if len(entry.title) > 25 else ""}</div>'
+                    f'<div class="similar-job-match">類似度 {score:.0%}'
+                    f'{" (" + ", ".join(common[:3]) + ")" if common else ""}</div>'
                     f'</div>',
                     unsafe_allow_html=True,
                 )
 
-                if st.button(f"📄 読み込む", key=f"similar_{entry['id']}", use_container_width=True):
-                    st.session_state["job"] = entry["job"]
-                    st.session_state["summary"] = entry["summary"]
-                    st.session_state["email"] = entry["email"]
-                    st.session_state["questions"] = entry["questions"]
-                    st.rerun()
+                if st.button("📄 読み込む", key=f"similar_{entry.id}", use_container_width=True):
+                    open_history(entry)
 
             st.divider()
 
-    # 履歴
+    # 履歴（新しいものから HISTORY_PAGE_SIZE 件だけ読む）
     st.markdown("### 📚 履歴")
 
-    if st.session_state["history"]:
-        for entry in st.session_state["history"]:
+    if recent_entries:
+        for entry in recent_entries:
             if st.button(
-                f"📄 {entry['title'][:20]}{'...' if len(entry['title']) > 20 else ''}",
-                key=f"history_{entry['id']}",
+                f"📄 {entry.title[:20]}{'...' if len(entry.title) > 20 else ''}",
+                key=f"history_{entry.id}",
                 use_container_width=True,
             ):
-                st.session_state["job"] = entry["job"]
-                st.session_state["summary"] = entry["summary"]
-                st.session_state["email"] = entry["email"]
-                st.session_state["questions"] = entry["questions"]
-                st.rerun()
+                open_history(entry)
 
             st.markdown(
                 f'<div style="font-size: 0.7rem; color: #94a3b8; margin-top: -0.5rem; margin-bottom: 0.5rem;">'
-                f'{entry["timestamp"]}</div>',
+                f'{datetime.fromtimestamp(entry.created_at).strftime("%m/%d %H:%M")}</div>',
                 unsafe_allow_html=True,
             )
 
         st.divider()
 
-        if st.button("🗑️ 履歴をクリア", use_container_width=True):
-            st.session_state["history"] = []
-            st.rerun()
+        st.button("🗑️ 履歴をクリア", use_container_width=True, on_click=_clear_history)
     else:
         st.markdown(
             '<p style="font-size: 0.85rem; color: #94a3b8;">まだ履歴がありません</p>',
             unsafe_allow_html=True,
         )
 
-# ヘッダー
-st.markdown("# ◆ JobSpec Studio")
-st.markdown(
-    '<p style="color: #64748b; margin-top: -1rem; margin-bottom: 2rem; font-size: 0.9rem;">'
-    '案件票を構造化し、提案資料を自動生成します'
-    '</p>',
-    unsafe_allow_html=True,
-)
+    # キャッシュの効き具合
+    with st.expander("⚙️ キャッシュ"):
+        st.dataframe(
+            get_cache_stats(),
+            column_config={"hit_rate": st.column_config.ProgressColumn("hit_rate", min_value=0, max_value=1)},
+            hide_index=True,
+            use_container_width=True,
+        )
+        if is_api_available():
+            st.caption("構造化キャッシュ")
+            st.json(get_structure_cache().stats(), expanded=False)
+        st.caption("リライトキャッシュ")
+        st.json(get_rewrite_cache().stats(), expanded=False)
 
-# --- 左右レイアウト ---
-left_col, right_col = st.columns([1, 1.4], gap="large")
 
-# --- 左カラム: 入力 ---
-with left_col:
+@st.fragment
+def render_input() -> None:
+    """入力欄（入力中の操作は入力欄だけを再実行する）."""
     st.markdown("##### INPUT")
 
-    btn_col1, btn_col2, btn_col3 = st.columns([1, 1, 1])
+    btn_col1, btn_col2, _ = st.columns([1, 1, 1])
     with btn_col1:
-        if st.button("📝 サンプル", type="secondary", use_container_width=True):
-            st.session_state["job_text_input"] = SAMPLE_JOB_TEXT
-            st.rerun()
+        st.button(
+            "📝 サンプル", type="secondary", use_container_width=True, on_click=_load_sample
+        )
     with btn_col2:
         if st.button("🗑️ クリア", type="secondary", use_container_width=True):
             st.session_state["job_text_input"] = ""
-            for key in ["job", "summary", "email", "questions"]:
+            for key in [
+                "job", "job_key", "summary", "email", "questions", "history_id", "structured_text", "structured_job",
+            ]:
                 if key in st.session_state:
                     del st.session_state[key]
             st.rerun()
@@ -804,65 +759,333 @@ with left_col:
 
     st.markdown('<div style="height: 0.75rem"></div>', unsafe_allow_html=True)
 
-    generate_btn = st.button(
+    if st.button(
         "Generate →",
         type="primary",
         use_container_width=True,
-    )
-
-# --- 右カラム: 出力 ---
-with right_col:
-    st.markdown("##### OUTPUT")
-
-    if generate_btn:
+    ):
         if not job_text.strip():
             st.error("案件票テキストを入力してください。")
         else:
-            try:
-                with st.spinner("構造化中..."):
-                    job: JobSpec = structure_job(job_text)
-                    summary = generate_internal_summary(job)
-                    base_email = generate_sales_email(job, tone=tone, angle=angle)
+            submit_generate(job_text, tone, angle, email_template)
+            # 出力欄に進捗を出すため、ページ全体を再実行する
+            st.rerun()
 
-                    tmpl = EMAIL_TEMPLATES[email_template]
-                    email = tmpl["prefix"] + base_email + tmpl["suffix"]
 
-                    questions = generate_questions(job)
+def generate_task(
+    job_text: str,
+    tone: str,
+    angle: str,
+    email_template: str,
+    baseline: tuple[str, JobSpec] | None,
+    store: HistoryStore,
+) -> Callable[[ProgressReporter], dict[str, Any]]:
+    """案件票を構造化し、生成物を作って履歴に加えるジョブ（ワーカースレッドで動く）.
+
+    ワーカーからは st.session_state に触れないため、必要な値はすべて引数で受け取る.
+    """
+    def run(report: ProgressReporter) -> dict[str, Any]:
+        if baseline is not None:
+            # 前回構造化したテキストとの差分だけを構造化し直す
+            report(message="差分を構造化中")
+            job = restructure_job(baseline[0], baseline[1], job_text)
+        else:
+            # 確定したフィールドから順に途中経過として出す
+            report(message="構造化中")
+            total = len(JobSpec.model_fields)
+            for job in stream_structure_job(job_text):
+                fields = job.model_dump(exclude_unset=True)
+                report(progress=0.9 * len(fields) / total, partial=fields)
+
+        report(progress=0.9, message="提案文を生成中")
+        rendered = render_job(job, tone=tone, angle=angle, email_template=email_template)
+        history_id = store.add(
+            job.title or "無題", job, rendered.summary, rendered.email, rendered.questions
+        )
+        return {
+            "job_text": job_text,
+            "job": job,
+            "summary": rendered.summary,
+            "email": rendered.email,
+            "questions": rendered.questions,
+            "history_id": history_id,
+        }
 
-                st.session_state["job"] = job
-                st.session_state["summary"] = summary
-                st.session_state["email"] = email
-                st.session_state["questions"] = questions
+    return run
 
-                add_to_history(job.title or "無題", job, summary, email, questions)
 
-            except Exception as e:
-                st.error(f"エラーが発生しました: {e}")
+def submit_generate(job_text: str, tone: str, angle: str, email_template: str) -> None:
+    """生成ジョブを共有の実行器に投入する（結果は出力欄のジョブ一覧から受け取る）.
 
-    # 結果表示
-    if "job" in st.session_state:
-        export_md = generate_export_markdown(
-            st.session_state["job"],
-            st.session_state["summary"],
-            st.session_state["email"],
-            st.session_state["questions"],
+    差分構造化の基準は投入した時点のものをジョブごとに渡す. 別の案件票に差し替えた場合は
+    restructure_job が見出しの変わり具合から判断して全体を構造化し直す.
+    """
+    baseline = None
+    if "structured_text" in st.session_state:
+        baseline = (st.session_state["structured_text"], st.session_state["structured_job"])
+    first_line = next((line.strip() for line in job_text.splitlines() if line.strip()), "")
+    job_id = job_executor().submit(
+        generate_task(job_text, tone, angle, email_template, baseline, history_store()),
+        owner=session_id(),
+        label=first_line[:30],
+    )
+    # 最後に投入したジョブは、終わったら自動で開く
+    st.session_state["latest_job_id"] = job_id
+
+
+def open_job_result(job: Job) -> None:
+    """完了したジョブの結果を表示中の案件にする."""
+    result = job.result
+    st.session_state["structured_text"] = result["job_text"]
+    st.session_state["structured_job"] = result["job"]
+    st.session_state["job"] = result["job"]
+    st.session_state["job_key"] = job_key(result["job"])
+    st.session_state["summary"] = result["summary"]
+    st.session_state["email"] = result["email"]
+    # メールの入力欄は前の案件の値を持ち越すので、表示中の案件のメールから作り直させる
+    st.session_state.pop("email_area", None)
+    st.session_state["questions"] = result["questions"]
+    st.session_state["history_id"] = result["history_id"]
+    job_executor().discard(job.id)
+
+
+def render_jobs() -> None:
+    """このセッションが投入したジョブの待ち順・進捗・結果."""
+    executor = job_executor()
+    jobs = executor.jobs(owner=session_id())
+
+    # 新しく終わったジョブがあれば、履歴と出力欄を更新するためページ全体を再実行する
+    finished = {job.id for job in jobs if job.finished}
+    newly_finished = finished - st.session_state.get("seen_finished_jobs", set())
+    st.session_state["seen_finished_jobs"] = finished
+    if newly_finished:
+        latest = executor.get(st.session_state.get("latest_job_id", ""))
+        if latest is not None and latest.id in newly_finished and latest.status == "done":
+            open_job_result(latest)
+        st.rerun()
+
+    for job in jobs:
+        label = job.label or "無題"
+        if job.status == "queued":
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.caption(f"⏳ {label} — 待ち {executor.queue_position(job.id) or '-'} 番目")
+            with col2:
+                st.button(
+                    "取消", key=f"cancel_{job.id}", use_container_width=True,
+                    on_click=executor.cancel, args=(job.id,),
+                )
+        elif job.status == "running":
+            st.progress(job.progress, text=f"{label} — {job.message}")
+            if job.partial:
+                with st.expander("途中経過", expanded=False):
+                    st.code(json.dumps(job.partial, ensure_ascii=False, indent=2), language="json")
+        else:
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                if job.status == "done":
+                    st.caption(f"✅ {job.result['job'].title or label}")
+                elif job.status == "failed":
+                    st.error(f"{label}: エラーが発生しました: {job.error}")
+                else:
+                    st.caption(f"— {label}（取り消し済み）")
+            with col2:
+                if job.status == "done" and st.button(
+                    "開く", key=f"open_{job.id}", use_container_width=True
+                ):
+                    open_job_result(job)
+                    st.rerun()
+            with col3:
+                st.button(
+                    "✕", key=f"discard_{job.id}", use_container_width=True,
+                    on_click=executor.discard, args=(job.id,),
+                )
+
+
+@st.fragment
+def render_downloads() -> None:
+    """エクスポート（内容はダウンロード時に作る）.
+
+    内容を作る関数はスクリプトの外のスレッドで呼ばれ st.session_state を読めないため、
+    表示時点の値を閉じ込めておく（メールが変わったらページ全体を再実行して作り直す）.
+    """
+    key = st.session_state["job_key"]
+    job = st.session_state["job"]
+    summary = st.session_state["summary"]
+    email = st.session_state["email"]
+    questions = st.session_state["questions"]
+
+    def build_markdown() -> str:
+        return export_markdown(key, job, summary, email, questions)
+
+    def build_text() -> str:
+        return build_markdown().replace("```json\n", "").replace("\n```", "")
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M")
+    dl_col1, dl_col2, _ = st.columns([1, 1, 2])
+    with dl_col1:
+        lazy_download_button("📥 Markdown", build_markdown, f"jobspec_{stamp}.md", "text/markdown")
+    with dl_col2:
+        lazy_download_button("📥 Text", build_text, f"jobspec_{stamp}.txt", "text/plain")
+
+
+@st.fragment
+def render_json_tab() -> None:
+    """JSONタブ."""
+    json_str = job_json(st.session_state["job_key"], st.session_state["job"])
+
+    copy_button(json_str, "copy_json", "JSONをコピー")
+    st.code(json_str, language="json")
+
+
+@st.fragment
+def render_summary_tab() -> None:
+    """社内要約タブ."""
+    summary_text = st.session_state["summary"]
+    copy_button(summary_text, "copy_summary", "要約をコピー")
+    st.text_area(
+        "summary",
+        value=summary_text,
+        height=320,
+        label_visibility="collapsed",
+        key="summary_area",
+    )
+
+
+def _select_all_rewrites() -> None:
+    st.session_state["rewrite_styles"] = list(REWRITE_OPTIONS)
+
+
+def _adopt_rewrite(text: str) -> None:
+    """リライト案をメールにする（新しいメールのリライト案は選び直すまで作らない）."""
+    st.session_state["email"] = text
+    # メールの入力欄の値は email_area が持つので、欄の値も書き換える
+    st.session_state["email_area"] = text
+    st.session_state["rewrite_styles"] = []
+    st.session_state["email_changed"] = True
+
+
+def _sync_email() -> None:
+    """入力欄で編集したメールを表示中の案件のメールにする."""
+    st.session_state["email"] = st.session_state["email_area"]
+    st.session_state["email_changed"] = True
+
+
+def render_rewrite(result: RewriteResult) -> None:
+    """リライト案1件."""
+    st.markdown(f"**{result.instruction}**")
+    if not result.ok:
+        st.error(f"リライトに失敗しました: {result.error}")
+        return
+    st.text_area(
+        result.instruction,
+        value=result.text,
+        height=240,
+        label_visibility="collapsed",
+        disabled=True,
+        key=f"rewrite_{result.instruction}_{content_key(result.text)}",
+    )
+    st.button(
+        "この案を使う",
+        key=f"adopt_{result.instruction}",
+        use_container_width=True,
+        on_click=_adopt_rewrite,
+        args=(result.text,),
+    )
+
+
+@st.fragment
+def render_email_tab() -> None:
+    """提案メールタブ."""
+    if st.session_state.pop("email_changed", False):
+        # エクスポートの内容も新しいメールで作り直すため、ページ全体を再実行する
+        st.rerun(scope="app")
+    email_text = st.session_state["email"]
+
+    # コピー & リライト案の選択
+    btn_row = st.columns([1, 2, 1])
+    with btn_row[0]:
+        copy_button(email_text, "copy_email", "メールをコピー")
+    with btn_row[1]:
+        styles = st.multiselect(
+            "リライト",
+            options=REWRITE_OPTIONS,
+            key="rewrite_styles",
+            label_visibility="collapsed",
+            placeholder="リライト案を選ぶと並べて比較できます",
         )
+    with btn_row[2]:
+        st.button("すべて比較", use_container_width=True, on_click=_select_all_rewrites)
+
+    # 入力欄の値は email_area が持つ（value= と併用すると Session State 経由の書き換えで警告が出る）
+    if "email_area" not in st.session_state:
+        st.session_state["email_area"] = email_text
+    st.text_area(
+        "email",
+        height=300,
+        label_visibility="collapsed",
+        key="email_area",
+        on_change=_sync_email,
+    )
 
-        dl_col1, dl_col2, dl_col3 = st.columns([1, 1, 2])
-        with dl_col1:
-            st.download_button(
-                "📥 Markdown",
-                data=export_md,
-                file_name=f"jobspec_{datetime.now().strftime('%Y%m%d_%H%M')}.md",
-                mime="text/markdown",
-            )
-        with dl_col2:
-            st.download_button(
-                "📥 Text",
-                data=export_md.replace("```json\n", "").replace("\n```", ""),
-                file_name=f"jobspec_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-                mime="text/plain",
-            )
+    if styles:
+        # 選んだスタイルを並列にリライトし、できたものから枠を埋める（作成済みのものはすぐ出る）
+        columns = st.columns(min(len(styles), REWRITE_COLUMNS))
+        slots = {style: columns[i % len(columns)].empty() for i, style in enumerate(styles)}
+        for slot in slots.values():
+            slot.caption("リライト中...")
+        for result in iter_rewrites(email_text, styles):
+            with slots[result.instruction].container():
+                render_rewrite(result)
+
+
+@st.fragment
+def render_questions_tab() -> None:
+    """質問リストタブ."""
+    questions = st.session_state["questions"]
+    questions_text = "\n".join(f"・{q}" for q in questions)
+
+    copy_button(questions_text, "copy_questions", "質問をコピー")
+
+    st.markdown("**確認事項**")
+    for i, q in enumerate(questions, 1):
+        st.markdown(
+            f'<div style="padding: 0.5rem 0; border-bottom: 1px solid #e4e4e7;">'
+            f'<span style="color: #f97316; font-weight: 600;">{i}.</span> {q}'
+            f'</div>',
+            unsafe_allow_html=True,
+        )
+
+
+# ヘッダー
+st.markdown("# ◆ JobSpec Studio")
+st.markdown(
+    '<p style="color: #64748b; margin-top: -1rem; margin-bottom: 2rem; font-size: 0.9rem;">'
+    '案件票を構造化し、提案資料を自動生成します'
+    '</p>',
+    unsafe_allow_html=True,
+)
+
+# --- 左右レイアウト ---
+left_col, right_col = st.columns([1, 1.4], gap="large")
+
+# --- 左カラム: 入力 ---
+with left_col:
+    render_input()
+
+# --- 右カラム: 出力 ---
+with right_col:
+    st.markdown("##### OUTPUT")
+
+    # 生成ジョブ（実行中があるあいだだけ一定間隔で進捗を取りに行く）
+    pending = any(
+        not job.finished for job in job_executor().jobs(owner=session_id())
+    )
+    st.fragment(render_jobs, run_every=JOB_POLL_INTERVAL if pending else None)()
+
+    # 結果表示（各タブ内の操作はそのタブだけを再実行する）
+    if "job" in st.session_state:
+        render_downloads()
 
         tab1, tab2, tab3, tab4 = st.tabs([
             "JSON",
@@ -872,67 +1095,13 @@ with right_col:
         ])
 
         with tab1:
-            job_dict = st.session_state["job"].model_dump()
-            json_str = json.dumps(job_dict, ensure_ascii=False, indent=2)
-
-            copy_button(json_str, "copy_json", "JSONをコピー")
-            st.code(json_str, language="json")
-
+            render_json_tab()
         with tab2:
-            summary_text = st.session_state["summary"]
-            copy_button(summary_text, "copy_summary", "要約をコピー")
-            st.text_area(
-                "summary",
-                value=summary_text,
-                height=320,
-                label_visibility="collapsed",
-                key="summary_area",
-            )
-
+            render_summary_tab()
         with tab3:
-            email_text = st.session_state["email"]
-
-            # コピー & リライトボタン
-            btn_row = st.columns([1, 1, 2])
-            with btn_row[0]:
-                copy_button(email_text, "copy_email", "メールをコピー")
-            with btn_row[1]:
-                rewrite_style = st.selectbox(
-                    "リライト",
-                    options=["選択..."] + REWRITE_OPTIONS,
-                    key="rewrite_select",
-                    label_visibility="collapsed",
-                )
-
-            # リライト実行
-            if rewrite_style != "選択...":
-                with st.spinner(f"「{rewrite_style}」でリライト中..."):
-                    rewritten = rewrite_text(email_text, rewrite_style)
-                    st.session_state["email"] = rewritten
-                    st.rerun()
-
-            st.text_area(
-                "email",
-                value=st.session_state["email"],
-                height=300,
-                label_visibility="collapsed",
-                key="email_area",
-            )
-
+            render_email_tab()
         with tab4:
-            questions = st.session_state["questions"]
-            questions_text = "\n".join(f"・{q}" for q in questions)
-
-            copy_button(questions_text, "copy_questions", "質問をコピー")
-
-            st.markdown("**確認事項**")
-            for i, q in enumerate(questions, 1):
-                st.markdown(
-                    f'<div style="padding: 0.5rem 0; border-bottom: 1px solid #e4e4e7;">'
-                    f'<span style="color: #f97316; font-weight: 600;">{i}.</span> {q}'
-                    f'</div>',
-                    unsafe_allow_html=True,
-                )
+            render_questions_tab()
 
     else:
         st.markdown(
@@ -942,3 +1111,7 @@ with right_col:
             '</div>',
             unsafe_allow_html=True,
         )
+
+# --- サイドバー（生成後の履歴を表示するため最後に描画する） ---
+with st.sidebar:
+    render_sidebar()
@@ -0,0 +1,46 @@
+"""壊れたJSONの修復（src.pipeline.json_repair）のテスト."""
+
+from __future__ import annotations
+
+from src.pipeline.json_repair import repair_json
+
+
+def test_valid_json_with_surrounding_text():
+    assert repair_json('結果です:\n{"title": "A", "tasks": []}\n以上') == {"title": "A", "tasks": []}
+
+
+def test_code_fence():
+    assert repair_json('```json\n{"title": "A"}\n```') == {"title": "A"}
+
+
+def test_trailing_commas():
+    text = '{"title": "A", "tasks": ["x", "y",], "rate": {"min": 1,},}'
+    assert repair_json(text) == {"title": "A", "tasks": ["x", "y"], "rate": {"min": 1}}
+
+
+def test_comma_inside_string_is_kept():
+    assert repair_json('{"notes": "a,}b", "tasks": ["c,]",],}') == {"notes": "a,}b", "tasks": ["c,]"]}
+
+
+def test_raw_newline_in_string():
+    assert repair_json('{"summary": "1行目\n2行目"}') == {"summary": "1行目\n2行目"}
+
+
+def test_truncated_inside_string():
+    assert repair_json('{"title": "A", "summary": "途中で') == {"title": "A", "summary": "途中で"}
+
+
+def test_truncated_inside_nested_list():
+    assert repair_json('{"title": "A", "tasks": ["x", "y"') == {"title": "A", "tasks": ["x", "y"]}
+
+
+def test_truncated_after_key_cuts_back_to_last_comma():
+    assert repair_json('{"title": "A", "tasks": ["x"], "rate": {"min":') == {
+        "title": "A",
+        "tasks": ["x"],
+    }
+
+
+def test_unrepairable():
+    assert repair_json("JSONではありません") is None
+    assert repair_json('["配列"]') is None
@@ -0,0 +1,49 @@
+"""ストリーミング中のJSON解析（src.pipeline.partial_json）のテスト."""
+
+from __future__ import annotations
+
+import json
+import random
+
+from benchmarks.corpus import make_jobspec
+from src.pipeline.partial_json import PartialObjectParser
+
+
+def _feed_all(chunks: list[str]) -> tuple[dict, list[dict]]:
+    parser = PartialObjectParser()
+    fields: dict = {}
+    steps = []
+    for chunk in chunks:
+        completed = parser.feed(chunk)
+        steps.append(completed)
+        fields.update(completed)
+    assert parser.done
+    return fields, steps
+
+
+def test_fields_close_in_order():
+    _, steps = _feed_all(['前置き {"title": "A", ', '"tasks": ["x", ', '"y"], "rate": {"min": 1}', "}"])
+    assert steps == [{"title": "A"}, {}, {"tasks": ["x", "y"]}, {"rate": {"min": 1}}]
+
+
+def test_delimiters_inside_strings():
+    text = json.dumps({"notes": 'a, "b": {c}', "title": "\\,"}, ensure_ascii=False)
+    fields, _ = _feed_all(list(text))
+    assert fields == {"notes": 'a, "b": {c}', "title": "\\,"}
+
+
+def test_any_chunking_matches_json_loads():
+    rng = random.Random(0)
+    for _ in range(50):
+        data = make_jobspec(rng).model_dump()
+        text = json.dumps(data, ensure_ascii=False)
+        cuts = sorted(rng.sample(range(1, len(text)), 10))
+        chunks = [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)])]
+        fields, _ = _feed_all(chunks)
+        assert fields == data
+
+
+def test_ignores_text_after_object():
+    parser = PartialObjectParser()
+    assert parser.feed('{"title": "A"} {"title": "B"}') == {"title": "A"}
+    assert parser.feed(', "x": 1}') == {}
@@ -0,0 +1,68 @@
+"""PIIマスク（src.utils.pii）のテスト."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.bench_pii import legacy_mask
+from src.utils.pii import PiiScanner
+
+# 旧実装（2回のre.sub）でもマスクできていた形式
+_LEGACY_SHAPES = [
+    "taro.yamada@example.co.jp",
+    "a.b-c+d@sub.example.com",
+    "090-1234-5678",
+    "090 1234 5678",
+    "090_1234_5678",
+    "03-1234-5678",
+    "09012345678",
+    "0312345678",
+    "090-12345678",
+    "03-12345678",
+    "0901234-5678",
+    "0120-123456",
+]
+
+
+@pytest.fixture(scope="module")
+def scanner():
+    return PiiScanner(["山田太郎"])
+
+
+@pytest.mark.parametrize("pii", _LEGACY_SHAPES)
+@pytest.mark.parametrize("context", ["{}", "連絡先: {}", "担当（{}）まで", "{}\n次の行"])
+def test_matches_legacy_masker(scanner, pii, context):
+    text = context.format(pii)
+    assert scanner.mask(text) == legacy_mask(text)
+
+
+@pytest.mark.parametrize("phone", ["090-12345678", "03-12345678", "0901234-5678", "03 12345678"])
+def test_single_separator_phone(scanner, phone):
+    assert scanner.mask(f"電話:{phone}です") == "電話:[PHONE]です"
+
+
+@pytest.mark.parametrize(
+    "pii",
+    ["+81-90-1234-5678", "+819012345678", "03(1234)5678", "https://example.com/path?q=1"],
+)
+def test_masks_shapes_missed_by_legacy(scanner, pii):
+    assert pii not in scanner.mask(f"連絡先: {pii}")
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["稼働140-180h/月", "2024-01-01", "090-123", "01-2345", "0901234-5678-1", "ver 1.2.3"],
+)
+def test_leaves_non_phone_numbers(scanner, text):
+    assert scanner.mask(text) == text
+
+
+def test_names_and_postal(scanner):
+    masked = scanner.mask("担当: 山田太郎 〒150-0002 150-0002東京都")
+    assert masked == "担当: [NAME] [POSTAL] [POSTAL]東京都"
+
+
+def test_stream_matches_mask(scanner):
+    text = "連絡先 090-12345678、taro@example.com。" * 500
+    chunks = [text[i:i + 777] for i in range(0, len(text), 777)]
+    assert "".join(scanner.mask_stream(chunks)) == scanner.mask(text)
@@ -0,0 +1,115 @@
+"""ルールベース抽出（src.pipeline.rules）のテスト."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from benchmarks.corpus import make_corpus, make_ticket
+from src.pipeline.rules import JUDGMENT_FIELDS, diff_sections, parse_rate, parse_remote
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("70〜90万円/月", {"min": 700_000, "max": 900_000, "unit": "monthly"}),
+        ("60万-80万円（月額）", {"min": 600_000, "max": 800_000, "unit": "monthly"}),
+        ("700,000円〜", {"min": 700_000, "max": None, "unit": None}),
+        ("〜90万円/人月", {"min": None, "max": 900_000, "unit": "monthly"}),
+        ("80万円", {"min": 800_000, "max": 800_000, "unit": None}),
+        ("5,000円/h", {"min": 5_000, "max": 5_000, "unit": "hourly"}),
+        ("日額 4.5万円", {"min": 45_000, "max": 45_000, "unit": "daily"}),
+        ("年収 600〜800万円", {"min": 6_000_000, "max": 8_000_000, "unit": "yearly"}),
+    ],
+)
+def test_parse_rate(text, expected):
+    assert parse_rate(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "応相談", "スキル見合い", "稼働140-180h/月"])
+def test_parse_rate_without_amount(text):
+    assert parse_rate(text) is None
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("フルリモート", "full_remote"),
+        ("完全在宅", "full_remote"),
+        ("週2出社", "hybrid"),
+        ("月1日リモート", "hybrid"),
+        ("リモート可", "hybrid"),
+        ("リモート不可", "on_site"),
+        ("客先常駐", "on_site"),
+        # 「不可」は「可」より、「週n出社」は「常駐」より先に判定する
+        ("リモート不可（常駐）", "on_site"),
+        ("常駐（週1リモート）", "hybrid"),
+        ("東京都渋谷区", None),
+    ],
+)
+def test_parse_remote(text, expected):
+    assert parse_remote(text) == expected
+
+
+def _ticket() -> str:
+    return make_ticket(random.Random(0))
+
+
+def test_diff_sections_unchanged():
+    text = _ticket()
+    assert diff_sections(text, text) == (set(), [])
+    # 空行だけの違いは変更とみなさない
+    assert diff_sections(text, text.replace("\n\n", "\n")) == (set(), [])
+
+
+def test_diff_sections_changed_heading_includes_judgment_fields():
+    text = _ticket()
+    edited = text.replace("【契約】業務委託", "【契約】準委任")
+
+    fields, changed = diff_sections(text, edited)
+
+    assert changed == ["契約"]
+    # 役割・リスクは案件全体から判断するため、どの見出しが変わっても問い直す
+    assert fields == {"contract_type", *JUDGMENT_FIELDS}
+
+
+def test_diff_sections_added_heading():
+    text = _ticket()
+
+    fields, changed = diff_sections(text, text + "\n【備考】\n外国籍不可")
+
+    assert changed == ["備考"]
+    assert fields == {"notes", *JUDGMENT_FIELDS}
+
+
+def test_diff_sections_removed_heading():
+    text = _ticket()
+    removed = "\n".join(line for line in text.splitlines() if not line.startswith("【面談】"))
+
+    fields, changed = diff_sections(text, removed)
+
+    assert changed == ["面談"]
+    assert fields == {"interview_count", *JUDGMENT_FIELDS}
+
+
+def test_diff_sections_derived_fields():
+    text = _ticket()
+    location = next(line for line in text.splitlines() if line.startswith("【勤務地】"))
+
+    fields, _ = diff_sections(text, text.replace(location, "【勤務地】フルリモート"))
+    assert {"location", "remote_type"} <= fields
+
+    # 開発環境の見出しがなければ、スキルの変更で技術キーワードも取り直す
+    fields, _ = diff_sections(text, text.replace("【必須スキル】", "【必須スキル】\n・Rust 1年以上"))
+    assert {"must_requirements", "stack_keywords"} <= fields
+
+
+def test_diff_sections_requires_full_restructure():
+    text = _ticket()
+    # 見出しの外・未知の見出しは対応するフィールドが決まらない
+    assert diff_sections(text, "補足あり\n" + text) is None
+    assert diff_sections(text, text + "\n【社内メモ】\n至急") is None
+    # 別の案件票に差し替えた場合は、役割やリスクを引き継がない
+    first, second = make_corpus(2, seed=1)
+    assert diff_sections(first, second) is None